@@ -10,12 +10,45 @@ import logging
 from flask import Flask
 from config import config
 
+# Import the JSON provider
+from app.core import json_provider
+
+# Import request timing, profiling and report metrics
+from app.core import profiler, report_metrics, timing
+
 # Import database functions
 from app.core.database import close_db_connections
 
+# Import the shared cache backend
+from app.core.cache import cache
+
+# Import the shared result store
+from app.core import result_store
+
+# Import the table watermark poller
+from app.core.watermarks import watermarks
+
+# Import admission control for report queries
+from app.core import admission
+
+# Import the database circuit breakers
+from app.core import circuit_breaker
+
+# Import read replica routing
+from app.core import db_routing
+
+# Import response compression
+from app.core import compression
+
+# Import conditional GET handling for report JSON
+from app.core import conditional
+
 # Import template helpers
 from app.core.template_helpers import register_template_helpers
 
+# Import the template fragment and bytecode caches
+from app.core import fragment_cache
+
 # Import report registry initialization
 from app.core.report_registry import initialize_report_registry
 
@@ -47,17 +80,54 @@ def create_app(config_name=None):
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
 
+    # Serialize JSON with orjson (before the template environment is created,
+    # so the tojson filter uses it too)
+    json_provider.init_app(app)
+
+    # Initialize the shared cache backend
+    cache.init_app(app)
+
+    # Shared result store counters
+    result_store.init_app(app)
+
+    # Time, profile and measure each request (first, so their after_request
+    # handlers run last)
+    timing.init_app(app)
+    profiler.init_app(app)
+    report_metrics.init_app(app)
+
     # Register database connection teardown
     app.teardown_appcontext(close_db_connections)
 
     # Register template helpers
     register_template_helpers(app)
 
+    # Template fragment and bytecode caches
+    fragment_cache.init_app(app)
+
     # Register blueprints
     from app.groups import bp as groups_bp
 
     app.register_blueprint(groups_bp)
 
+    # Poll source tables to invalidate the caches that depend on them
+    watermarks.init_app(app)
+
+    # Report admission queue metrics
+    admission.init_app(app)
+
+    # Database circuit breaker states
+    circuit_breaker.init_app(app)
+
+    # Measured lag of the read replicas and reporting copies
+    db_routing.init_app(app)
+
+    # Compress large responses (before conditional GET, so it runs after it)
+    compression.init_app(app)
+
+    # ETags and 304 responses for report JSON
+    conditional.init_app(app)
+
     # Register context processors
     from app.core.context_processors import register_context_processors
 
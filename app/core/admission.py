@@ -0,0 +1,297 @@
+"""
+Admission control module.
+
+This module limits how many report requests query each database at once, so
+a burst of heavy reports cannot saturate New World or CityWorks for the staff
+using those systems directly. Each database has separate limits for light and
+heavy reports (ADMISSION_LIMITS). A slot is held only while a query runs, so
+requests served from a cache never wait. Queries over the limit wait in a
+queue for up to ADMISSION_QUEUE_SECONDS, then the request gets a 503 response
+with a Retry-After header. Limits apply per worker process.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, jsonify
+
+from app.core.auth import admin_required
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Report classes and their default limit per database
+REPORT_CLASSES = ("light", "heavy")
+DEFAULT_LIMITS = {"light": 8, "heavy": 2}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a query waited too long for a slot."""
+
+    def __init__(self, db_key, report_class, retry_after):
+        super().__init__(
+            "The server is busy running other reports. Please try again shortly."
+        )
+        self.db_key = db_key
+        self.report_class = report_class
+        self.retry_after = retry_after
+
+
+class AdmissionQueue:
+    """A concurrency limit with a queue for one database and report class."""
+
+    def __init__(self, limit):
+        """
+        Initialize the queue.
+
+        Args:
+            limit (int): Maximum number of requests running at once.
+        """
+        self.limit = limit
+        self.semaphore = threading.BoundedSemaphore(limit)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, timeout):
+        """
+        Wait for a slot.
+
+        Args:
+            timeout (float): Seconds to wait in the queue.
+
+        Returns:
+            bool: True if a slot was acquired, False if the wait timed out.
+        """
+        with self.lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+        started = time.monotonic()
+        acquired = self.semaphore.acquire(timeout=timeout)
+
+        with self.lock:
+            self.waiting -= 1
+            self.wait_seconds += time.monotonic() - started
+            if acquired:
+                self.running += 1
+                self.admitted += 1
+            else:
+                self.rejected += 1
+        return acquired
+
+    def release(self):
+        """Release a slot acquired with acquire."""
+        with self.lock:
+            self.running -= 1
+        self.semaphore.release()
+
+    def to_json(self):
+        """
+        Convert to a JSON-serializable dictionary.
+
+        Returns:
+            dict: The limit, current and peak queue depth and counters.
+        """
+        with self.lock:
+            return {
+                "limit": self.limit,
+                "running": self.running,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "avg_wait_ms": (
+                    round(self.wait_seconds * 1000 / (self.admitted + self.rejected), 1)
+                    if self.admitted + self.rejected
+                    else None
+                ),
+            }
+
+
+class AdmissionController:
+    """The admission queues of every database and report class."""
+
+    def __init__(self):
+        """Initialize with no queues; they are created on first use."""
+        self.lock = threading.Lock()
+        self.queues = {}
+
+    def queue(self, db_key, report_class):
+        """
+        Get the queue for a database and report class.
+
+        Must be called within an application context the first time.
+
+        Args:
+            db_key (str): The database key.
+            report_class (str): "light" or "heavy".
+
+        Returns:
+            AdmissionQueue: The queue.
+        """
+        key = (db_key, report_class)
+        with self.lock:
+            queue = self.queues.get(key)
+            if queue is None:
+                limits = current_app.config.get("ADMISSION_LIMITS", {})
+                limit = limits.get(db_key, {}).get(
+                    report_class, DEFAULT_LIMITS[report_class]
+                )
+                queue = self.queues[key] = AdmissionQueue(limit)
+        return queue
+
+    def get_stats(self):
+        """
+        Get the state of every queue in this process.
+
+        Returns:
+            dict: "db_key/report_class" to the queue's counters.
+        """
+        with self.lock:
+            queues = dict(self.queues)
+        return {
+            f"{db_key}/{report_class}": queue.to_json()
+            for (db_key, report_class), queue in sorted(queues.items())
+        }
+
+
+admission = AdmissionController()
+
+
+@contextmanager
+def admitted(db_key):
+    """
+    Hold a slot of the current view's queue for a database while a query runs.
+
+    Queries from views without limit_concurrency for the database, and queries
+    run while this request already holds its slot, are not limited.
+
+    Args:
+        db_key (str): The database the query runs on.
+
+    Raises:
+        AdmissionRejected: If no slot was free within ADMISSION_QUEUE_SECONDS.
+    """
+    config = current_app.config
+    report_class = (g.get("admission_classes") or {}).get(db_key)
+    held = g.setdefault("admission_held", set())
+    if (
+        report_class is None
+        or db_key in held
+        or not config.get("ADMISSION_ENABLED", True)
+    ):
+        yield
+        return
+
+    queue = admission.queue(db_key, report_class)
+    if not queue.acquire(config.get("ADMISSION_QUEUE_SECONDS", 15)):
+        logger.warning(
+            "Rejected %s report query on %s database: too many running",
+            report_class,
+            db_key,
+        )
+        error = AdmissionRejected(
+            db_key, report_class, config.get("ADMISSION_RETRY_SECONDS", 30)
+        )
+        # Lets the response say when to retry (see _mark_rejected)
+        g.admission_rejected = error
+        raise error
+
+    held.add(db_key)
+    try:
+        yield
+    finally:
+        held.discard(db_key)
+        queue.release()
+
+
+def limit_concurrency(db_key, report_class="light"):
+    """
+    Limit how many of a view's queries run at once on a database.
+
+    The view's queries to db_key wait for a slot in execute_query (see
+    admitted); views sharing a database and report class share one limit.
+
+    Args:
+        db_key (str): The database the view queries, such as "nws" or "cw".
+        report_class (str, optional): "light" or "heavy". Defaults to "light".
+
+    Returns:
+        callable: A decorator for a view function.
+    """
+    if report_class not in REPORT_CLASSES:
+        raise ValueError(f"Unknown report class: {report_class}")
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            g.admission_classes = dict(
+                g.get("admission_classes") or {}, **{db_key: report_class}
+            )
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _rejected(error):
+    """
+    Answer a request whose query waited too long for a slot.
+
+    Args:
+        error (AdmissionRejected): The error raised.
+
+    Returns:
+        tuple: JSON response, 503 status and Retry-After header.
+    """
+    return (
+        jsonify({"success": False, "error": str(error)}),
+        503,
+        {"Retry-After": str(error.retry_after)},
+    )
+
+
+def _mark_rejected(response):
+    """
+    Turn a failed response into 503 if one of its queries was rejected.
+
+    Report views catch exceptions and answer 500 themselves, so the error
+    noted by admitted is used to tell clients when to retry.
+
+    Args:
+        response (Response): The response.
+
+    Returns:
+        Response: The same response.
+    """
+    error = g.get("admission_rejected")
+    if error is not None and response.status_code == 500:
+        response.status_code = 503
+        response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def init_app(app):
+    """
+    Answer rejected requests with 503, and add an endpoint reporting the
+    admission queues of this worker.
+
+    Args:
+        app (Flask): The application.
+    """
+    app.register_error_handler(AdmissionRejected, _rejected)
+    app.after_request(_mark_rejected)
+
+    @app.route("/api/admission", methods=["GET"])
+    @admin_required
+    def api_admission():
+        """API endpoint with the running, waiting and rejected counts."""
+        return {"queues": admission.get_stats()}
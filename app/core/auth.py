@@ -0,0 +1,60 @@
+"""
+Authentication module.
+
+The reports have no user accounts, so administrative pages and tools are
+limited to requests carrying ADMIN_TOKEN in an X-Admin-Token header, or from
+the addresses in ADMIN_ADDRESSES. No addresses are trusted by default: behind
+a reverse proxy, request.remote_addr is the proxy's address (loopback when it
+runs on the same host), so listing it would admit every user. With no
+ADMIN_TOKEN and no addresses, administrative pages are refused to everyone.
+"""
+
+import hmac
+import logging
+from functools import wraps
+from flask import current_app, render_template, request
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+def is_admin():
+    """
+    Whether the current request comes from an administrator.
+
+    Returns:
+        bool: True if the request's address is in ADMIN_ADDRESSES or it
+        carries the ADMIN_TOKEN.
+    """
+    config = current_app.config
+    if request.remote_addr in config.get("ADMIN_ADDRESSES", ()):
+        return True
+    token = config.get("ADMIN_TOKEN")
+    supplied = request.headers.get("X-Admin-Token")
+    return bool(token and supplied) and hmac.compare_digest(token, supplied)
+
+
+def admin_required(view):
+    """
+    Limit a view to administrators.
+
+    Args:
+        view (callable): The view function.
+
+    Returns:
+        callable: The wrapped view function, answering 403 for other users.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin():
+            logger.warning(
+                "Refused admin page %s to %s", request.path, request.remote_addr
+            )
+            return (
+                render_template("error.html", error="This page is for administrators."),
+                403,
+            )
+        return view(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,100 @@
+"""
+Background refresh module.
+
+This module provides a small helper for running periodic refresh work (such as
+rebuilding local indexes) on a daemon thread with its own application context,
+so request handlers never block on it.
+"""
+
+import logging
+import threading
+import time
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRefresher:
+    """
+    Run a refresh function on a daemon thread when it falls due.
+
+    At most one refresh runs at a time per refresher. The function is called
+    as ``func(full=<bool>)`` inside an application context.
+    """
+
+    def __init__(self, name):
+        """
+        Initialize the refresher.
+
+        Args:
+            name (str): Name used for the worker thread and log messages.
+        """
+        self.name = name
+        self.lock = threading.Lock()
+        self.running = False
+        self.last_run = None
+        self.last_full_run = None
+
+    def is_due(self, interval):
+        """
+        Check whether a refresh is due.
+
+        Args:
+            interval (float): Seconds between refreshes.
+
+        Returns:
+            bool: True if no refresh has run within the interval.
+        """
+        return self.last_run is None or time.monotonic() - self.last_run >= interval
+
+    def is_full_due(self, interval):
+        """
+        Check whether a full rebuild is due.
+
+        Args:
+            interval (float): Seconds between full rebuilds.
+
+        Returns:
+            bool: True if no full rebuild has completed within the interval.
+        """
+        return (
+            self.last_full_run is None
+            or time.monotonic() - self.last_full_run >= interval
+        )
+
+    def trigger(self, app, func, interval, full=False):
+        """
+        Start a refresh in the background if one is due and none is running.
+
+        Args:
+            app (Flask): The application to push a context for.
+            func (callable): The refresh function, called as func(full=full).
+            interval (float): Seconds between refreshes.
+            full (bool, optional): Whether to request a full rebuild.
+
+        Returns:
+            bool: True if a refresh was started.
+        """
+        with self.lock:
+            if self.running or not self.is_due(interval):
+                return False
+            self.running = True
+
+        threading.Thread(
+            target=self._run, args=(app, func, full), name=self.name, daemon=True
+        ).start()
+        return True
+
+    def _run(self, app, func, full):
+        """Run the refresh function and record its completion."""
+        try:
+            with app.app_context():
+                func(full=full)
+            if full:
+                self.last_full_run = time.monotonic()
+        except Exception as e:
+            logger.error("Error running background refresh %s: %s", self.name, str(e))
+        finally:
+            with self.lock:
+                self.running = False
+                self.last_run = time.monotonic()
@@ -0,0 +1,137 @@
+"""
+In-process cache module.
+
+This module provides a small thread-safe LRU cache whose entries also expire
+after a fixed time-to-live, for results that are expensive to load but are
+allowed to be a few seconds old, and the application's shared cache backend
+(CACHE_TYPE), which is visible to every worker process when it is Redis.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from flask_caching import Cache
+
+from app.core.timing import record_cache
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Shared cache backend, initialized in create_app
+cache = Cache()
+
+
+class TTLCache:
+    """
+    Least-recently-used cache with a per-entry time-to-live.
+
+    When the cache is full, the least recently used entry is evicted.
+    Expired entries are dropped when they are next looked up.
+    """
+
+    def __init__(self, max_size=256, ttl=60):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int, optional): Maximum number of entries. Defaults to 256.
+            ttl (float, optional): Seconds an entry stays fresh. Defaults to 60.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        Get a cached value.
+
+        Args:
+            key: The cache key.
+            default (optional): Value returned on a miss. Defaults to None.
+
+        Returns:
+            The cached value, or default if it is missing or expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if time.monotonic() < expires:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+            ttl (float, optional): Override the default time-to-live.
+        """
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """
+        Get a cached value, loading and storing it on a miss.
+
+        None results are not cached, so missing records are looked up again.
+
+        Args:
+            key: The cache key.
+            loader (callable): Called with no arguments to load the value.
+
+        Returns:
+            tuple: (value, True if it was served from the cache)
+        """
+        value = self.get(key)
+        record_cache(value is not None)
+        if value is not None:
+            return value, True
+
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value, False
+
+    def invalidate(self, key=None):
+        """
+        Remove one entry, or every entry when no key is given.
+
+        Args:
+            key (optional): The cache key to remove.
+        """
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def resize(self, max_size=None, ttl=None):
+        """
+        Change the cache limits, evicting entries if it is now over size.
+
+        Args:
+            max_size (int, optional): New maximum number of entries.
+            ttl (float, optional): New default time-to-live in seconds.
+        """
+        with self.lock:
+            if max_size is not None:
+                self.max_size = max_size
+            if ttl is not None:
+                self.ttl = ttl
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
@@ -0,0 +1,247 @@
+"""
+Database circuit breaker module.
+
+This module stops report requests from waiting on the ODBC login timeout
+while a database server is unreachable. After CIRCUIT_FAILURE_THRESHOLD
+connection failures in a row, the database's circuit opens and connections
+fail immediately. After CIRCUIT_RESET_SECONDS, one request is let through as
+a probe: if it connects, the circuit closes again; if not, it stays open for
+another CIRCUIT_RESET_SECONDS. Requests that fail because a circuit is open
+are answered with 503 Service Unavailable and a Retry-After header.
+"""
+
+import logging
+import threading
+import time
+from flask import current_app, g, jsonify
+
+from app.core.auth import admin_required
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class DatabaseUnavailable(Exception):
+    """Raised instead of connecting while a database's circuit is open."""
+
+    def __init__(self, db_key, retry_after):
+        super().__init__(
+            f"The {db_key} database is unavailable; "
+            f"retrying the connection in {retry_after} seconds"
+        )
+        self.db_key = db_key
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """The circuit state of one database."""
+
+    def __init__(self, db_key):
+        """
+        Initialize a closed circuit.
+
+        Args:
+            db_key (str): The database key.
+        """
+        self.db_key = db_key
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def before_connect(self, reset_seconds):
+        """
+        Check that a connection may be attempted.
+
+        Args:
+            reset_seconds (float): Seconds the circuit stays open.
+
+        Raises:
+            DatabaseUnavailable: If the circuit is open, or half-open with a
+                probe already running.
+        """
+        with self.lock:
+            if self.state == CLOSED:
+                return
+
+            waited = time.monotonic() - self.opened_at
+            if self.state == OPEN and waited >= reset_seconds:
+                self.state = HALF_OPEN
+                logger.info("Probing the %s database connection", self.db_key)
+
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return
+
+            raise DatabaseUnavailable(self.db_key, max(1, int(reset_seconds - waited)))
+
+    def record_success(self):
+        """Close the circuit after a successful connection."""
+        with self.lock:
+            if self.state != CLOSED:
+                logger.info("The %s database is reachable again", self.db_key)
+            self.state = CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self, threshold):
+        """
+        Count a failed connection, opening the circuit at the threshold.
+
+        Args:
+            threshold (int): Failures in a row that open the circuit.
+        """
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.state == HALF_OPEN or self.failures >= threshold:
+                if self.state != OPEN:
+                    logger.error(
+                        "Opened the %s database circuit after %d failed "
+                        "connections",
+                        self.db_key,
+                        self.failures,
+                    )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def to_json(self):
+        """
+        Convert to a JSON-serializable dictionary.
+
+        Returns:
+            dict: The state and the number of failures in a row.
+        """
+        with self.lock:
+            return {"state": self.state, "failures": self.failures}
+
+
+class CircuitBreakers:
+    """The circuit breakers of every database."""
+
+    def __init__(self):
+        """Initialize with no breakers; they are created on first use."""
+        self.lock = threading.Lock()
+        self.breakers = {}
+
+    def get(self, db_key):
+        """
+        Get the breaker for a database.
+
+        Args:
+            db_key (str): The database key.
+
+        Returns:
+            CircuitBreaker: The breaker.
+        """
+        with self.lock:
+            breaker = self.breakers.get(db_key)
+            if breaker is None:
+                breaker = self.breakers[db_key] = CircuitBreaker(db_key)
+        return breaker
+
+    def guard(self, db_key, connect):
+        """
+        Connect to a database through its circuit breaker.
+
+        Must be called within an application context.
+
+        Args:
+            db_key (str): The database key.
+            connect (callable): Called with no arguments to connect.
+
+        Returns:
+            The connection returned by connect.
+
+        Raises:
+            DatabaseUnavailable: If the circuit is open.
+        """
+        config = current_app.config
+        if not config.get("CIRCUIT_BREAKER_ENABLED", True):
+            return connect()
+
+        breaker = self.get(db_key)
+        breaker.before_connect(config.get("CIRCUIT_RESET_SECONDS", 30))
+        try:
+            connection = connect()
+        except Exception:
+            breaker.record_failure(config.get("CIRCUIT_FAILURE_THRESHOLD", 3))
+            raise
+        breaker.record_success()
+        return connection
+
+    def get_stats(self):
+        """
+        Get the state of every database's circuit.
+
+        Returns:
+            dict: db_key to the breaker's state.
+        """
+        with self.lock:
+            breakers = dict(self.breakers)
+        return {
+            db_key: breaker.to_json() for db_key, breaker in sorted(breakers.items())
+        }
+
+
+circuit_breakers = CircuitBreakers()
+
+
+def _unavailable(error):
+    """
+    Answer a request whose database is unavailable.
+
+    Args:
+        error (DatabaseUnavailable): The error raised.
+
+    Returns:
+        tuple: JSON response, 503 status and Retry-After header.
+    """
+    return (
+        jsonify({"success": False, "error": str(error)}),
+        503,
+        {"Retry-After": str(error.retry_after)},
+    )
+
+
+def _mark_unavailable(response):
+    """
+    Turn a failed response into 503 if its database was unavailable.
+
+    Report views catch exceptions and answer 500 themselves, so the error
+    noted by get_db_connection is used to tell clients when to retry.
+
+    Args:
+        response (Response): The response.
+
+    Returns:
+        Response: The same response.
+    """
+    error = g.get("database_unavailable")
+    if error is not None and response.status_code == 500:
+        response.status_code = 503
+        response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def init_app(app):
+    """
+    Answer requests to unavailable databases with 503, and add an endpoint
+    reporting the circuit state of each database.
+
+    Args:
+        app (Flask): The application.
+    """
+    app.register_error_handler(DatabaseUnavailable, _unavailable)
+    app.after_request(_mark_unavailable)
+
+    @app.route("/api/circuits", methods=["GET"])
+    @admin_required
+    def api_circuits():
+        """API endpoint with each database's circuit state."""
+        return {"circuits": circuit_breakers.get_stats()}
@@ -0,0 +1,211 @@
+"""
+Query coalescing module.
+
+This module runs identical report queries only once while they are in
+flight. Callers in the same process wait on the first caller's thread, and
+callers in other worker processes wait on a lock in the shared cache backend,
+and all of them share the one result. Callers wait at most
+COALESCE_WAIT_SECONDS in all before running the query themselves.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from flask import current_app
+
+from app.core.cache import cache
+from app.core.database import execute_query
+from app.core.result_store import load_result, store_result
+from app.core.utils import copy_rows
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for another worker's result
+POLL_SECONDS = 0.25
+
+
+class _Flight:
+    """A query in progress in this process."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Run a function once per key for concurrent callers in this process.
+
+    The first caller for a key runs the function; callers that arrive while
+    it is running wait and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        """Initialize with no flights in progress."""
+        self.lock = threading.Lock()
+        self.flights = {}
+
+    def do(self, key, func, timeout=None):
+        """
+        Run func for a key, or wait for the caller already running it.
+
+        Args:
+            key: Identifies identical work.
+            func (callable): Called with no arguments to produce the result.
+            timeout (float, optional): Seconds to wait for another caller
+                before running func here instead.
+
+        Returns:
+            tuple: (result, True if it was shared from another caller)
+        """
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+
+        if not leader:
+            if flight.done.wait(timeout):
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result, True
+            logger.warning("Timed out waiting for a shared query; running it again")
+            return func(), False
+
+        try:
+            flight.result = func()
+        except Exception as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self.lock:
+                self.flights.pop(key, None)
+            flight.done.set()
+        return flight.result, False
+
+
+_flights = SingleFlight()
+
+
+def query_key(query, params=None, db_key="nws", fetch_all=True):
+    """
+    Build a stable key for a query.
+
+    Args:
+        query (str): The SQL query.
+        params (tuple, optional): Its parameters.
+        db_key (str): The database key.
+        fetch_all (bool, optional): Whether all rows are fetched.
+
+    Returns:
+        str: A hex digest identifying the query, its parameters and database.
+    """
+    text = repr((query, tuple(params or ()), db_key, fetch_all))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _run_across_workers(key, run, deadline, lock_seconds, result_seconds):
+    """
+    Run a query once across worker processes using the shared cache backend.
+
+    The worker that adds the lock key runs the query and publishes the result
+    (compressed by result_store) for result_seconds; the others poll for it
+    until the deadline. If the backend is unavailable, the deadline has
+    passed, or the lock is released without a result, the query runs here.
+    """
+    lock_key = f"coalesce:lock:{key}"
+    result_key = f"coalesce:result:{key}"
+
+    try:
+        published = load_result(result_key) if result_seconds > 0 else None
+        if published is not None:
+            return published
+        expired = time.monotonic() >= deadline
+        if not expired:
+            leader = cache.add(lock_key, os.getpid(), timeout=lock_seconds)
+    except Exception as e:
+        logger.warning("Cache backend unavailable for query coalescing: %s", str(e))
+        return run()
+
+    if expired:
+        # The wait in this process already used up the deadline
+        return run()
+
+    if leader:
+        try:
+            result = run()
+            try:
+                # A timeout of 0 means no expiry to the backend, so skip it
+                if result_seconds > 0:
+                    store_result(result_key, result, result_seconds)
+            except Exception as e:
+                logger.warning("Could not publish shared query result: %s", str(e))
+            return result
+        finally:
+            try:
+                cache.delete(lock_key)
+            except Exception as e:
+                logger.warning("Could not release shared query lock: %s", str(e))
+
+    # Another worker is running the query; wait for its result
+    try:
+        while time.monotonic() < deadline:
+            time.sleep(POLL_SECONDS)
+            published = load_result(result_key)
+            if published is not None:
+                logger.info("Shared query result from another worker")
+                return published
+            if not cache.has(lock_key):
+                break
+    except Exception as e:
+        logger.warning("Cache backend unavailable for query coalescing: %s", str(e))
+
+    return run()
+
+
+def execute_coalesced(query, params=None, fetch_all=True, db_key="nws"):
+    """
+    Execute a query, sharing the result with identical queries in flight.
+
+    Takes the same arguments as execute_query. Every caller receives its own
+    copy of the rows, so routes can modify them as before.
+
+    Args:
+        query (str): The SQL query to execute.
+        params (tuple, optional): Parameters for the query.
+        fetch_all (bool, optional): Whether to fetch all results or just one.
+        db_key (str): The database key. Defaults to "nws".
+
+    Returns:
+        list or dict: The query results.
+    """
+    config = current_app.config
+    if not config.get("COALESCE_ENABLED", True):
+        return execute_query(query, params, fetch_all=fetch_all, db_key=db_key)
+
+    key = query_key(query, params, db_key, fetch_all)
+    wait_seconds = config.get("COALESCE_WAIT_SECONDS", 120)
+    result_seconds = config.get("COALESCE_RESULT_SECONDS", 5)
+
+    # Waiting in this process and for other workers share one deadline
+    deadline = time.monotonic() + wait_seconds
+
+    def run():
+        return execute_query(query, params, fetch_all=fetch_all, db_key=db_key)
+
+    result, shared = _flights.do(
+        key,
+        lambda: _run_across_workers(
+            key, run, deadline, wait_seconds, result_seconds
+        ),
+        timeout=wait_seconds,
+    )
+    if shared:
+        logger.info("Shared in-flight query result on %s database", db_key)
+
+    # The shared result is never handed out, only copies of its rows
+    return copy_rows(result)
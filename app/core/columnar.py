@@ -0,0 +1,114 @@
+"""
+Columnar JSON module.
+
+This module lets report JSON be sent without repeating every column name in
+every row. A request with ?shape=columnar gets each list of row dictionaries
+in its response, at the top level or inside nested objects, as
+
+    {"columns": ["MATERIALUID", "UNITCOST", ...], "rows": [["A1", 2.5, ...], ...]}
+
+and "shape": "columnar" at the top level. The JSON provider applies it to
+every jsonify response, so routes need no changes; main.js turns the rows
+back into objects for DataTables and Chart.js.
+"""
+
+from flask import has_request_context, request
+
+
+def columnar_requested():
+    """
+    Whether the current request asked for columnar JSON.
+
+    Returns:
+        bool: True if the request has ?shape=columnar.
+    """
+    return has_request_context() and request.args.get("shape") == "columnar"
+
+
+def to_columnar(rows):
+    """
+    Convert row dictionaries to a column list and value lists.
+
+    Columns are in the order they first appear; values missing from a row
+    are None.
+
+    Args:
+        rows (list): Row dictionaries.
+
+    Returns:
+        dict: columns and rows.
+    """
+    columns = list(rows[0])
+    known = set(columns)
+    for row in rows:
+        if len(row) != len(columns) or not known.issuperset(row):
+            for key in row:
+                if key not in known:
+                    known.add(key)
+                    columns.append(key)
+    return {
+        "columns": columns,
+        "rows": [[row.get(column) for column in columns] for row in rows],
+    }
+
+
+def _is_rows(value):
+    """Whether a value is a non-empty list of row dictionaries."""
+    return (
+        isinstance(value, list)
+        and bool(value)
+        and all(isinstance(row, dict) for row in value)
+    )
+
+
+def to_shape(value):
+    """
+    Convert every list of rows in a response payload to columnar form.
+
+    Args:
+        value: The payload.
+
+    Returns:
+        The converted payload.
+    """
+    if _is_rows(value):
+        return to_columnar(value)
+    if isinstance(value, dict):
+        return {key: to_shape(item) for key, item in value.items()}
+    return value
+
+
+def count_rows(value):
+    """
+    Count the rows in every list of row dictionaries in a response payload.
+
+    Only the first item of each list is checked, so counting is cheap.
+
+    Args:
+        value: The payload.
+
+    Returns:
+        int: The number of rows.
+    """
+    if isinstance(value, list):
+        return len(value) if value and isinstance(value[0], dict) else 0
+    if isinstance(value, dict):
+        return sum(count_rows(item) for item in value.values())
+    return 0
+
+
+def shape_payload(payload):
+    """
+    Convert a response payload to columnar form.
+
+    Args:
+        payload: The data passed to jsonify.
+
+    Returns:
+        The converted payload, marked with "shape": "columnar" if it is an
+        object.
+    """
+    shaped = to_shape(payload)
+    if isinstance(shaped, dict):
+        shaped["shape"] = "columnar"
+    return shaped
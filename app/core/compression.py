@@ -0,0 +1,187 @@
+"""
+Response compression module.
+
+This module compresses large JSON, CSV and HTML responses for browsers that
+accept it, which matters for the field offices reading multi-megabyte
+reports over the VPN. Brotli is used when the brotli package is installed and
+the browser accepts it, gzip otherwise. Responses smaller than
+COMPRESSION_MIN_BYTES are sent as they are; streamed responses are compressed
+chunk by chunk as they are generated. Views whose output must not be
+compressed are decorated with skip_compression.
+"""
+
+import logging
+import zlib
+from functools import wraps
+from flask import current_app, g, request
+
+from app.core.timing import span
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Mimetypes worth compressing; images, PDFs and archives already are
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "text/csv",
+    "text/css",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+}
+
+
+class _Gzip:
+    """Incremental gzip compressor."""
+
+    def __init__(self, level):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class _Brotli:
+    """Incremental brotli compressor."""
+
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+def _choose_encoding():
+    """
+    Pick the encoding for the current request.
+
+    Returns:
+        str: "br", "gzip", or None if the browser accepts neither.
+    """
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def _compressor(encoding):
+    """Create a compressor for an encoding at the configured level."""
+    config = current_app.config
+    if encoding == "br":
+        return _Brotli(config.get("COMPRESSION_BROTLI_QUALITY", 4))
+    return _Gzip(config.get("COMPRESSION_GZIP_LEVEL", 6))
+
+
+def _compress_stream(chunks, compressor):
+    """Compress an iterable of response chunks as it is consumed."""
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def skip_compression(view):
+    """
+    Send a view's responses uncompressed.
+
+    Args:
+        view (callable): The view function.
+
+    Returns:
+        callable: The wrapped view function.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.skip_compression = True
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def compress_response(response):
+    """
+    Compress a response if the browser accepts it and it is worth it.
+
+    Runs after each request.
+
+    Args:
+        response (Response): The response.
+
+    Returns:
+        Response: The same response, compressed or not.
+    """
+    config = current_app.config
+    if (
+        not config.get("COMPRESSION_ENABLED", True)
+        or g.get("skip_compression")
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    streamed = response.is_streamed
+    if not streamed and (
+        response.content_length or 0
+    ) < config.get("COMPRESSION_MIN_BYTES", 1024):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    compressor = _compressor(encoding)
+    if streamed:
+        response.response = _compress_stream(response.response, compressor)
+        response.headers.pop("Content-Length", None)
+    else:
+        with span("compress"):
+            body = compressor.compress(response.get_data()) + compressor.finish()
+        response.set_data(body)
+
+    response.headers["Content-Encoding"] = encoding
+    # The compressed body differs byte for byte from the uncompressed one
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    """
+    Compress the application's responses.
+
+    Register before handlers that must see the uncompressed body, such as
+    conditional GET, as after_request handlers run in reverse order.
+
+    Args:
+        app (Flask): The application.
+    """
+    if brotli is None:
+        logger.info("brotli is not installed; compressing responses with gzip only")
+    app.after_request(compress_response)
@@ -0,0 +1,110 @@
+"""
+Conditional GET module.
+
+This module lets browsers revalidate report JSON instead of downloading it
+again. Every successful JSON response from a report blueprint gets an ETag
+and a Cache-Control: private header; a request whose If-None-Match or
+If-Modified-Since matches gets an empty 304 response.
+
+Results served from a StaleReportCache carry a weak ETag and Last-Modified
+derived from the cache entry's load time, which costs nothing to compute;
+other responses are tagged with a hash of their body. Browsers reuse a
+response without asking for the report's RESPONSE_MAX_AGE seconds (0, always
+revalidate, unless configured).
+"""
+
+import hashlib
+import logging
+from datetime import timezone
+from flask import current_app, request
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+def tag_version(response, *loaded_at):
+    """
+    Tag a response with the version of the cached data it was built from.
+
+    A response built from several cached results gets an ETag covering every
+    load time, so it changes when any of them is reloaded, and the newest
+    load time as Last-Modified.
+
+    Args:
+        response (Response): The response to update.
+        *loaded_at (datetime): When each result was loaded, in local time.
+
+    Returns:
+        Response: The same response.
+    """
+    versions = [f"{int(value.timestamp() * 1000000):x}" for value in loaded_at]
+    if len(versions) == 1:
+        etag = versions[0]
+    else:
+        etag = hashlib.sha1(",".join(versions).encode("ascii")).hexdigest()[:16]
+    response.set_etag(etag, weak=True)
+    response.last_modified = max(loaded_at).astimezone(timezone.utc)
+    return response
+
+
+def get_max_age(blueprint):
+    """
+    Get the seconds a report's responses may be reused without revalidating.
+
+    Args:
+        blueprint (str): The request's blueprint name.
+
+    Returns:
+        int: Seconds for Cache-Control max-age.
+    """
+    config = current_app.config
+    report_id = blueprint.rsplit(".", 1)[-1]
+    return config.get("RESPONSE_MAX_AGE", {}).get(
+        report_id, config.get("RESPONSE_MAX_AGE_DEFAULT", 0)
+    )
+
+
+def make_conditional(response):
+    """
+    Add validators to a report JSON response, answering 304 when they match.
+
+    Runs after each request. Other responses are returned unchanged.
+
+    Args:
+        response (Response): The response.
+
+    Returns:
+        Response: The response, or a 304 response.
+    """
+    if (
+        not current_app.config.get("CONDITIONAL_GET_ENABLED", True)
+        or request.method not in ("GET", "HEAD")
+        or not request.blueprint
+        or response.status_code != 200
+        or not response.is_json
+        or response.is_streamed
+        or "Cache-Control" in response.headers
+    ):
+        return response
+
+    if response.get_etag()[0] is None:
+        response.add_etag()
+
+    max_age = get_max_age(request.blueprint)
+    response.cache_control.private = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+
+    return response.make_conditional(request)
+
+
+def init_app(app):
+    """
+    Answer conditional requests for report JSON.
+
+    Args:
+        app (Flask): The application.
+    """
+    app.after_request(make_conditional)
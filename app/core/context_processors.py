@@ -6,18 +6,12 @@ to all templates in the application.
 """
 
 import logging
-from flask import Blueprint
-from app.core.report_registry import get_all_groups, get_all_reports
-from app.core.template_helpers import get_blueprint_group_id
+from app.core.navigation import get_navigation_context
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
 
-# app/core/context_processors.py
-from app.core.template_helpers import get_blueprint_group_id
-
-
 def register_context_processors(app):
     """
     Register context processors with the Flask application.
@@ -26,12 +20,8 @@ def register_context_processors(app):
 
         @app.context_processor
         def inject_reports_data():
-            """Inject reports data into all templates."""
-            return {
-                "nav_groups": get_all_groups(),
-                "all_reports": get_all_reports(),
-                "get_blueprint_group_id": get_blueprint_group_id,
-            }
+            """Inject reports and navigation data into all templates."""
+            return get_navigation_context()
 
         logger.info("Registered template context processors")
     except Exception as e:
@@ -6,28 +6,116 @@ using Windows Authentication and executing queries.
 """
 
 import logging
+import time
 import pyodbc
 from flask import current_app, g
 
+from app.core.admission import admitted
+from app.core.circuit_breaker import DatabaseUnavailable, circuit_breakers
+from app.core.db_routing import (
+    SECONDARY_TARGETS,
+    get_max_lag,
+    get_target_settings,
+    lag_monitor,
+)
+from app.core.timing import record, span
+
 # Configure logger
 logger = logging.getLogger(__name__)
 
 
+def _get_secondary_connection(db_key, max_lag):
+    """
+    Get a connection to the first secondary copy within the accepted lag.
+
+    A target whose recent lag measurement is over max_lag is skipped without
+    connecting. Connections (and failed attempts, as None) are kept on g like
+    primary connections, so each target is tried at most once per request.
+    The lag of the copy used is noted for get_read_lag.
+
+    Args:
+        db_key (str): The database key.
+        max_lag (float): Seconds behind the primary the data may be.
+
+    Returns:
+        pyodbc.Connection: A connection, or None to use the primary.
+    """
+    for target in SECONDARY_TARGETS:
+        settings = get_target_settings(db_key, target)
+        if settings is None:
+            continue
+
+        measured, lag = lag_monitor.cached(db_key, target)
+        if measured and (lag is None or lag > max_lag):
+            continue
+
+        connection_key = f"db_conn_{db_key}_{target}"
+        if not hasattr(g, connection_key):
+            conn_str = (
+                f"DRIVER={{{settings['driver']}}};"
+                f"SERVER={settings['server']};"
+                f"DATABASE={settings['database']};"
+                "Trusted_Connection=yes;"
+                "TrustServerCertificate=yes;"
+            )
+            if settings["read_only"]:
+                conn_str += "ApplicationIntent=ReadOnly;"
+            try:
+                logger.info(
+                    "Connecting to %s %s database on server '%s'",
+                    db_key,
+                    target,
+                    settings["server"],
+                )
+                with span("db-connect"):
+                    connection = circuit_breakers.guard(
+                        f"{db_key}-{target}", lambda: pyodbc.connect(conn_str)
+                    )
+            except Exception as e:
+                logger.warning(
+                    "Could not connect to %s %s database: %s", db_key, target, str(e)
+                )
+                connection = None
+            setattr(g, connection_key, connection)
+
+        connection = getattr(g, connection_key)
+        if connection is None:
+            continue
+        lag = lag_monitor.lag(db_key, target, connection, settings["lag_query"])
+        if lag is not None and lag <= max_lag:
+            g.replica_lag = max(g.get("replica_lag") or 0, lag)
+            return connection
+
+    return None
+
+
 def get_db_connection(db_key="nws"):
     """
     Get a database connection using Windows Authentication.
 
+    Requests for reports that accept lagged data (see db_routing) get a
+    connection to a read-only replica or reporting copy when one is within
+    the accepted lag, and to the primary server otherwise.
+
     Args:
         db_key (str): The key to identify which database to connect to.
-            Options: "nws" (New World), "cw" (CityWorks).
+            Options: "nws" (New World), "cw" (CityWorks), "gis" (TOC_SDE).
             Defaults to "nws".
 
     Returns:
         pyodbc.Connection: A connection to the database.
 
     Raises:
+        DatabaseUnavailable: If the database's circuit breaker is open.
         Exception: If connection fails.
     """
+    # Reports that accept lagged data may read from a secondary copy
+    max_lag = get_max_lag() if db_key in ("nws", "cw", "gis") else None
+    if max_lag is not None:
+        connection = _get_secondary_connection(db_key, max_lag)
+        if connection is not None:
+            return connection
+
     # Create a unique connection key for g
     connection_key = f"db_conn_{db_key}"
 
@@ -51,6 +139,14 @@ def get_db_connection(db_key="nws"):
                 logger.info(
                     f"Connecting to CityWorks database '{database}' on server '{server}'"
                 )
+            elif db_key == "gis":
+                # GIS (ArcGIS enterprise geodatabase) database
+                driver = current_app.config["GIS_DB_DRIVER"]
+                server = current_app.config["GIS_DB_SERVER"]
+                database = current_app.config["GIS_DB_NAME"]
+                logger.info(
+                    f"Connecting to GIS database '{database}' on server '{server}'"
+                )
             else:
                 logger.error(f"Unknown database key: {db_key}")
                 raise ValueError(f"Unknown database key: {db_key}")
@@ -64,11 +160,21 @@ def get_db_connection(db_key="nws"):
                 "TrustServerCertificate=yes;"
             )
 
+            # Connect through the circuit breaker, so an unreachable server
+            # fails fast instead of waiting out the login timeout each time
+            with span("db-connect"):
+                connection = circuit_breakers.guard(
+                    db_key, lambda: pyodbc.connect(conn_str)
+                )
+
             # Use setattr to set the connection on g
-            setattr(g, connection_key, pyodbc.connect(conn_str))
+            setattr(g, connection_key, connection)
 
         except Exception as e:
             logger.error(f"Database connection error for {db_key}: {str(e)}")
+            if isinstance(e, DatabaseUnavailable):
+                # Lets the response say when to retry (see circuit_breaker)
+                g.database_unavailable = e
             raise
 
     # Use getattr to retrieve the connection from g
@@ -108,50 +214,181 @@ def execute_query(query, params=None, fetch_all=True, db_key="nws"):
         fetch_all (bool, optional): Whether to fetch all results or just one.
             Defaults to True.
         db_key (str): The key to identify which database to connect to.
-            Options: "nws" (New World), "cw" (CityWorks).
+            Options: "nws" (New World), "cw" (CityWorks), "gis" (TOC_SDE).
             Defaults to "nws".
 
     Returns:
         list or dict: The query results.
 
     Raises:
+        AdmissionRejected: If the view's admission queue was full.
         Exception: If query execution fails.
     """
-    conn = get_db_connection(db_key)
-    cursor = None
-
-    try:
-        logger.info(f"Executing query on {db_key} database: {query}")
-        cursor = conn.cursor()
-
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-
-        # Get column names
-        columns = [column[0] for column in cursor.description]
-
-        if fetch_all:
-            # Fetch all results and convert to list of dicts
-            results = []
-            for row in cursor.fetchall():
-                results.append(dict(zip(columns, row)))
-            logger.info(f"Query returned {len(results)} rows from {db_key} database")
-            return results
-        else:
-            # Fetch just one row and convert to dict
-            row = cursor.fetchone()
-            if row:
-                logger.info(f"Query returned 1 row from {db_key} database")
-                return dict(zip(columns, row))
+    # Hold an admission slot while the query runs (see admission)
+    with admitted(db_key):
+        conn = get_db_connection(db_key)
+        cursor = None
+
+        try:
+            logger.info(f"Executing query on {db_key} database: {query}")
+            cursor = conn.cursor()
+
+            with span("db-query"):
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+
+            # Get column names
+            columns = [column[0] for column in cursor.description]
+
+            if fetch_all:
+                # Fetch all results and convert to list of dicts
+                results = []
+                with span("db-fetch"):
+                    for row in cursor.fetchall():
+                        results.append(dict(zip(columns, row)))
+                logger.info(
+                    f"Query returned {len(results)} rows from {db_key} database"
+                )
+                return results
             else:
-                logger.info(f"Query returned 0 rows from {db_key} database")
-                return None
-
-    except Exception as e:
-        logger.error(f"Query execution error on {db_key} database: {str(e)}")
-        raise
-    finally:
-        if cursor:
-            cursor.close()
+                # Fetch just one row and convert to dict
+                with span("db-fetch"):
+                    row = cursor.fetchone()
+                if row:
+                    logger.info(f"Query returned 1 row from {db_key} database")
+                    return dict(zip(columns, row))
+                else:
+                    logger.info(f"Query returned 0 rows from {db_key} database")
+                    return None
+
+        except Exception as e:
+            logger.error(f"Query execution error on {db_key} database: {str(e)}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+
+def stream_query(query, params=None, db_key="nws", batch_size=5000):
+    """
+    Execute a SQL query and yield result rows in batches.
+
+    Unlike execute_query, rows are not materialized as dictionaries. This is
+    intended for bulk loads (such as building local indexes) where holding the
+    full result set as a list of dicts would be wasteful.
+
+    Args:
+        query (str): The SQL query to execute.
+        params (tuple, optional): Parameters for the query.
+        db_key (str): The key to identify which database to connect to.
+            Defaults to "nws".
+        batch_size (int, optional): Number of rows fetched per round trip.
+            Defaults to 5000.
+
+    Yields:
+        tuple: (column names, list of row tuples) for each fetched batch.
+
+    Raises:
+        AdmissionRejected: If the view's admission queue was full.
+        Exception: If query execution fails.
+    """
+    # Hold an admission slot while the query runs (see admission)
+    with admitted(db_key):
+        conn = get_db_connection(db_key)
+        cursor = None
+
+        try:
+            logger.info("Streaming query on %s database: %s", db_key, query)
+            cursor = conn.cursor()
+
+            with span("db-query"):
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+
+            columns = [column[0] for column in cursor.description]
+            total = 0
+
+            while True:
+                started = time.perf_counter()
+                rows = cursor.fetchmany(batch_size)
+                record("db-fetch", time.perf_counter() - started)
+                if not rows:
+                    break
+                total += len(rows)
+                yield columns, rows
+
+            logger.info("Streamed %d rows from %s database", total, db_key)
+
+        except Exception as e:
+            logger.error("Streaming query error on %s database: %s", db_key, str(e))
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+
+def execute_batch(query, params=None, db_key="nws"):
+    """
+    Execute a SQL batch that returns several result sets in one round trip.
+
+    Each SELECT in the batch produces one result set, read in order with
+    cursor.nextset(). Statements that return no rows (such as SET NOCOUNT ON)
+    are skipped.
+
+    Args:
+        query (str): The SQL batch to execute.
+        params (tuple, optional): Parameters for the whole batch, in order.
+        db_key (str): The key to identify which database to connect to.
+            Defaults to "nws".
+
+    Returns:
+        list: One list of row dictionaries per result set.
+
+    Raises:
+        AdmissionRejected: If the view's admission queue was full.
+        Exception: If query execution fails.
+    """
+    # Hold an admission slot while the query runs (see admission)
+    with admitted(db_key):
+        conn = get_db_connection(db_key)
+        cursor = None
+
+        try:
+            logger.info("Executing batch on %s database: %s", db_key, query)
+            cursor = conn.cursor()
+
+            with span("db-query"):
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+
+            result_sets = []
+            with span("db-fetch"):
+                while True:
+                    if cursor.description is not None:
+                        columns = [column[0] for column in cursor.description]
+                        result_sets.append(
+                            [dict(zip(columns, row)) for row in cursor.fetchall()]
+                        )
+                    if not cursor.nextset():
+                        break
+
+            logger.info(
+                "Batch returned %d result sets (%s rows) from %s database",
+                len(result_sets),
+                ", ".join(str(len(rows)) for rows in result_sets),
+                db_key,
+            )
+            return result_sets
+
+        except Exception as e:
+            logger.error("Batch execution error on %s database: %s", db_key, str(e))
+            raise
+        finally:
+            if cursor:
+                cursor.close()
@@ -0,0 +1,235 @@
+"""
+Database routing module.
+
+This module lets reports that accept slightly old data read from a secondary
+copy of their database instead of the primary server. Each database may have
+a read-only Availability Group replica (connected with
+ApplicationIntent=ReadOnly) and a nightly reporting copy, configured in
+DB_ROUTING. A report declares how many seconds behind the primary its data
+may be with the allow_replica decorator; its queries then go to the first
+copy whose measured lag is within that limit, and to the primary otherwise.
+The lag of the copy read is kept for the request, so caches can date the
+data they hold by it (see get_read_lag).
+"""
+
+import logging
+import threading
+import time
+from functools import wraps
+from flask import current_app, g
+
+from app.core.auth import admin_required
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Targets in order of preference for reports that accept lagged data
+PRIMARY = "primary"
+SECONDARY_TARGETS = ("reporting", "replica")
+
+# Default lag queries, run on the target itself; each returns lag_seconds
+LAG_QUERIES = {
+    # Seconds since the last transaction was redone on this secondary
+    "replica": """
+    SELECT DATEDIFF(SECOND, MAX(last_commit_time), SYSDATETIME()) AS lag_seconds
+    FROM sys.dm_hadr_database_replica_states
+    WHERE database_id = DB_ID() AND is_local = 1
+    """,
+    # Seconds since this copy was last restored
+    "reporting": """
+    SELECT DATEDIFF(SECOND, MAX(restore_date), GETDATE()) AS lag_seconds
+    FROM msdb.dbo.restorehistory
+    WHERE destination_database_name = DB_NAME()
+    """,
+}
+
+
+def get_target_settings(db_key, target):
+    """
+    Get the connection settings of a routing target.
+
+    Driver and database name default to the primary's.
+
+    Args:
+        db_key (str): The database key.
+        target (str): "primary", "replica" or "reporting".
+
+    Returns:
+        dict: driver, server, database, read_only and lag_query, or None if
+        the target is not configured.
+    """
+    config = current_app.config
+    prefix = db_key.upper()
+    primary = {
+        "driver": config[f"{prefix}_DB_DRIVER"],
+        "server": config[f"{prefix}_DB_SERVER"],
+        "database": config[f"{prefix}_DB_NAME"],
+        "read_only": False,
+        "lag_query": None,
+    }
+    if target == PRIMARY:
+        return primary
+
+    settings = config.get("DB_ROUTING", {}).get(db_key, {}).get(target) or {}
+    if not settings.get("server"):
+        return None
+    return {
+        "driver": settings.get("driver") or primary["driver"],
+        "server": settings["server"],
+        "database": settings.get("database") or primary["database"],
+        "read_only": target == "replica",
+        "lag_query": settings.get("lag_query") or LAG_QUERIES[target],
+    }
+
+
+class LagMonitor:
+    """Measured lag of each secondary target, rechecked periodically."""
+
+    def __init__(self):
+        """Initialize with no measurements."""
+        self.lock = threading.Lock()
+        self.measurements = {}
+
+    def cached(self, db_key, target):
+        """
+        Get a target's lag if it was measured in the last DB_LAG_CHECK_SECONDS.
+
+        Args:
+            db_key (str): The database key.
+            target (str): The routing target.
+
+        Returns:
+            tuple: (True if there is a recent measurement, seconds behind
+            the primary or None if it could not be measured)
+        """
+        check_seconds = current_app.config.get("DB_LAG_CHECK_SECONDS", 60)
+        with self.lock:
+            measurement = self.measurements.get((db_key, target))
+        if (
+            measurement is not None
+            and time.monotonic() - measurement[0] < check_seconds
+        ):
+            return True, measurement[1]
+        return False, None
+
+    def lag(self, db_key, target, connection, lag_query):
+        """
+        Get a target's lag behind the primary.
+
+        The lag is measured on the given connection at most once every
+        DB_LAG_CHECK_SECONDS.
+
+        Args:
+            db_key (str): The database key.
+            target (str): The routing target.
+            connection (pyodbc.Connection): A connection to the target.
+            lag_query (str): Query returning lag_seconds.
+
+        Returns:
+            float: Seconds behind the primary, or None if unknown.
+        """
+        key = (db_key, target)
+        measured, lag = self.cached(db_key, target)
+        if measured:
+            return lag
+
+        lag = None
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute(lag_query)
+            row = cursor.fetchone()
+            if row is not None and row[0] is not None:
+                lag = float(row[0])
+        except Exception as e:
+            logger.warning("Could not measure %s %s lag: %s", db_key, target, str(e))
+        finally:
+            if cursor:
+                cursor.close()
+
+        with self.lock:
+            self.measurements[key] = (time.monotonic(), lag)
+        logger.info("Measured %s %s lag: %s seconds", db_key, target, lag)
+        return lag
+
+    def get_stats(self):
+        """
+        Get the last measured lag of every target.
+
+        Returns:
+            dict: "db_key/target" to lag in seconds (None if unknown).
+        """
+        with self.lock:
+            measurements = dict(self.measurements)
+        return {
+            f"{db_key}/{target}": lag
+            for (db_key, target), (_, lag) in sorted(measurements.items())
+        }
+
+
+lag_monitor = LagMonitor()
+
+
+def get_max_lag():
+    """
+    Get the lag the current request accepts.
+
+    Returns:
+        float: Seconds, or None if the request must read from the primary.
+    """
+    if not current_app.config.get("DB_ROUTING_ENABLED", True):
+        return None
+    return g.get("max_replica_lag")
+
+
+def get_read_lag():
+    """
+    Get how far behind the primary the data read by this request may be.
+
+    Returns:
+        float: The largest lag of the secondary copies the request read
+        from since reset_read_lag, or 0 if it only read from the primary.
+    """
+    return g.get("replica_lag") or 0
+
+
+def reset_read_lag():
+    """Start measuring the lag of the data read by this request again."""
+    g.pop("replica_lag", None)
+
+
+def allow_replica(max_lag_seconds):
+    """
+    Let a view's queries read from a secondary copy of their database.
+
+    Args:
+        max_lag_seconds (float): How far behind the primary the data may be.
+
+    Returns:
+        callable: A decorator for a view function.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            g.max_replica_lag = max_lag_seconds
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def init_app(app):
+    """
+    Add an endpoint reporting the measured lag of each secondary target.
+
+    Args:
+        app (Flask): The application.
+    """
+
+    @app.route("/api/replica-lag", methods=["GET"])
+    @admin_required
+    def api_replica_lag():
+        """API endpoint with the last measured lag of each target."""
+        return {"lag_seconds": lag_monitor.get_stats()}
@@ -0,0 +1,365 @@
+"""
+Dimension cache module.
+
+This module keeps small, rarely changing lookup tables (such as the GIS asset
+layers in TOC_SDE) in memory as compact arrays keyed by asset ID, so reports
+can join them to CityWorks rows in Python instead of joining across databases
+on every request. Loaded tables are published to the shared array cache, so
+other worker processes map them instead of loading their own copies.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from flask import current_app
+
+from app.core.background import BackgroundRefresher
+from app.core.database import execute_query, stream_query
+from app.core.shared_arrays import SharedArrayStore
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+def normalize_keys(values):
+    """
+    Normalize asset IDs for matching.
+
+    SQL Server compares the IDs case-insensitively and ignores trailing
+    spaces, so keys are stripped and upper-cased on both sides of a join.
+
+    Args:
+        values (iterable): Asset IDs (None for missing).
+
+    Returns:
+        numpy.ndarray: Normalized keys as strings, with "" for missing values.
+    """
+    return np.array(
+        ["" if value is None else str(value).strip().upper() for value in values],
+        dtype=str,
+    )
+
+
+class DimensionSnapshot:
+    """
+    An immutable, loaded copy of a dimension table.
+
+    Rows are sorted by key, so lookups are binary searches. Text columns are
+    held as pandas categoricals (integer codes plus one copy of each distinct
+    value) and numeric columns as float arrays.
+    """
+
+    def __init__(self, name, keys, columns, signature=None):
+        """
+        Initialize the snapshot.
+
+        Args:
+            name (str): Dimension name, for log messages.
+            keys (numpy.ndarray): Sorted, unique, normalized keys.
+            columns (dict): Column name to array of values aligned with keys.
+            signature (tuple, optional): Change-detection signature at load time.
+        """
+        self.name = name
+        self.keys = keys
+        self.columns = columns
+        self.signature = signature
+        self.loaded_at = datetime.now()
+        # Shared array cache version this snapshot was mapped from, if any
+        self.version = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def positions(self, values):
+        """
+        Find the rows for a sequence of asset IDs.
+
+        Args:
+            values (iterable): Asset IDs to look up.
+
+        Returns:
+            tuple: (row positions, boolean mask of IDs that were found)
+        """
+        lookup = normalize_keys(values)
+        if not len(self.keys):
+            return np.zeros(len(lookup), dtype=np.int64), np.zeros(len(lookup), bool)
+
+        positions = np.searchsorted(self.keys, lookup)
+        positions = np.minimum(positions, len(self.keys) - 1)
+        found = (self.keys[positions] == lookup) & (lookup != "")
+        return positions, found
+
+    def column(self, name):
+        """
+        Get every value of a column.
+
+        Args:
+            name (str): The column name.
+
+        Returns:
+            pandas.Series: The column, indexed by normalized key.
+        """
+        return pd.Series(self.columns[name], index=self.keys, name=name)
+
+    def join(self, frame, on, columns=None, how="left"):
+        """
+        Join dimension columns onto a DataFrame by asset ID.
+
+        Args:
+            frame (pandas.DataFrame): Rows to join to.
+            on (str): Column of frame holding the asset ID.
+            columns (list, optional): Dimension columns to add. Defaults to all.
+            how (str, optional): 'left' keeps unmatched rows with missing values,
+                'inner' drops them. Defaults to 'left'.
+
+        Returns:
+            pandas.DataFrame: A copy of frame with the dimension columns added.
+        """
+        positions, found = self.positions(frame[on].tolist())
+        joined = frame.copy()
+
+        for name in columns or list(self.columns):
+            values = self.columns.get(name)
+            if values is None:
+                # Nothing loaded yet for this column (the table was empty)
+                joined[name] = None
+            elif isinstance(values, pd.Categorical):
+                codes = (
+                    np.where(found, values.codes[positions], -1)
+                    if len(values)
+                    else np.full(len(joined), -1, dtype=values.codes.dtype)
+                )
+                joined[name] = pd.Categorical.from_codes(
+                    codes, categories=values.categories
+                )
+            elif len(values):
+                joined[name] = np.where(found, values[positions], np.nan)
+            else:
+                joined[name] = np.nan
+
+        if how == "inner":
+            joined = joined[found]
+        return joined
+
+
+class DimensionTable:
+    """
+    A dimension table loaded from the database and refreshed in the background.
+
+    The first request loads it synchronously. After that, a background thread
+    checks the table's signature every GIS_DIMENSION_CHECK_SECONDS and reloads
+    it only when the signature changes, with an unconditional reload every
+    GIS_DIMENSION_RELOAD_SECONDS.
+    """
+
+    def __init__(
+        self, name, get_query, key, numeric_columns=(), get_signature_query=None
+    ):
+        """
+        Initialize the dimension.
+
+        Args:
+            name (str): Dimension name, for log messages and thread names.
+            get_query (callable): Returns (query, params, db_key) for the rows.
+            key (str): Name of the asset ID column in the query results.
+            numeric_columns (tuple, optional): Columns held as floats. Other
+                columns are held as categoricals.
+            get_signature_query (callable, optional): Returns (query, params,
+                db_key) for a single row that changes when the table changes.
+        """
+        self.name = name
+        self.get_query = get_query
+        self.key = key
+        self.numeric_columns = tuple(numeric_columns)
+        self.get_signature_query = get_signature_query
+        self.snapshot = None
+        self.load_lock = threading.Lock()
+        self.refresher = BackgroundRefresher(f"dimension-{name}")
+        self.store = SharedArrayStore(f"dimension-{name}")
+
+    def _signature(self):
+        """Return the table's current change-detection signature, if any."""
+        if self.get_signature_query is None:
+            return None
+        query, params, db_key = self.get_signature_query()
+        row = execute_query(query, params, fetch_all=False, db_key=db_key)
+        return tuple(row.values()) if row else None
+
+    def _load(self, signature):
+        """Load the table into a new snapshot."""
+        query, params, db_key = self.get_query()
+
+        columns, records = None, []
+        for columns, rows in stream_query(query, params, db_key=db_key):
+            records.extend(tuple(row) for row in rows)
+
+        frame = pd.DataFrame.from_records(records, columns=columns)
+        if frame.empty:
+            keys = np.array([], dtype=str)
+            values = {
+                name: (
+                    np.array([], dtype=float)
+                    if name in self.numeric_columns
+                    else pd.Categorical([])
+                )
+                for name in frame.columns
+                if name != self.key
+            }
+            return DimensionSnapshot(self.name, keys, values, signature)
+
+        frame["_key"] = normalize_keys(frame[self.key].tolist())
+        frame = frame[frame["_key"] != ""]
+
+        # Lookups return one row per key, where a SQL join would return every
+        # matching row, so say which keys lose rows
+        duplicated = frame["_key"].duplicated()
+        if duplicated.any():
+            keys = frame.loc[duplicated, "_key"].unique()
+            logger.warning(
+                "Dimension %s has %d duplicate %s values; keeping the first row "
+                "of each (e.g. %s)",
+                self.name,
+                len(keys),
+                self.key,
+                ", ".join(map(str, keys[:5])),
+            )
+        frame = frame[~duplicated].sort_values("_key", kind="stable")
+
+        values = {}
+        for name in frame.columns:
+            if name in ("_key", self.key):
+                continue
+            series = frame[name]
+            if name in self.numeric_columns:
+                values[name] = pd.to_numeric(series).to_numpy(dtype=float)
+            else:
+                values[name] = pd.Categorical(series.where(series.notna(), None))
+
+        return DimensionSnapshot(
+            self.name, frame["_key"].to_numpy(dtype=str), values, signature
+        )
+
+    def _publish(self, snapshot):
+        """Share a loaded snapshot with other worker processes."""
+        arrays = {"keys": snapshot.keys}
+        names = list(snapshot.columns)
+        for i, name in enumerate(names):
+            values = snapshot.columns[name]
+            if isinstance(values, pd.Categorical):
+                arrays[f"c{i}"] = values.codes
+                arrays[f"k{i}"] = np.asarray(values.categories, dtype=object)
+            else:
+                arrays[f"c{i}"] = values
+        self.store.publish(arrays, {"columns": names, "signature": snapshot.signature})
+
+    def _shared(self, signature):
+        """
+        Map a snapshot another worker published, if it is current.
+
+        A version is current when it has the table's signature and is younger
+        than GIS_DIMENSION_RELOAD_SECONDS. Without a signature, it must be
+        younger than GIS_DIMENSION_CHECK_SECONDS.
+        """
+        config = current_app.config
+        if signature is None:
+            max_age = config.get("GIS_DIMENSION_CHECK_SECONDS", 300)
+        else:
+            max_age = config.get("GIS_DIMENSION_RELOAD_SECONDS", 86400)
+
+        shared = self.store.load(max_age)
+        if shared is None or shared.meta["signature"] != signature:
+            return None
+        if self.snapshot is not None and self.snapshot.version == shared.version:
+            return self.snapshot
+
+        values = {}
+        for i, name in enumerate(shared.meta["columns"]):
+            if f"k{i}" in shared.arrays:
+                values[name] = pd.Categorical.from_codes(
+                    shared.arrays[f"c{i}"], categories=shared.arrays[f"k{i}"]
+                )
+            else:
+                values[name] = shared.arrays[f"c{i}"]
+
+        snapshot = DimensionSnapshot(
+            self.name, shared.arrays["keys"], values, signature
+        )
+        snapshot.version = shared.version
+        return snapshot
+
+    def refresh(self, full=False):
+        """
+        Reload the table if it changed, or unconditionally when full is set.
+
+        A current copy published by another worker is mapped instead of
+        reloading it. Must be called within an application context.
+
+        Args:
+            full (bool, optional): Reload without checking the signature.
+
+        Returns:
+            DimensionSnapshot: The current snapshot.
+        """
+        started = time.monotonic()
+        signature = self._signature()
+        previous = self.snapshot
+
+        if (
+            not full
+            and previous is not None
+            and signature is not None
+            and signature == previous.signature
+        ):
+            return previous
+
+        shared = self._shared(signature)
+        if shared is not None:
+            self.snapshot = shared
+            logger.info(
+                "Mapped shared dimension %s with %d rows", self.name, len(shared)
+            )
+            return self.snapshot
+
+        self.snapshot = self._load(signature)
+        logger.info(
+            "Loaded dimension %s with %d rows in %.2fs",
+            self.name,
+            len(self.snapshot),
+            time.monotonic() - started,
+        )
+        self._publish(self.snapshot)
+        return self.snapshot
+
+    def get(self):
+        """
+        Get the current snapshot, loading it on first use.
+
+        Later refreshes run in the background, so only the first call waits
+        on the database.
+
+        Returns:
+            DimensionSnapshot: The current snapshot.
+        """
+        app = current_app._get_current_object()
+
+        if self.snapshot is None:
+            with self.load_lock:
+                if self.snapshot is None:
+                    self.refresh(full=True)
+                    self.refresher.last_run = time.monotonic()
+                    self.refresher.last_full_run = self.refresher.last_run
+            return self.snapshot
+
+        full = self.refresher.is_full_due(
+            app.config.get("GIS_DIMENSION_RELOAD_SECONDS", 86400)
+        )
+        self.refresher.trigger(
+            app,
+            self.refresh,
+            app.config.get("GIS_DIMENSION_CHECK_SECONDS", 300),
+            full=full,
+        )
+        return self.snapshot
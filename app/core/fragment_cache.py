@@ -0,0 +1,157 @@
+"""
+Template fragment cache module.
+
+This module adds a {% cache %} tag to the Jinja environment that renders a
+block once and reuses the output for as long as its vary keys are unchanged:
+
+    {% cache "report_tiles", current_group_id, registry_version %}
+    ...
+    {% endcache %}
+
+The first argument names the fragment; the rest are the values the block's
+output depends on. Fragments are kept in process memory (FRAGMENT_CACHE_SIZE
+entries, least recently used first out) and are rendered on every call while
+templates are auto-reloaded (in development).
+
+It also gives Jinja a bytecode cache on disk, so new worker processes load
+compiled templates instead of compiling every template again.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from flask import current_app
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+
+from app.core.auth import admin_required
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+def _freeze(value):
+    """Convert a vary key to a hashable value."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class FragmentCache:
+    """Rendered template fragments, keyed on their name and vary keys."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self.lock = threading.Lock()
+        self.fragments = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, keys, caller):
+        """
+        Get a fragment, rendering it if it is not cached.
+
+        Must be called within an application context.
+
+        Args:
+            keys (list): The fragment's name followed by its vary keys.
+            caller (callable): Renders the fragment.
+
+        Returns:
+            Markup: The rendered fragment.
+        """
+        config = current_app.config
+        if (
+            not config.get("FRAGMENT_CACHE_ENABLED", True)
+            or current_app.jinja_env.auto_reload
+        ):
+            return caller()
+
+        key = _freeze(keys)
+        with self.lock:
+            fragment = self.fragments.get(key)
+            if fragment is not None:
+                self.fragments.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+
+        fragment = caller()
+        with self.lock:
+            self.fragments[key] = fragment
+            while len(self.fragments) > config.get("FRAGMENT_CACHE_SIZE", 256):
+                self.fragments.popitem(last=False)
+        return fragment
+
+    def clear(self):
+        """Remove every fragment."""
+        with self.lock:
+            self.fragments.clear()
+
+    def get_stats(self):
+        """
+        Get the cache's size and hit counts.
+
+        Returns:
+            dict: Number of fragments, hits and misses.
+        """
+        with self.lock:
+            return {
+                "fragments": len(self.fragments),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+fragment_cache = FragmentCache()
+
+
+class FragmentCacheExtension(Extension):
+    """Jinja extension adding the {% cache name, key, ... %} tag."""
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        """Parse a {% cache %} block into a call to the fragment cache."""
+        lineno = next(parser.stream).lineno
+        keys = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            keys.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_render", [nodes.List(keys)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render(self, keys, caller):
+        """Render the block through the fragment cache."""
+        return fragment_cache.render(keys, caller)
+
+
+def init_app(app):
+    """
+    Add the {% cache %} tag and the bytecode cache to the application's
+    templates, and an endpoint reporting fragment cache hits.
+
+    Args:
+        app (Flask): The application.
+    """
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
+    if app.config.get("JINJA_BYTECODE_CACHE_ENABLED", True):
+        directory = app.config.get("JINJA_BYTECODE_CACHE_DIR") or os.path.join(
+            app.instance_path, "jinja_bytecode"
+        )
+        try:
+            os.makedirs(directory, exist_ok=True)
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+        except OSError as e:
+            logger.warning("Jinja bytecode cache disabled: %s", str(e))
+
+    @app.route("/api/fragment-cache", methods=["GET"])
+    @admin_required
+    def api_fragment_cache():
+        """API endpoint with the template fragment cache's hit counts."""
+        return {"fragment_cache": fragment_cache.get_stats()}
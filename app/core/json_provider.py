@@ -0,0 +1,154 @@
+"""
+JSON provider module.
+
+This module replaces Flask's JSON serialization with orjson, which encodes
+report rows several times faster than the standard library. Dates and times
+are written in ISO 8601 format, Decimals as strings (as Flask does, so no
+precision is lost) and bytes as base64, so routes can return query results
+without converting their values first. Keys are sorted, as with Flask's
+default provider. Falls back to the standard library when orjson is not
+installed, with the same formats.
+"""
+
+import base64
+import dataclasses
+import decimal
+import logging
+import uuid
+from flask.json.provider import DefaultJSONProvider
+
+from app.core.columnar import columnar_requested, count_rows, shape_payload
+from app.core.timing import add_rows, span
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+def _default(o):
+    """
+    Convert a value neither encoder serializes natively.
+
+    Args:
+        o: The value.
+
+    Returns:
+        A JSON-serializable value.
+
+    Raises:
+        TypeError: If the value cannot be serialized.
+    """
+    if hasattr(o, "isoformat"):
+        # date, datetime and time, including pandas Timestamps
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if isinstance(o, (bytes, bytearray, memoryview)):
+        return base64.b64encode(o).decode("ascii")
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    if hasattr(o, "item"):
+        # NumPy scalars
+        return o.item()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider encoding with orjson."""
+
+    default = staticmethod(_default)
+
+    def _options(self, response=False):
+        """
+        Get the orjson options matching this provider's settings.
+
+        Args:
+            response (bool, optional): Whether the document is a response
+                body, which is indented in debug mode as Flask does. Defaults
+                to False.
+
+        Returns:
+            int: The orjson option flags.
+        """
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if response:
+            compact = self.compact
+            if compact is None:
+                compact = not self._app.debug
+            if not compact:
+                options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        """
+        Serialize data as JSON.
+
+        Keyword arguments other than default are passed to the standard
+        library encoder, which orjson does not support.
+
+        Args:
+            obj: The data to serialize.
+            **kwargs: Passed to json.dumps.
+
+        Returns:
+            str: The JSON document.
+        """
+        if orjson is None or set(kwargs) - {"default"}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(
+            obj, default=kwargs.get("default", _default), option=self._options()
+        ).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        """
+        Deserialize data as JSON.
+
+        Args:
+            s (str or bytes): The JSON document.
+            **kwargs: Passed to json.loads.
+
+        Returns:
+            The deserialized data.
+        """
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """
+        Serialize data as a JSON response, as flask.jsonify does.
+
+        Lists of rows are sent in columnar form when the request asks for it.
+
+        Returns:
+            Response: The response, with the document encoded once as bytes.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        add_rows(count_rows(obj))
+        with span("serialize"):
+            if columnar_requested():
+                obj = shape_payload(obj)
+            if orjson is None:
+                return super().response(obj)
+            body = orjson.dumps(obj, default=_default, option=self._options(True))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def init_app(app):
+    """
+    Use the fast JSON provider for the application.
+
+    Args:
+        app (Flask): The application.
+    """
+    if orjson is None:
+        logger.warning("orjson is not installed; using the standard JSON encoder")
+    app.json = FastJSONProvider(app)
@@ -3,14 +3,32 @@ Navigation helper module.
 
 This module provides functionality for generating navigation data
 for the application templates using the centralized report registry.
+The registry only changes at startup, so the template context and the
+navbar menu are built once per registry version and reused on every render.
 """
 
 import logging
-from app.core.report_registry import get_all_groups
+import threading
+from flask import current_app
+from jinja2.utils import htmlsafe_json_dumps
+from markupsafe import Markup
+
+from app.core.report_registry import (
+    get_all_groups,
+    get_all_reports,
+    get_group_reports,
+    get_registry_snapshot,
+)
+from app.core.template_helpers import get_blueprint_group_id
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# (registry version, value) pairs, rebuilt when the registry changes
+_context = None
+_navbar = None
+_lock = threading.Lock()
+
 
 def get_navigation_data():
     """
@@ -20,7 +38,7 @@ def get_navigation_data():
     containing groups and their associated reports.
 
     Returns:
-        list: A list of dictionaries containing navigation data.
+        tuple: Group dictionaries, each with its reports.
     """
     try:
         # Simply retrieve from the central registry
@@ -33,3 +51,74 @@ def get_navigation_data():
         logger.error("Error generating navigation data: %s", str(e))
         # Return empty list in case of error
         return []
+
+
+def render_navbar_menu():
+    """
+    Render the report group menus of the main navbar.
+
+    The menu is rendered once per registry version, or on every call while
+    templates are auto-reloaded (in development). Must be called within an
+    application context.
+
+    Returns:
+        Markup: The menu's HTML.
+    """
+    global _navbar
+    snapshot = get_registry_snapshot()
+    jinja_env = current_app.jinja_env
+
+    cached = _navbar
+    if (
+        cached is not None
+        and cached[0] == snapshot.version
+        and not jinja_env.auto_reload
+    ):
+        return cached[1]
+
+    template = jinja_env.get_template("components/navbar_menu.html")
+    menu = Markup(template.render(groups=snapshot.groups))
+    with _lock:
+        _navbar = (snapshot.version, menu)
+    return menu
+
+
+def get_navigation_context():
+    """
+    Get the registry and navigation values every template receives.
+
+    Built once per registry version. Must be called within an application
+    context.
+
+    Returns:
+        dict: Template context values.
+    """
+    global _context
+    snapshot = get_registry_snapshot()
+
+    cached = _context
+    if cached is not None and cached[0] == snapshot.version:
+        return cached[1]
+
+    context = {
+        "registry_version": snapshot.version,
+        "nav_groups": snapshot.groups,
+        "all_reports": snapshot.reports,
+        # Same output as get_all_reports() | tojson, serialized once
+        "all_reports_json": htmlsafe_json_dumps(
+            snapshot.reports, dumps=current_app.json.dumps
+        ),
+        "report_registry": {
+            "groups": snapshot.groups,
+            "all_reports": snapshot.reports,
+        },
+        "get_all_groups": get_all_groups,
+        "get_all_reports": get_all_reports,
+        "get_group_reports": get_group_reports,
+        "get_blueprint_group_id": get_blueprint_group_id,
+        "navbar_menu": render_navbar_menu,
+    }
+    with _lock:
+        _context = (snapshot.version, context)
+    logger.info("Built navigation context for registry version %d", snapshot.version)
+    return context
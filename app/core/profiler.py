@@ -0,0 +1,316 @@
+"""
+Request profiler module.
+
+This module profiles single requests in production. An administrator adds
+?__profile=1 to a URL (or sends an X-Profile: 1 header) and the request runs
+with a sampling profiler: a background thread records the request thread's
+call stack every PROFILER_INTERVAL_MS. The samples are saved in speedscope's
+file format (open them at https://www.speedscope.app for a flame graph) in
+the profiles directory, and listed on the admin profiles page with their
+route and duration. Requests without the flag are not sampled at all.
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from flask import current_app, g, request, url_for
+
+from app.core.auth import is_admin
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Profile IDs are generated by this module; anything else is refused
+PROFILE_ID = re.compile(r"^[0-9T]+-\d+$")
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class Sampler(threading.Thread):
+    """Background thread sampling another thread's call stack."""
+
+    def __init__(self, thread_id, interval):
+        """
+        Set up the sampler.
+
+        Args:
+            thread_id (int): The identifier of the thread to sample.
+            interval (float): Seconds between samples.
+        """
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def run(self):
+        """Sample the thread's stack until stopped or the thread exits."""
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append((time.perf_counter(), tuple(stack)))
+
+    def stop(self):
+        """Stop sampling and wait for the thread to finish."""
+        self.finished = time.perf_counter()
+        self.stopped.set()
+        self.join()
+
+    @property
+    def duration_ms(self):
+        """float: Milliseconds between starting and stopping the sampler."""
+        return ((self.finished or time.perf_counter()) - self.started) * 1000
+
+
+def to_speedscope(sampler, name):
+    """
+    Convert a sampler's samples to a speedscope document.
+
+    Each sample is weighted by the time since the one before it.
+
+    Args:
+        sampler (Sampler): The stopped sampler.
+        name (str): The profile name shown in speedscope.
+
+    Returns:
+        dict: The speedscope document.
+    """
+    frames = []
+    frame_ids = {}
+    samples = []
+    weights = []
+    previous = sampler.started
+    for sampled_at, stack in sampler.samples:
+        ids = []
+        for key in stack:
+            if key not in frame_ids:
+                frame_ids[key] = len(frames)
+                frames.append({"name": key[0], "file": key[1], "line": key[2]})
+            ids.append(frame_ids[key])
+        samples.append(ids)
+        weights.append((sampled_at - previous) * 1000)
+        previous = sampled_at
+
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA,
+        "name": name,
+        "activeProfileIndex": 0,
+        "exporter": "Clayton DataForge",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+
+
+def get_profiles_dir():
+    """
+    Get the directory profiles are saved in.
+
+    Returns:
+        str: PROFILES_DIR, or the profiles directory in the instance folder.
+    """
+    return current_app.config.get("PROFILES_DIR") or os.path.join(
+        current_app.instance_path, "profiles"
+    )
+
+
+def save_profile(directory, sampler, info, keep):
+    """
+    Save a profile and its details, and remove the oldest beyond keep.
+
+    Args:
+        directory (str): The profiles directory.
+        sampler (Sampler): The stopped sampler.
+        info (dict): The request's details (id, method, path, endpoint,
+            status, created).
+        keep (int): The number of profiles to keep.
+    """
+    info = dict(
+        info, duration_ms=round(sampler.duration_ms, 1), samples=len(sampler.samples)
+    )
+    name = f"{info['method']} {info['path']} ({info['duration_ms']:.0f} ms)"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(_profile_file(directory, info["id"]), "w") as f:
+            json.dump(to_speedscope(sampler, name), f)
+        with open(_info_file(directory, info["id"]), "w") as f:
+            json.dump(info, f)
+        logger.info("Saved profile %s: %s", info["id"], name)
+    except OSError as e:
+        logger.error("Error saving profile %s: %s", info["id"], str(e))
+        return
+
+    for old in list_profiles(directory)[keep:]:
+        for path in (
+            _profile_file(directory, old["id"]),
+            _info_file(directory, old["id"]),
+        ):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def list_profiles(directory=None):
+    """
+    List the saved profiles, newest first.
+
+    Args:
+        directory (str, optional): The profiles directory. Defaults to the
+            current application's.
+
+    Returns:
+        list: The details saved with each profile.
+    """
+    directory = directory or get_profiles_dir()
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+
+    profiles = []
+    for name in names:
+        if name.endswith(".info.json"):
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return sorted(profiles, key=lambda info: info["id"], reverse=True)
+
+
+def get_profile_path(profile_id):
+    """
+    Get the speedscope file of a saved profile.
+
+    Args:
+        profile_id (str): The profile ID.
+
+    Returns:
+        str: The file path, or None if there is no such profile.
+    """
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = _profile_file(get_profiles_dir(), profile_id)
+    return path if os.path.exists(path) else None
+
+
+def _profile_file(directory, profile_id):
+    """Get the path of a profile's speedscope file."""
+    return os.path.join(directory, f"{profile_id}.speedscope.json")
+
+
+def _info_file(directory, profile_id):
+    """Get the path of a profile's details file."""
+    return os.path.join(directory, f"{profile_id}.info.json")
+
+
+def _profile_requested():
+    """Whether the current request asks to be profiled."""
+    return (
+        request.args.get("__profile") == "1" or request.headers.get("X-Profile") == "1"
+    )
+
+
+def _start_profile():
+    """Start sampling the request if an administrator asked for it."""
+    if not _profile_requested() or not current_app.config.get(
+        "PROFILER_ENABLED", True
+    ):
+        return
+    if not is_admin():
+        logger.warning(
+            "Refused to profile %s for %s", request.path, request.remote_addr
+        )
+        return
+
+    interval = current_app.config.get("PROFILER_INTERVAL_MS", 5) / 1000
+    sampler = Sampler(threading.get_ident(), interval)
+    sampler.start()
+    g.profiler = sampler
+
+
+def _finish_profile(response):
+    """
+    Stop sampling and save the profile.
+
+    Streamed responses are sampled until their last chunk is sent.
+
+    Args:
+        response (Response): The response.
+
+    Returns:
+        Response: The same response, with the profile's URL in X-Profile.
+    """
+    sampler = g.pop("profiler", None)
+    if sampler is None:
+        return response
+
+    now = datetime.now()
+    info = {
+        "id": f"{now.strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}",
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "created": now.isoformat(timespec="seconds"),
+    }
+    directory = get_profiles_dir()
+    keep = current_app.config.get("PROFILER_KEEP", 50)
+
+    def save():
+        sampler.stop()
+        save_profile(directory, sampler, info, keep)
+
+    if response.is_streamed:
+        response.call_on_close(save)
+    else:
+        save()
+    response.headers["X-Profile"] = url_for(
+        "groups.download_profile", profile_id=info["id"]
+    )
+    return response
+
+
+def _stop_profile(exc=None):
+    """Stop a sampler left running by a request that failed."""
+    sampler = g.pop("profiler", None)
+    if sampler is not None:
+        sampler.stop()
+
+
+def init_app(app):
+    """
+    Profile requests flagged by administrators.
+
+    Register right after request timing, so the profile covers the other
+    after_request handlers.
+
+    Args:
+        app (Flask): The application.
+    """
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_stop_profile)
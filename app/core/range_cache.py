@@ -0,0 +1,249 @@
+"""
+Date range cache module.
+
+This module caches report rows in per-day (or per-month) partitions, so a
+report can serve any date range from the partitions it already holds and
+only query the database for partitions it has not seen yet, or that are
+recent enough that their rows may still change. Partitions read from a
+secondary copy (see db_routing) that lags past them are not cached either.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from flask import current_app
+
+from app.core.cache import TTLCache
+from app.core.db_routing import get_read_lag, reset_read_lag
+from app.core.timing import record_cache
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+PARTITIONS = ("day", "month")
+
+
+def as_datetime(value):
+    """
+    Convert a row's date value to a naive datetime.
+
+    Args:
+        value: A datetime, date or ISO date string from a query result.
+
+    Returns:
+        datetime: The value, or None if it is missing or not a date.
+    """
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, date):
+        return datetime.combine(value, time.min)
+    if isinstance(value, str) and value.strip():
+        try:
+            return datetime.fromisoformat(value.strip()[:19])
+        except ValueError:
+            return None
+    return None
+
+
+def sort_value(value):
+    """
+    Build a sort key that orders values the way SQL Server does.
+
+    NULLs sort before other values and text is compared case-insensitively.
+
+    Args:
+        value: A column value.
+
+    Returns:
+        tuple: A key usable with sorted().
+    """
+    if isinstance(value, str):
+        value = value.casefold()
+    return (value is not None, value)
+
+
+class RangeCache:
+    """
+    Rows for a date range query, cached in date partitions.
+
+    A request for a range is split into partitions. Closed partitions (older
+    than RANGE_CACHE_OPEN_DAYS) are served from the cache when present, and
+    each run of consecutive missing or open partitions is loaded with one
+    query. The rows are then combined, trimmed to the requested range and
+    sorted to match the original query's ORDER BY.
+    """
+
+    def __init__(self, name, fetch, date_key, order_by=(), partition="day"):
+        """
+        Initialize the cache.
+
+        Args:
+            name (str): Cache name, for log messages.
+            fetch (callable): Called as fetch(start_date, end_date, *filters)
+                and returns the rows for that range.
+            date_key: Key or index of the date column that partitions the rows.
+            order_by (tuple, optional): (column, descending) pairs to sort the
+                combined rows by. A column is a row key or a callable that
+                returns the value to sort on.
+            partition (str, optional): 'day' or 'month'. Defaults to 'day'.
+
+        Raises:
+            ValueError: If partition is not 'day' or 'month'.
+        """
+        if partition not in PARTITIONS:
+            raise ValueError(f"Unsupported partition: {partition}")
+
+        self.name = name
+        self.fetch = fetch
+        self.date_key = date_key
+        self.order_by = tuple(order_by)
+        self.partition = partition
+        self.cache = TTLCache()
+
+    def partition_start(self, day):
+        """Return the first day of the partition containing a date."""
+        return day.replace(day=1) if self.partition == "month" else day
+
+    def _next_start(self, start):
+        """Return the first day of the partition after the one at start."""
+        if self.partition == "month":
+            return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return start + timedelta(days=1)
+
+    def _bounds(self, start):
+        """Return the first and last query timestamps of a partition."""
+        last_day = self._next_start(start) - timedelta(days=1)
+        return (
+            datetime.combine(start, time.min),
+            datetime.combine(last_day, time(23, 59, 59)),
+        )
+
+    def _is_open(self, start, open_from):
+        """Check whether a partition is recent enough that it may still change."""
+        return self._next_start(start) > open_from
+
+    def _fetch_run(self, run, filters):
+        """Load a run of consecutive partitions with one query."""
+        first, _ = self._bounds(run[0])
+        _, last = self._bounds(run[-1])
+
+        buckets = {start: [] for start in run}
+        for row in self.fetch(first, last, *filters):
+            value = as_datetime(row[self.date_key])
+            if value is None:
+                continue
+            bucket = buckets.get(self.partition_start(value.date()))
+            if bucket is not None:
+                bucket.append(row)
+        return buckets
+
+    def _sort(self, rows):
+        """Sort rows in place by each order_by column, last column first."""
+        for column, descending in reversed(self.order_by):
+            get = column if callable(column) else (lambda row, key=column: row[key])
+            rows.sort(key=lambda row: sort_value(get(row)), reverse=descending)
+        return rows
+
+    def get(self, start_date, end_date, *filters):
+        """
+        Get the rows for a date range.
+
+        Must be called within an application context. Rows that are dictionaries
+        are copied, so callers may modify them without changing the cache.
+
+        Args:
+            start_date (datetime): Start of the range.
+            end_date (datetime): End of the range (inclusive).
+            *filters: Other query arguments, passed to fetch after the dates.
+                They must be hashable and are part of the cache key.
+
+        Returns:
+            list: The rows in the range, in order_by order.
+        """
+        start_date = start_date.replace(tzinfo=None)
+        end_date = end_date.replace(tzinfo=None)
+
+        config = current_app.config
+        ttl = config.get("RANGE_CACHE_SECONDS", 86400)
+        if ttl <= 0 or start_date > end_date:
+            return self._sort(list(self.fetch(start_date, end_date, *filters)))
+
+        self.cache.resize(config.get("RANGE_CACHE_SIZE", 4000), ttl)
+        open_from = date.today() - timedelta(
+            days=config.get("RANGE_CACHE_OPEN_DAYS", 2)
+        )
+
+        # Serve closed partitions from the cache, collecting the rest
+        partitions, missing = {}, []
+        start = self.partition_start(start_date.date())
+        while start <= end_date.date():
+            rows = None
+            if not self._is_open(start, open_from):
+                rows = self.cache.get((filters, start))
+            if rows is None:
+                missing.append(start)
+            else:
+                partitions[start] = rows
+            start = self._next_start(start)
+        # One lookup per request: a hit only if no partition has to be loaded
+        record_cache(not missing)
+
+        # Load each run of consecutive missing partitions with one query
+        runs = []
+        for start in missing:
+            if runs and self._next_start(runs[-1][-1]) == start:
+                runs[-1].append(start)
+            else:
+                runs.append([start])
+
+        for run in runs:
+            reset_read_lag()
+            buckets = self._fetch_run(run, filters)
+            # Days the copy read from is still catching up on are open too
+            complete_from = min(
+                open_from,
+                (datetime.now() - timedelta(seconds=get_read_lag())).date(),
+            )
+            for start, rows in buckets.items():
+                partitions[start] = tuple(rows)
+                if not self._is_open(start, complete_from):
+                    self.cache.set((filters, start), partitions[start])
+
+        logger.debug(
+            "Range cache %s: %d partitions cached, %d loaded in %d queries",
+            self.name,
+            len(partitions) - len(missing),
+            len(missing),
+            len(runs),
+        )
+
+        results = []
+        for start in sorted(partitions):
+            for row in partitions[start]:
+                if start_date <= as_datetime(row[self.date_key]) <= end_date:
+                    results.append(dict(row) if isinstance(row, dict) else row)
+        return self._sort(results)
+
+    def invalidate(self):
+        """Drop every cached partition."""
+        self.cache.invalidate()
+
+    def invalidate_open(self):
+        """
+        Drop the cached partitions that are open, after their source table
+        changed.
+
+        Closed partitions are kept until RANGE_CACHE_SECONDS expires them, so
+        a write to the table does not reload years of history. Must be called
+        within an application context.
+        """
+        open_from = date.today() - timedelta(
+            days=current_app.config.get("RANGE_CACHE_OPEN_DAYS", 2)
+        )
+        with self.cache.lock:
+            keys = list(self.cache.entries)
+        dropped = 0
+        for key in keys:
+            if self._is_open(key[1], open_from):
+                self.cache.invalidate(key)
+                dropped += 1
+        logger.debug("Range cache %s: dropped %d open partitions", self.name, dropped)
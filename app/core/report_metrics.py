@@ -0,0 +1,403 @@
+"""
+Report metrics module.
+
+This module keeps per-report request metrics for the report performance page,
+so the slowest and busiest reports can be found and optimized first. Each
+request to a report's blueprint is added to a rolling window of
+REPORT_METRICS_WINDOW_SECONDS, kept in this worker process: its latency (in a
+log-linear histogram like HdrHistogram's, for percentiles), rows sent,
+response size, cache lookups, whether it failed, and its parameters if it is
+among the slowest. Latency, rows and cache lookups come from the request's
+timing (see app.core.timing).
+"""
+
+import heapq
+import logging
+import math
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from urllib.parse import urlencode
+from flask import current_app, g, request
+
+from app.core.auth import admin_required
+from app.core.report_registry import get_all_reports
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Latencies are kept to about 3% (32 sub-buckets per power of two)
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+# The window is kept in this many slices, dropped as they fall out of it
+WINDOW_SLICES = 15
+# Request arguments that do not change what a report returns
+IGNORED_ARGS = {"_", "__profile", "shape"}
+
+
+def _bucket(value):
+    """
+    Get the histogram bucket of a value.
+
+    Values below 2 * SUB_BUCKETS have a bucket each; above that, each power
+    of two is split into SUB_BUCKETS buckets.
+
+    Args:
+        value (int): The value (microseconds).
+
+    Returns:
+        int: The bucket index.
+    """
+    if value < 2 * SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+
+def _bucket_value(index):
+    """
+    Get the middle of a histogram bucket.
+
+    Args:
+        index (int): The bucket index.
+
+    Returns:
+        float: The middle value of the bucket (microseconds).
+    """
+    if index < 2 * SUB_BUCKETS:
+        return float(index)
+    shift = index // SUB_BUCKETS - 1
+    low = (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+    return low + (1 << shift) / 2
+
+
+class LatencyHistogram:
+    """Latency histogram with log-linear buckets, as in HdrHistogram."""
+
+    def __init__(self):
+        """Create an empty histogram."""
+        self.counts = Counter()
+        self.count = 0
+        self.total_ms = 0.0
+
+    def record(self, ms):
+        """
+        Add a latency.
+
+        Args:
+            ms (float): The latency in milliseconds.
+        """
+        self.counts[_bucket(max(0, int(ms * 1000)))] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def merge(self, other):
+        """
+        Add another histogram's latencies to this one.
+
+        Args:
+            other (LatencyHistogram): The histogram to add.
+        """
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total_ms += other.total_ms
+
+    def percentile(self, percent):
+        """
+        Get a latency percentile.
+
+        Args:
+            percent (float): The percentile, such as 95.
+
+        Returns:
+            float: The latency in milliseconds, or None if there are none.
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return _bucket_value(index) / 1000
+        return None
+
+
+class ReportCounts:
+    """The metrics of one report over part of the window."""
+
+    def __init__(self):
+        """Create empty metrics."""
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.rows = 0
+        self.payload_bytes = 0
+        self.payloads = 0
+        self.cache_hits = 0
+        self.cache_lookups = 0
+        self.slowest = []
+
+    def merge(self, other, slowest):
+        """
+        Add another report's metrics to these.
+
+        Args:
+            other (ReportCounts): The metrics to add.
+            slowest (int): The number of slowest requests to keep.
+        """
+        self.latency.merge(other.latency)
+        self.errors += other.errors
+        self.rows += other.rows
+        self.payload_bytes += other.payload_bytes
+        self.payloads += other.payloads
+        self.cache_hits += other.cache_hits
+        self.cache_lookups += other.cache_lookups
+        self.slowest = heapq.nlargest(slowest, self.slowest + other.slowest)
+
+
+class ReportMetrics:
+    """Per-report request metrics over a rolling window."""
+
+    def __init__(self, window_seconds=900, slowest=5):
+        """
+        Initialize the metrics.
+
+        Args:
+            window_seconds (int, optional): Seconds of requests kept.
+                Defaults to 900.
+            slowest (int, optional): Slowest requests kept per report.
+                Defaults to 5.
+        """
+        self.window_seconds = window_seconds
+        self.slowest = slowest
+        self.lock = threading.Lock()
+        self.slices = deque()
+
+    @property
+    def slice_seconds(self):
+        """float: Seconds covered by each slice of the window."""
+        return self.window_seconds / WINDOW_SLICES
+
+    def _drop_old(self, now):
+        """Drop the slices that have fallen out of the window."""
+        while self.slices and self.slices[0][0] <= now - self.window_seconds:
+            self.slices.popleft()
+
+    def observe(
+        self,
+        report_key,
+        ms,
+        error,
+        rows,
+        payload_bytes,
+        cache_hits,
+        cache_misses,
+        params,
+        now=None,
+    ):
+        """
+        Add a request to a report's metrics.
+
+        Args:
+            report_key (tuple): The report's (group ID, report ID).
+            ms (float): The request's latency in milliseconds.
+            error (bool): Whether the request failed.
+            rows (int): Rows sent in the response.
+            payload_bytes (int): The response size, or None if unknown.
+            cache_hits (int): Cache lookups that found their value.
+            cache_misses (int): Cache lookups that did not.
+            params (str): The request's endpoint and arguments.
+            now (float, optional): The time. Defaults to time.time().
+        """
+        now = time.time() if now is None else now
+        start = now - now % self.slice_seconds
+        with self.lock:
+            if not self.slices or self.slices[-1][0] != start:
+                self.slices.append((start, {}))
+            self._drop_old(now)
+            counts = self.slices[-1][1].setdefault(report_key, ReportCounts())
+
+            counts.latency.record(ms)
+            counts.errors += int(error)
+            counts.rows += rows
+            if payload_bytes is not None:
+                counts.payload_bytes += payload_bytes
+                counts.payloads += 1
+            counts.cache_hits += cache_hits
+            counts.cache_lookups += cache_hits + cache_misses
+            slow = (round(ms, 1), params, datetime.now().isoformat(timespec="seconds"))
+            if len(counts.slowest) < self.slowest:
+                heapq.heappush(counts.slowest, slow)
+            elif slow > counts.slowest[0]:
+                heapq.heapreplace(counts.slowest, slow)
+
+    def get_stats(self, now=None):
+        """
+        Get each report's metrics over the window.
+
+        Args:
+            now (float, optional): The time. Defaults to time.time().
+
+        Returns:
+            dict: (group ID, report ID) to a dictionary of metrics.
+        """
+        now = time.time() if now is None else now
+        merged = {}
+        with self.lock:
+            self._drop_old(now)
+            covered = now - self.slices[0][0] if self.slices else 0
+            for _, reports in self.slices:
+                for report_key, counts in reports.items():
+                    merged.setdefault(report_key, ReportCounts()).merge(
+                        counts, self.slowest
+                    )
+
+        covered = max(covered, 1)
+        stats = {}
+        for report_key, counts in merged.items():
+            latency = counts.latency
+            stats[report_key] = {
+                "requests": latency.count,
+                "requests_per_minute": latency.count * 60 / covered,
+                "p50_ms": latency.percentile(50),
+                "p95_ms": latency.percentile(95),
+                "p99_ms": latency.percentile(99),
+                "total_seconds": latency.total_ms / 1000,
+                "avg_rows": counts.rows / latency.count,
+                "avg_payload_bytes": (
+                    counts.payload_bytes / counts.payloads if counts.payloads else None
+                ),
+                "cache_hit_ratio": (
+                    counts.cache_hits / counts.cache_lookups
+                    if counts.cache_lookups
+                    else None
+                ),
+                "error_rate": counts.errors / latency.count,
+                "slowest": [
+                    {"ms": ms, "params": params, "at": at}
+                    for ms, params, at in sorted(counts.slowest, reverse=True)
+                ],
+            }
+        return stats
+
+    def reset(self):
+        """Drop every recorded request."""
+        with self.lock:
+            self.slices.clear()
+
+
+# Global metrics instance, configured in init_app
+report_metrics = ReportMetrics()
+
+# Blueprint names to the (group ID, report ID) they serve
+_report_keys = {}
+
+
+def _report_key(blueprint, path):
+    """
+    Get the report a blueprint serves, from the registered report URLs.
+
+    Shared reports are one blueprint registered under several groups, so
+    reports are matched by URL rather than by blueprint metadata.
+
+    Args:
+        blueprint (str): The blueprint name.
+        path (str): The request path.
+
+    Returns:
+        tuple: (group ID, report ID), or None if it is not a report.
+    """
+    if blueprint not in _report_keys:
+        matches = [
+            report
+            for report in get_all_reports()
+            if path.startswith(report["url"].rstrip("/") + "/")
+            or path == report["url"].rstrip("/")
+        ]
+        report = max(matches, key=lambda report: len(report["url"]), default=None)
+        _report_keys[blueprint] = (
+            (report["group_id"], report["id"]) if report is not None else None
+        )
+    return _report_keys[blueprint]
+
+
+def _request_params():
+    """Describe the current request's endpoint and report arguments."""
+    query = urlencode(
+        [
+            (key, value)
+            for key, value in request.args.items(multi=True)
+            if key not in IGNORED_ARGS
+        ]
+    )
+    endpoint = request.endpoint.rsplit(".", 1)[-1]
+    return f"{endpoint}?{query}" if query else endpoint
+
+
+def _observe_request(response):
+    """
+    Add a report request to the metrics.
+
+    Runs after each request, after compression, so the response size is the
+    size sent.
+
+    Args:
+        response (Response): The response.
+
+    Returns:
+        Response: The same response.
+    """
+    timing = g.get("request_timing")
+    if (
+        timing is None
+        or request.blueprint is None
+        or request.endpoint is None
+        or not current_app.config.get("REPORT_METRICS_ENABLED", True)
+    ):
+        return response
+    report_key = _report_key(request.blueprint, request.path)
+    if report_key is None:
+        return response
+
+    report_metrics.observe(
+        report_key,
+        timing.breakdown()["total"][0],
+        response.status_code >= 500,
+        timing.rows,
+        None if response.is_streamed else response.content_length,
+        timing.cache_hits,
+        timing.cache_misses,
+        _request_params(),
+    )
+    return response
+
+
+def init_app(app):
+    """
+    Keep report metrics for the application, and add an endpoint reporting
+    them.
+
+    Register before compression, so the response size is the compressed one
+    (after_request handlers run in reverse order).
+
+    Args:
+        app (Flask): The application.
+    """
+    report_metrics.window_seconds = app.config.get(
+        "REPORT_METRICS_WINDOW_SECONDS", 900
+    )
+    report_metrics.slowest = app.config.get("REPORT_METRICS_SLOWEST", 5)
+    app.after_request(_observe_request)
+
+    @app.route("/api/report-metrics", methods=["GET"])
+    @admin_required
+    def api_report_metrics():
+        """API endpoint with each report's metrics in this worker."""
+        return {
+            "window_seconds": report_metrics.window_seconds,
+            "reports": [
+                dict(stats, group_id=group_id, report_id=report_id)
+                for (group_id, report_id), stats in report_metrics.get_stats().items()
+            ],
+        }
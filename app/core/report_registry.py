@@ -4,10 +4,18 @@ Report Registry Module.
 
 This module provides a centralized registry for all application reports.
 It serves as a single source of truth for dashboards, navigation, and search.
+
+Registration happens at startup. Lookups are served from an immutable,
+indexed snapshot of the registry, which is rebuilt only when a group or
+report is registered, and which also holds the pre-serialized /api/reports
+payload and its ETag.
 """
 
+import hashlib
 import logging
+import threading
 from collections import defaultdict
+from flask import Response, current_app, request
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -16,6 +24,129 @@ logger = logging.getLogger(__name__)
 _groups_registry = {}
 _reports_registry = defaultdict(list)
 
+# Incremented on every registration; snapshots are built per version
+_version = 0
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+class FrozenDict(dict):
+    """A dictionary that cannot be modified, for shared registry entries."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Registry entries cannot be modified")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+
+class RegistrySnapshot:
+    """
+    An immutable, indexed copy of the registry at one version.
+
+    Groups and reports are frozen copies; collections are tuples. Reports are
+    indexed by ID and by every group they are visible in.
+    """
+
+    def __init__(self, version):
+        """
+        Build the snapshot from the current registrations.
+
+        Args:
+            version (int): The registry version being captured.
+        """
+        self.version = version
+
+        frozen = {}
+        reports = []
+        for group_reports in _reports_registry.values():
+            for report in group_reports:
+                copy = dict(report)
+                copy["visible_in"] = tuple(report["visible_in"])
+                frozen[id(report)] = FrozenDict(copy)
+                reports.append(frozen[id(report)])
+        self.reports = tuple(reports)
+
+        groups = []
+        for group in _groups_registry.values():
+            copy = dict(group)
+            copy["reports"] = tuple(
+                frozen.get(id(report)) or FrozenDict(report)
+                for report in group["reports"]
+            )
+            groups.append(FrozenDict(copy))
+        self.groups = tuple(groups)
+        self.groups_by_id = {group["id"]: group for group in self.groups}
+
+        # The first report registered under an ID wins, as in the dashboards
+        self.reports_by_id = {}
+        visible = defaultdict(dict)
+        for report in self.reports:
+            self.reports_by_id.setdefault(report["id"], report)
+            for group_id in report["visible_in"]:
+                visible[group_id].setdefault(report["id"], report)
+        self.visible_reports = {
+            group_id: tuple(group_reports.values())
+            for group_id, group_reports in visible.items()
+        }
+
+        self._reports_json = None
+
+    def reports_json(self):
+        """
+        Get the /api/reports payload, serialized once per snapshot.
+
+        Must be called within an application context.
+
+        Returns:
+            tuple: (JSON bytes, strong ETag)
+        """
+        if self._reports_json is None:
+            body = current_app.json.dumps({"reports": self.reports}).encode("utf-8")
+            self._reports_json = (body, hashlib.sha256(body).hexdigest())
+        return self._reports_json
+
+
+def _changed():
+    """Record that the registry changed, so the next lookup rebuilds it."""
+    global _version
+    _version += 1
+
+
+def get_registry_snapshot():
+    """
+    Get the snapshot of the registry at its current version.
+
+    Returns:
+        RegistrySnapshot: The snapshot, built on first use after a change.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == _version:
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot.version != _version:
+            _snapshot = RegistrySnapshot(_version)
+        return _snapshot
+
+
+def freeze_registry():
+    """
+    Build the registry snapshot now rather than on the first request.
+
+    Returns:
+        RegistrySnapshot: The snapshot.
+    """
+    snapshot = get_registry_snapshot()
+    logger.info(
+        "Froze report registry version %d with %d groups and %d reports",
+        snapshot.version,
+        len(snapshot.groups),
+        len(snapshot.reports),
+    )
+    return snapshot
+
 
 def register_group(group_id, name, url, description=None, icon=None, enabled=True):
     """
@@ -43,6 +174,7 @@ def register_group(group_id, name, url, description=None, icon=None, enabled=Tru
     }
 
     _groups_registry[group_id] = group_data
+    _changed()
     logger.info("Registered report group: %s", group_id)
     return group_data
 
@@ -107,6 +239,7 @@ def register_report(
 
     # Also add to the group's reports list for easy access
     _groups_registry[group_id]["reports"].append(report_data)
+    _changed()
 
     logger.info("Registered report: %s in group %s", report_id, group_id)
     return report_data
@@ -117,9 +250,9 @@ def get_all_groups():
     Get all registered report groups.
 
     Returns:
-        list: List of all group data dictionaries
+        tuple: All group data dictionaries (read-only)
     """
-    return list(_groups_registry.values())
+    return get_registry_snapshot().groups
 
 
 def get_group(group_id):
@@ -130,9 +263,22 @@ def get_group(group_id):
         group_id (str): The group ID to retrieve
 
     Returns:
-        dict: The group data or None if not found
+        dict: The group data (read-only) or None if not found
     """
-    return _groups_registry.get(group_id)
+    return get_registry_snapshot().groups_by_id.get(group_id)
+
+
+def get_report(report_id):
+    """
+    Get a specific report by ID.
+
+    Args:
+        report_id (str): The report ID to retrieve
+
+    Returns:
+        dict: The report data (read-only) or None if not found
+    """
+    return get_registry_snapshot().reports_by_id.get(report_id)
 
 
 def get_all_reports():
@@ -140,12 +286,9 @@ def get_all_reports():
     Get all registered reports across all groups.
 
     Returns:
-        list: List of all report data dictionaries
+        tuple: All report data dictionaries (read-only)
     """
-    all_reports = []
-    for reports in _reports_registry.values():
-        all_reports.extend(reports)
-    return all_reports
+    return get_registry_snapshot().reports
 
 
 def get_group_reports(group_id):
@@ -156,22 +299,10 @@ def get_group_reports(group_id):
         group_id (str): The group ID to get reports for
 
     Returns:
-        list: List of report data dictionaries for the group
+        tuple: Report data dictionaries (read-only) visible in the group,
+        one per report ID
     """
-    all_reports = []
-
-    # Get reports directly registered to this group
-    group_reports = _reports_registry.get(group_id, [])
-
-    # Filter reports to only those that should be visible in this group
-    for reports in _reports_registry.values():
-        for report in reports:
-            if "visible_in" in report and group_id in report["visible_in"]:
-                # Avoid duplicates
-                if not any(r["id"] == report["id"] for r in all_reports):
-                    all_reports.append(report)
-
-    return all_reports
+    return get_registry_snapshot().visible_reports.get(group_id, ())
 
 
 def extract_report_metadata(blueprint):
@@ -309,24 +440,18 @@ def initialize_report_registry(app):
     # Now discover reports from blueprints
     discover_reports_from_blueprints(app)
 
-    # Make registry available to templates
-    @app.context_processor
-    def inject_report_registry():
-        return {
-            "report_registry": {
-                "groups": get_all_groups(),
-                "all_reports": get_all_reports(),
-            },
-            "get_all_groups": get_all_groups,
-            "get_all_reports": get_all_reports,
-            "get_group_reports": get_group_reports,
-        }
-
     # Add an API endpoint for search functionality
     @app.route("/api/reports", methods=["GET"])
     def api_reports():
         """API endpoint to provide report data for search functionality."""
-        return {"reports": get_all_reports()}
+        body, etag = get_registry_snapshot().reports_json()
+        response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+    # Registration is complete, so build the lookup indexes now
+    freeze_registry()
 
     logger.info(
         "Report registry initialized with %d groups and %d reports",
@@ -0,0 +1,261 @@
+"""
+Shared result store module.
+
+This module stores query results in the shared cache backend in a compact
+form. Row dictionaries are laid out by column, so each column name is written
+once rather than once per row, then pickled and compressed with zlib. Values
+larger than RESULT_STORE_CHUNK_BYTES are split across several keys, values
+larger than RESULT_STORE_MAX_BYTES are not stored at all, and compression
+ratio and (de)serialization times are counted for monitoring.
+"""
+
+import logging
+import pickle
+import threading
+import time
+import uuid
+import zlib
+from flask import current_app
+
+from app.core.auth import admin_required
+from app.core.cache import cache
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Prefix of every encoded result, so other values are never decoded as one
+MAGIC = b"RS1:"
+
+
+class ResultStoreStats:
+    """Counters for stored and loaded results."""
+
+    def __init__(self):
+        """Initialize with every counter at zero."""
+        self.lock = threading.Lock()
+        self.stored = 0
+        self.chunked = 0
+        self.too_large = 0
+        self.loaded = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.encode_seconds = 0.0
+        self.decode_seconds = 0.0
+
+    def add(self, **counts):
+        """Add to one or more counters."""
+        with self.lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def to_json(self):
+        """
+        Convert to a JSON-serializable dictionary.
+
+        Returns:
+            dict: Every counter, plus the overall compression ratio and the
+            average encode and decode times in milliseconds.
+        """
+        with self.lock:
+            return {
+                "stored": self.stored,
+                "chunked": self.chunked,
+                "too_large": self.too_large,
+                "loaded": self.loaded,
+                "raw_bytes": self.raw_bytes,
+                "stored_bytes": self.stored_bytes,
+                "compression_ratio": (
+                    round(self.raw_bytes / self.stored_bytes, 2)
+                    if self.stored_bytes
+                    else None
+                ),
+                "avg_encode_ms": (
+                    round(self.encode_seconds * 1000 / self.stored, 2)
+                    if self.stored
+                    else None
+                ),
+                "avg_decode_ms": (
+                    round(self.decode_seconds * 1000 / self.loaded, 2)
+                    if self.loaded
+                    else None
+                ),
+            }
+
+
+stats = ResultStoreStats()
+
+
+def _to_columns(result):
+    """Lay out a query result by column where its shape allows."""
+    if isinstance(result, dict):
+        return ("row", tuple(result), tuple(result.values()))
+
+    if isinstance(result, list) and result and isinstance(result[0], dict):
+        columns = tuple(result[0])
+        if all(isinstance(row, dict) and tuple(row) == columns for row in result):
+            values = [[row[column] for row in result] for column in columns]
+            return ("rows", columns, values)
+
+    return ("value", None, result)
+
+
+def _from_columns(kind, columns, values):
+    """Rebuild a query result from its column layout."""
+    if kind == "row":
+        return dict(zip(columns, values))
+    if kind == "rows":
+        return [dict(zip(columns, row)) for row in zip(*values)]
+    return values
+
+
+def encode_result(result, level=1):
+    """
+    Encode a query result as compressed bytes.
+
+    Args:
+        result (list or dict): Rows from execute_query, or a single row.
+        level (int, optional): zlib compression level. Defaults to 1.
+
+    Returns:
+        tuple: (encoded bytes, size in bytes before compression)
+    """
+    raw = pickle.dumps(_to_columns(result), protocol=pickle.HIGHEST_PROTOCOL)
+    return MAGIC + zlib.compress(raw, level), len(raw)
+
+
+def decode_result(data):
+    """
+    Decode bytes made by encode_result.
+
+    Args:
+        data (bytes): The encoded result.
+
+    Returns:
+        list or dict: The query result.
+
+    Raises:
+        ValueError: If data was not made by encode_result.
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError("Not an encoded result")
+    return _from_columns(*pickle.loads(zlib.decompress(data[len(MAGIC) :])))
+
+
+def store_result(key, result, timeout):
+    """
+    Store a query result in the shared cache backend.
+
+    Must be called within an application context.
+
+    Args:
+        key (str): The cache key.
+        result (list or dict): The query result.
+        timeout (int): Seconds to keep the result.
+
+    Returns:
+        bool: True if it was stored, False if it was over the size limit.
+    """
+    config = current_app.config
+    chunk_bytes = config.get("RESULT_STORE_CHUNK_BYTES", 1048576)
+    max_bytes = config.get("RESULT_STORE_MAX_BYTES", 67108864)
+
+    started = time.perf_counter()
+    data, raw_size = encode_result(
+        result, config.get("RESULT_STORE_COMPRESSION_LEVEL", 1)
+    )
+    elapsed = time.perf_counter() - started
+
+    if len(data) > max_bytes:
+        stats.add(too_large=1)
+        logger.warning(
+            "Result for %s is %d bytes compressed, over the %d byte limit; "
+            "not storing it",
+            key,
+            len(data),
+            max_bytes,
+        )
+        return False
+
+    if len(data) <= chunk_bytes:
+        cache.set(key, data, timeout=timeout)
+        chunks = 1
+    else:
+        # Chunk keys are unique to this write, so a reader never mixes the
+        # chunks of two writes; the manifest is written last
+        prefix = f"{key}:{uuid.uuid4().hex}"
+        parts = [data[i : i + chunk_bytes] for i in range(0, len(data), chunk_bytes)]
+        cache.set_many(
+            {f"{prefix}:{i}": part for i, part in enumerate(parts)}, timeout=timeout
+        )
+        cache.set(key, {"prefix": prefix, "chunks": len(parts)}, timeout=timeout)
+        chunks = len(parts)
+
+    stats.add(
+        stored=1,
+        chunked=int(chunks > 1),
+        raw_bytes=raw_size,
+        stored_bytes=len(data),
+        encode_seconds=elapsed,
+    )
+    logger.debug(
+        "Stored %s: %d bytes, %.1fx compression, %d chunks, %.1f ms",
+        key,
+        len(data),
+        raw_size / len(data),
+        chunks,
+        elapsed * 1000,
+    )
+    return True
+
+
+def load_result(key):
+    """
+    Load a query result stored by store_result.
+
+    Args:
+        key (str): The cache key.
+
+    Returns:
+        list or dict: The query result, or None if it is missing or any of its
+        chunks has expired.
+    """
+    value = cache.get(key)
+    if value is None:
+        return None
+
+    if isinstance(value, dict):
+        keys = [f"{value['prefix']}:{i}" for i in range(value["chunks"])]
+        parts = cache.get_many(*keys)
+        if any(part is None for part in parts):
+            return None
+        value = b"".join(parts)
+
+    started = time.perf_counter()
+    result = decode_result(value)
+    stats.add(loaded=1, decode_seconds=time.perf_counter() - started)
+    return result
+
+
+def get_stats():
+    """
+    Get the result store counters for this process.
+
+    Returns:
+        dict: Counters, compression ratio and average timings.
+    """
+    return stats.to_json()
+
+
+def init_app(app):
+    """
+    Add an endpoint reporting the result store counters.
+
+    Args:
+        app (Flask): The application.
+    """
+
+    @app.route("/api/result-store", methods=["GET"])
+    @admin_required
+    def api_result_store():
+        """API endpoint with the result store counters of this worker."""
+        return {"result_store": get_stats()}
@@ -0,0 +1,469 @@
+"""
+Shared array cache module.
+
+This module lets worker processes share large, immutable datasets instead of
+each loading its own copy. A dataset is published as a directory of NumPy
+.npy files under SHARED_CACHE_DIR; every worker maps the arrays read-only, so
+the operating system keeps one copy of them in its page cache. A new version
+is written to a temporary directory, renamed into place and then made current
+by atomically replacing a small pointer file, so readers never see a
+partially written version.
+"""
+
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+import numpy as np
+from flask import current_app
+
+from app.core.circuit_breaker import DatabaseUnavailable
+from app.core.stale_cache import Freshness
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Name of the pointer file holding the current version
+CURRENT = "CURRENT"
+
+# Name of the file in each version holding its manifest
+MANIFEST = "manifest.pickle"
+
+# Number of versions kept on disk, so workers still mapping the previous
+# version are not cut off
+KEEP_VERSIONS = 2
+
+
+@dataclass
+class SharedArrays:
+    """A published version of a dataset, mapped into this process."""
+
+    version: str
+    published_at: datetime
+    arrays: dict
+    meta: dict = field(default_factory=dict)
+
+    @property
+    def age(self):
+        """Seconds since the version was published."""
+        return (datetime.now() - self.published_at).total_seconds()
+
+
+class SharedArrayStore:
+    """
+    Versions of one dataset, published by any worker and mapped by all.
+
+    Object arrays cannot be memory-mapped, so they are pickled and loaded in
+    full; keep them small (such as lookup tables) next to the mapped arrays.
+    """
+
+    def __init__(self, name):
+        """
+        Initialize the store.
+
+        Args:
+            name (str): Dataset name; also the name of its directory.
+        """
+        self.name = name
+        self.lock = threading.Lock()
+        self.mapped = None
+
+    def _root(self):
+        """Return the dataset's directory under SHARED_CACHE_DIR."""
+        base = current_app.config.get("SHARED_CACHE_DIR") or os.path.join(
+            current_app.instance_path, "shared_cache"
+        )
+        return os.path.join(base, self.name)
+
+    def enabled(self):
+        """Whether the shared cache is enabled. Needs an application context."""
+        return current_app.config.get("SHARED_CACHE_ENABLED", True)
+
+    def publish(self, arrays, meta=None):
+        """
+        Publish a new version of the dataset.
+
+        Must be called within an application context. Errors are logged and
+        the version is simply not shared.
+
+        Args:
+            arrays (dict): Array name to numpy.ndarray. Names must be usable
+                as file names.
+            meta (dict, optional): Small picklable values stored with the
+                arrays, such as column names or a change signature.
+
+        Returns:
+            str: The new version, or None if it could not be published.
+        """
+        if not self.enabled():
+            return None
+
+        root = self._root()
+        version = f"{time.time_ns()}-{os.getpid()}"
+        temp = os.path.join(root, f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(temp)
+            pickled = []
+            for name, values in arrays.items():
+                values = np.asarray(values)
+                if values.dtype.hasobject:
+                    pickled.append(name)
+                np.save(
+                    os.path.join(temp, f"{name}.npy"),
+                    values,
+                    allow_pickle=values.dtype.hasobject,
+                )
+
+            manifest = {
+                "arrays": list(arrays),
+                "pickled": pickled,
+                "meta": meta or {},
+                "published_at": datetime.now(),
+            }
+            with open(os.path.join(temp, MANIFEST), "wb") as f:
+                pickle.dump(manifest, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.rename(temp, os.path.join(root, version))
+
+            pointer = os.path.join(root, f".{CURRENT}-{uuid.uuid4().hex}")
+            with open(pointer, "w", encoding="utf-8") as f:
+                f.write(version)
+            os.replace(pointer, os.path.join(root, CURRENT))
+        except Exception as e:
+            logger.warning("Could not publish shared %s: %s", self.name, str(e))
+            shutil.rmtree(temp, ignore_errors=True)
+            return None
+
+        self._remove_old_versions(root, version)
+        logger.info("Published shared %s version %s", self.name, version)
+        return version
+
+    def _remove_old_versions(self, root, current):
+        """Delete all but the newest versions and abandoned temporary files."""
+        versions = sorted(
+            (entry for entry in os.listdir(root) if entry[0].isdigit()),
+            key=lambda entry: int(entry.split("-")[0]),
+        )
+        for entry in versions[:-KEEP_VERSIONS]:
+            if entry != current:
+                # Fails harmlessly on Windows while another worker maps it
+                shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+
+        cutoff = time.time() - 3600
+        for entry in os.listdir(root):
+            path = os.path.join(root, entry)
+            if entry.startswith(".") and os.path.getmtime(path) < cutoff:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    def load(self, max_age=None):
+        """
+        Map the current version of the dataset.
+
+        Must be called within an application context. The mapped version is
+        kept, so repeated calls only read the pointer file.
+
+        Args:
+            max_age (float, optional): Ignore versions published more than
+                this many seconds ago.
+
+        Returns:
+            SharedArrays: The current version, or None if there is none, it
+            is too old or it cannot be read.
+        """
+        if not self.enabled():
+            return None
+
+        root = self._root()
+        try:
+            with open(os.path.join(root, CURRENT), encoding="utf-8") as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning("Could not read shared %s: %s", self.name, str(e))
+            return None
+
+        with self.lock:
+            mapped = self.mapped
+        if mapped is None or mapped.version != version:
+            try:
+                mapped = self._map(os.path.join(root, version), version)
+            except Exception as e:
+                logger.warning(
+                    "Could not map shared %s version %s: %s",
+                    self.name,
+                    version,
+                    str(e),
+                )
+                return None
+            with self.lock:
+                self.mapped = mapped
+
+        if max_age is not None and mapped.age > max_age:
+            return None
+        return mapped
+
+    def _map(self, path, version):
+        """Map the arrays of a version directory."""
+        with open(os.path.join(path, MANIFEST), "rb") as f:
+            manifest = pickle.load(f)
+
+        arrays = {}
+        for name in manifest["arrays"]:
+            file_path = os.path.join(path, f"{name}.npy")
+            if name in manifest["pickled"]:
+                arrays[name] = np.load(file_path, allow_pickle=True)
+            else:
+                arrays[name] = np.load(file_path, mmap_mode="r")
+
+        return SharedArrays(
+            version, manifest["published_at"], arrays, manifest["meta"]
+        )
+
+
+def _column_kind(values):
+    """Choose how to store a column from the types of its values."""
+    types = {type(value) for value in values if value is not None}
+    if not types:
+        return "none"
+    if len(types) > 1:
+        if types <= {int, float}:
+            return "float"
+        return "object"
+
+    kind = types.pop()
+    if kind is bool:
+        return "bool"
+    if kind is int:
+        # Fall back to objects for integers that do not fit in 64 bits
+        if all(-(2**63) <= value < 2**63 for value in values if value is not None):
+            return "int"
+        return "object"
+    if kind is float:
+        return "float"
+    if kind is str:
+        return "str"
+    if kind is Decimal:
+        return "decimal"
+    if kind is datetime:
+        return "datetime"
+    if kind is date:
+        return "date"
+    return "object"
+
+
+_FILL = {
+    "bool": False,
+    "int": 0,
+    "float": 0.0,
+    "str": "",
+    "decimal": "",
+    "datetime": datetime(1970, 1, 1),
+    "date": date(1970, 1, 1),
+}
+
+_DTYPES = {
+    "bool": bool,
+    "int": np.int64,
+    "float": np.float64,
+    "str": str,
+    "decimal": str,
+    "datetime": "datetime64[us]",
+    "date": "datetime64[D]",
+}
+
+
+def rows_to_arrays(rows):
+    """
+    Lay out query result rows as one typed array per column.
+
+    Text, numbers and dates become fixed-width arrays that can be mapped;
+    missing values are recorded in a separate mask per column. Decimals are
+    kept exactly as text. Columns of mixed or other types are pickled.
+
+    Args:
+        rows (list): Row dictionaries with the same columns.
+
+    Returns:
+        tuple: (dict of arrays for SharedArrayStore.publish, meta dict)
+    """
+    columns = list(rows[0]) if rows else []
+    arrays = {}
+    kinds = []
+
+    for i, column in enumerate(columns):
+        values = [row[column] for row in rows]
+        kind = _column_kind(values)
+        kinds.append(kind)
+
+        if kind == "none":
+            continue
+        if kind == "object":
+            # Filled one by one so list values are not read as nested arrays
+            array = np.empty(len(values), dtype=object)
+            for position, value in enumerate(values):
+                array[position] = value
+            arrays[f"c{i}"] = array
+            continue
+
+        nulls = np.array([value is None for value in values], dtype=bool)
+        if nulls.any():
+            arrays[f"n{i}"] = nulls
+        fill = _FILL[kind]
+        if kind == "decimal":
+            values = ["" if value is None else str(value) for value in values]
+        else:
+            values = [fill if value is None else value for value in values]
+        arrays[f"c{i}"] = np.array(values, dtype=_DTYPES[kind])
+
+    return arrays, {"columns": columns, "kinds": kinds, "count": len(rows)}
+
+
+class SharedRows:
+    """Query result rows rebuilt on demand from a mapped version."""
+
+    def __init__(self, shared):
+        """
+        Initialize from a version published with rows_to_arrays.
+
+        Args:
+            shared (SharedArrays): The mapped version.
+        """
+        self.shared = shared
+        self.columns = shared.meta["columns"]
+        self.kinds = shared.meta["kinds"]
+        self.count = shared.meta["count"]
+
+    def __len__(self):
+        return self.count
+
+    def _column(self, i, start, stop):
+        """Rebuild the Python values of one column for a slice of rows."""
+        kind = self.kinds[i]
+        if kind == "none":
+            return [None] * (stop - start)
+
+        values = self.shared.arrays[f"c{i}"][start:stop].tolist()
+        if kind == "decimal":
+            values = [Decimal(value) if value else None for value in values]
+
+        nulls = self.shared.arrays.get(f"n{i}")
+        if nulls is not None:
+            values = [
+                None if null else value
+                for value, null in zip(values, nulls[start:stop].tolist())
+            ]
+        return values
+
+    def rows(self, start=0, stop=None):
+        """
+        Rebuild row dictionaries for a slice of the rows.
+
+        Args:
+            start (int, optional): First row. Defaults to 0.
+            stop (int, optional): Row after the last. Defaults to the end.
+
+        Returns:
+            list: New row dictionaries, as execute_query returns them.
+        """
+        stop = self.count if stop is None else min(stop, self.count)
+        start = min(max(start, 0), stop)
+        columns = [self._column(i, start, stop) for i in range(len(self.columns))]
+        return [dict(zip(self.columns, values)) for values in zip(*columns)]
+
+
+class SharedRowCache:
+    """
+    A query result shared by every worker and reloaded after max_age seconds.
+
+    The worker that finds the shared copy missing or expired loads and
+    publishes it; the others map it. While the database's circuit breaker is
+    open, the last published rows are served however old they are, marked
+    stale. With the shared cache disabled, rows are loaded on every call.
+    """
+
+    def __init__(self, name, load, max_age_key, default_max_age=900):
+        """
+        Initialize the cache.
+
+        Args:
+            name (str): Dataset name.
+            load (callable): Called with no arguments to load the rows.
+            max_age_key (str): Config key holding the maximum age in seconds.
+            default_max_age (int, optional): Maximum age when the key is not
+                set. Defaults to 900.
+        """
+        self.store = SharedArrayStore(name)
+        self.load = load
+        self.max_age_key = max_age_key
+        self.default_max_age = default_max_age
+        self.load_lock = threading.Lock()
+
+    def get(self, start=0, stop=None):
+        """
+        Get a slice of the rows, loading and publishing them when needed.
+
+        Must be called within an application context. Only the requested
+        rows are rebuilt from the shared arrays.
+
+        Args:
+            start (int, optional): First row. Defaults to 0.
+            stop (int, optional): Row after the last. Defaults to the end.
+
+        Returns:
+            tuple: (list of row dictionaries, total number of rows,
+            Freshness)
+        """
+        if not self.store.enabled():
+            rows = self.load()
+            return rows[start:stop], len(rows), Freshness("live", datetime.now())
+
+        max_age = current_app.config.get(self.max_age_key, self.default_max_age)
+        state = "fresh"
+        shared = self.store.load(max_age)
+        if shared is None:
+            with self.load_lock:
+                shared = self.store.load(max_age)
+                if shared is None:
+                    try:
+                        rows = self.load()
+                    except DatabaseUnavailable:
+                        # Serve the last published rows while the database is down
+                        shared = self.store.load()
+                        if shared is None:
+                            raise
+                        logger.warning(
+                            "Serving last shared %s; database unavailable",
+                            self.store.name,
+                        )
+                        shared_rows = SharedRows(shared)
+                        return (
+                            shared_rows.rows(start, stop),
+                            len(shared_rows),
+                            Freshness("stale", shared.published_at),
+                        )
+                    loaded_at = datetime.now()
+                    self.store.publish(*rows_to_arrays(rows))
+                    shared = self.store.load(max_age)
+                    if shared is None:
+                        freshness = Freshness("live", loaded_at)
+                        return rows[start:stop], len(rows), freshness
+                    state = "live"
+
+        shared_rows = SharedRows(shared)
+        return (
+            shared_rows.rows(start, stop),
+            len(shared_rows),
+            Freshness(state, shared.published_at),
+        )
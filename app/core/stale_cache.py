@@ -0,0 +1,275 @@
+"""
+Stale-while-revalidate cache module.
+
+This module keeps report query results in memory under a per-report freshness
+policy. Fresh results are served as they are. Results past their freshness
+window are still served immediately, marked as stale, while a background
+thread reloads them; results past the report's maximum staleness are reloaded
+before responding. While a database's circuit breaker is open, the last
+result loaded is served as stale, however old it is. Results read from a
+lagging secondary copy (see db_routing) are dated by that copy's lag, and
+after an invalidation only copies that have caught up with it are read.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from flask import current_app, g
+
+from app.core.circuit_breaker import DatabaseUnavailable
+from app.core.coalesce import execute_coalesced, query_key
+from app.core.conditional import tag_version
+from app.core.db_routing import get_read_lag, reset_read_lag
+from app.core.timing import record_cache
+from app.core.utils import copy_rows
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Freshness states, least fresh first
+FRESHNESS_ORDER = ("stale", "fresh", "live")
+
+
+@dataclass
+class Freshness:
+    """How fresh a served result is."""
+
+    # "fresh", "stale" (served while a refresh runs) or "live" (just loaded)
+    state: str
+    loaded_at: datetime
+    # Load times of every result behind a combined response (see oldest)
+    versions: tuple = field(default=())
+
+    @property
+    def age(self):
+        """Seconds since the result was loaded."""
+        return max(0, int((datetime.now() - self.loaded_at).total_seconds()))
+
+    @classmethod
+    def oldest(cls, items):
+        """
+        Combine the freshness of the results behind one response.
+
+        The state and age shown are the least fresh result's; every result's
+        load time is kept for the response's ETag.
+
+        Args:
+            items (list): The Freshness of each result.
+
+        Returns:
+            Freshness: The oldest load time, stale if any result is stale.
+        """
+        items = list(items)
+        if not items:
+            return cls("live", datetime.now())
+        state = min(items, key=lambda item: FRESHNESS_ORDER.index(item.state)).state
+        versions = tuple(
+            loaded_at
+            for item in items
+            for loaded_at in item.versions or (item.loaded_at,)
+        )
+        return cls(state, min(item.loaded_at for item in items), versions)
+
+    def to_json(self):
+        """
+        Convert to a JSON-serializable dictionary.
+
+        Returns:
+            dict: state, loaded_at in ISO format and age_seconds.
+        """
+        return {
+            "state": self.state,
+            "loaded_at": self.loaded_at.isoformat(timespec="seconds"),
+            "age_seconds": self.age,
+        }
+
+    def apply(self, response):
+        """
+        Add freshness headers to a response.
+
+        Sets X-Data-Freshness to the state, X-Data-Age to the seconds since
+        the result was loaded, and an ETag and Last-Modified identifying the
+        cached results. The standard Age header is left alone: it counts time
+        spent in HTTP caches, and would make browsers treat responses as
+        expired before their RESPONSE_MAX_AGE.
+
+        Args:
+            response (Response): The response to update.
+
+        Returns:
+            Response: The same response.
+        """
+        response.headers["X-Data-Freshness"] = self.state
+        response.headers["X-Data-Age"] = str(self.age)
+        return tag_version(response, *(self.versions or (self.loaded_at,)))
+
+
+class StaleReportCache:
+    """
+    Report results served stale while they are refreshed in the background.
+
+    Each report creates its own cache with its freshness policy. Entries are
+    evicted least recently used first once max_size is reached.
+    """
+
+    def __init__(self, name, fresh_seconds=300, max_stale_seconds=3600, max_size=32):
+        """
+        Initialize the cache.
+
+        Args:
+            name (str): Report name, for log messages and thread names.
+            fresh_seconds (float, optional): Seconds a result is served without
+                a refresh. Defaults to 300.
+            max_stale_seconds (float, optional): Seconds after which a result
+                is too old to serve and is reloaded synchronously. Defaults
+                to 3600.
+            max_size (int, optional): Maximum number of cached results.
+                Defaults to 32.
+        """
+        self.name = name
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.refreshing = set()
+        self.invalidated_at = None
+
+    def _load(self, loader):
+        """
+        Load a value, returning it with the time its data is from.
+
+        Secondary copies further behind than the last invalidation are not
+        read, so a change that invalidated the cache is not reloaded from a
+        copy that does not have it yet.
+        """
+        max_lag = g.get("max_replica_lag")
+        if max_lag is not None and self.invalidated_at is not None:
+            g.max_replica_lag = min(max_lag, time.monotonic() - self.invalidated_at)
+        reset_read_lag()
+        try:
+            value = loader()
+        finally:
+            g.max_replica_lag = max_lag
+        return value, datetime.now() - timedelta(seconds=get_read_lag())
+
+    def _store(self, key, value, loaded_at):
+        """Store a freshly loaded value and return its load time."""
+        with self.lock:
+            self.entries[key] = (time.monotonic(), loaded_at, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return loaded_at
+
+    def _revalidate(self, key, loader):
+        """Reload an entry on a background thread unless one is running."""
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+
+        app = current_app._get_current_object()
+        max_replica_lag = g.get("max_replica_lag")
+        admission_classes = g.get("admission_classes")
+
+        def run():
+            try:
+                with app.app_context():
+                    # Read from the same database copy, under the same
+                    # admission limit, as the request would
+                    g.max_replica_lag = max_replica_lag
+                    g.admission_classes = admission_classes
+                    self._store(key, *self._load(loader))
+                logger.info("Refreshed stale %s result in the background", self.name)
+            except Exception as e:
+                logger.error("Error refreshing %s result: %s", self.name, str(e))
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        threading.Thread(
+            target=run, name=f"revalidate-{self.name}", daemon=True
+        ).start()
+
+    def get(self, key, loader):
+        """
+        Get a result, serving a stale copy while it refreshes when allowed.
+
+        Must be called within an application context.
+
+        Args:
+            key: The cache key.
+            loader (callable): Called with no arguments to load the result.
+
+        Returns:
+            tuple: (result, Freshness)
+        """
+        if not current_app.config.get("STALE_CACHE_ENABLED", True):
+            value, loaded_at = self._load(loader)
+            return value, Freshness("live", loaded_at)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+
+        if entry is not None:
+            loaded, loaded_at, value = entry
+            age = time.monotonic() - loaded
+            if age < self.fresh_seconds:
+                record_cache(True)
+                return value, Freshness("fresh", loaded_at)
+            if age < self.max_stale_seconds:
+                record_cache(True)
+                self._revalidate(key, loader)
+                return value, Freshness("stale", loaded_at)
+
+        record_cache(False)
+        try:
+            value, loaded_at = self._load(loader)
+        except DatabaseUnavailable:
+            if entry is None:
+                raise
+            # Serve the last known good result while the database is down
+            logger.warning(
+                "Serving last known %s result; database unavailable", self.name
+            )
+            return entry[2], Freshness("stale", entry[1])
+        return value, Freshness("live", self._store(key, value, loaded_at))
+
+    def invalidate(self):
+        """
+        Expire every cached result, so the next request loads it again.
+
+        The results are kept, so they can still be served while the database
+        is unavailable.
+        """
+        with self.lock:
+            for key, (_, loaded_at, value) in self.entries.items():
+                self.entries[key] = (float("-inf"), loaded_at, value)
+            self.invalidated_at = time.monotonic()
+
+    def query(self, query, params=None, db_key="nws"):
+        """
+        Get the rows for a query under this report's policy.
+
+        Loads are coalesced with identical queries in flight. The caller gets
+        its own copy of the rows.
+
+        Args:
+            query (str): The SQL query.
+            params (tuple, optional): Parameters for the query.
+            db_key (str): The database key. Defaults to "nws".
+
+        Returns:
+            tuple: (list of row dictionaries, Freshness)
+        """
+        rows, freshness = self.get(
+            query_key(query, params, db_key),
+            lambda: execute_coalesced(query, params, db_key=db_key),
+        )
+        return copy_rows(rows), freshness
@@ -5,7 +5,8 @@ This module provides helper functions that can be used in Jinja2 templates.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
 # Changed import to use Markup from Jinja2 instead of Flask
 from markupsafe import Markup
@@ -31,45 +32,67 @@ def include_cdn_resources(
         Markup object containing HTML tags for the requested resources.
     """
     try:
-        # List to store all resources
-        all_resources = []
-
-        # Add individual resources
-        if resources:
-            all_resources.extend(CDNResourceManager.get_resources_by_ids(resources))
-
-        # Add bundle resources
-        if bundles:
-            all_resources.extend(CDNResourceManager.get_resources_for_bundles(bundles))
-
-        # Remove duplicates while preserving order
-        unique_resources = {}
-        for resource in all_resources:
-            unique_resources[resource["url"]] = resource
-
-        # Group resources by type for better HTML structure
-        css_resources = []
-        js_resources = []
-
-        for resource in unique_resources.values():
-            if resource["type"] == CDNResourceManager.TYPE_CSS:
-                css_resources.append(resource)
-            elif resource["type"] == CDNResourceManager.TYPE_JS:
-                js_resources.append(resource)
-
-        # Generate HTML tags
-        html = "\n".join(
-            [CDNResourceManager.generate_resource_tag(res) for res in css_resources]
-            + [CDNResourceManager.generate_resource_tag(res) for res in js_resources]
+        return _build_cdn_tags(
+            tuple(resources) if resources else (), tuple(bundles) if bundles else ()
         )
 
-        return Markup(html)
-
     except Exception as e:
         logger.error("Error including CDN resources: %s", str(e))
         return Markup(f"<!-- Error loading CDN resources: {str(e)} -->")
 
 
+@lru_cache(maxsize=64)
+def _build_cdn_tags(resources: Tuple[str, ...], bundles: Tuple[str, ...]) -> Markup:
+    """
+    Build the HTML tags for a set of CDN resources.
+
+    The resource definitions are static, so the tags are built once for each
+    combination of resources and bundles.
+
+    Args:
+        resources: Resource IDs to include.
+        bundles: Bundle names to include.
+
+    Returns:
+        Markup object containing HTML tags for the requested resources.
+    """
+    # List to store all resources
+    all_resources = []
+
+    # Add individual resources
+    if resources:
+        all_resources.extend(CDNResourceManager.get_resources_by_ids(list(resources)))
+
+    # Add bundle resources
+    if bundles:
+        all_resources.extend(
+            CDNResourceManager.get_resources_for_bundles(list(bundles))
+        )
+
+    # Remove duplicates while preserving order
+    unique_resources = {}
+    for resource in all_resources:
+        unique_resources[resource["url"]] = resource
+
+    # Group resources by type for better HTML structure
+    css_resources = []
+    js_resources = []
+
+    for resource in unique_resources.values():
+        if resource["type"] == CDNResourceManager.TYPE_CSS:
+            css_resources.append(resource)
+        elif resource["type"] == CDNResourceManager.TYPE_JS:
+            js_resources.append(resource)
+
+    # Generate HTML tags
+    html = "\n".join(
+        [CDNResourceManager.generate_resource_tag(res) for res in css_resources]
+        + [CDNResourceManager.generate_resource_tag(res) for res in js_resources]
+    )
+
+    return Markup(html)
+
+
 def register_template_helpers(app):
     """
     Register template helper functions with a Flask application.
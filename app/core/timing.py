@@ -0,0 +1,226 @@
+"""
+Request timing module.
+
+This module records where each request's time goes: connecting to the
+databases, running queries, fetching their rows, serializing JSON, rendering
+templates and compressing the response, with whatever remains counted as
+Python processing ("app"). The breakdown is sent to the browser in a
+Server-Timing header, shown in the devtools network panel, and logged as one
+key=value line per request, so a slow report can be diagnosed after the fact.
+The rows sent and the cache lookups made are counted alongside.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from flask import before_render_template, current_app, g, request, template_rendered
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Span names and their Server-Timing descriptions, in header order
+SPANS = {
+    "db-connect": "Database connect",
+    "db-query": "Query execution",
+    "db-fetch": "Row fetch",
+    "render": "Template rendering",
+    "serialize": "JSON serialization",
+    "compress": "Compression",
+}
+
+
+class RequestTiming:
+    """The spans recorded for one request."""
+
+    def __init__(self):
+        """Start timing the request."""
+        self.started = time.perf_counter()
+        self.spans = {}
+        self.render_starts = []
+        self.rows = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, name, seconds):
+        """
+        Add time to a span.
+
+        Args:
+            name (str): The span name.
+            seconds (float): The time spent.
+        """
+        total, count = self.spans.get(name, (0.0, 0))
+        self.spans[name] = (total + seconds, count + 1)
+
+    def breakdown(self):
+        """
+        Get the time spent in each span, with the rest counted as "app".
+
+        Returns:
+            dict: Span name to (milliseconds, count), plus "app" and "total".
+        """
+        total = time.perf_counter() - self.started
+        spans = {
+            name: (seconds * 1000, count)
+            for name, (seconds, count) in self.spans.items()
+        }
+        spent = sum(seconds for seconds, _ in self.spans.values())
+        spans["app"] = (max(0.0, total - spent) * 1000, 1)
+        spans["total"] = (total * 1000, 1)
+        return spans
+
+
+def _current():
+    """Get the current request's timing, or None outside a timed request."""
+    return g.get("request_timing") if g else None
+
+
+def record(name, seconds):
+    """
+    Add time to a span of the current request.
+
+    Does nothing outside a timed request, such as on background threads.
+
+    Args:
+        name (str): The span name.
+        seconds (float): The time spent.
+    """
+    timing = _current()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+def add_rows(count):
+    """
+    Count rows sent in the current request's response.
+
+    Args:
+        count (int): The number of rows.
+    """
+    timing = _current()
+    if timing is not None:
+        timing.rows += count
+
+
+def record_cache(hit):
+    """
+    Count a cache lookup made by the current request.
+
+    Args:
+        hit (bool): Whether the value was found in the cache.
+    """
+    timing = _current()
+    if timing is not None:
+        if hit:
+            timing.cache_hits += 1
+        else:
+            timing.cache_misses += 1
+
+
+@contextmanager
+def span(name):
+    """
+    Time a block as a span of the current request.
+
+    Args:
+        name (str): The span name.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def _start_request():
+    """Start timing a request. Runs before each request."""
+    if current_app.config.get("REQUEST_TIMING_ENABLED", True):
+        g.request_timing = RequestTiming()
+
+
+def _start_render(sender, template, context, **extra):
+    """Note when a template starts rendering."""
+    timing = _current()
+    if timing is not None:
+        timing.render_starts.append(time.perf_counter())
+
+
+def _end_render(sender, template, context, **extra):
+    """Record a finished template render."""
+    timing = _current()
+    if timing is not None and timing.render_starts:
+        timing.add("render", time.perf_counter() - timing.render_starts.pop())
+
+
+def server_timing_header(spans):
+    """
+    Format a timing breakdown as a Server-Timing header value.
+
+    Args:
+        spans (dict): Span name to (milliseconds, count).
+
+    Returns:
+        str: The header value.
+    """
+    entries = []
+    for name, description in list(SPANS.items()) + [
+        ("app", "Python processing"),
+        ("total", "Total"),
+    ]:
+        if name in spans:
+            entries.append(f'{name};dur={spans[name][0]:.1f};desc="{description}"')
+    return ", ".join(entries)
+
+
+def _finish_request(response):
+    """
+    Add the Server-Timing header and log the request's timing.
+
+    Runs after each request, after every other after_request handler.
+
+    Args:
+        response (Response): The response.
+
+    Returns:
+        Response: The same response.
+    """
+    timing = _current()
+    if timing is None or request.endpoint == "static":
+        return response
+
+    spans = timing.breakdown()
+    if current_app.config.get("SERVER_TIMING_HEADER", True):
+        response.headers["Server-Timing"] = server_timing_header(spans)
+
+    fields = [
+        f"method={request.method}",
+        f"path={request.path}",
+        f"endpoint={request.endpoint}",
+        f"status={response.status_code}",
+    ]
+    for name, (ms, count) in spans.items():
+        key = name.replace("-", "_")
+        fields.append(f"{key}_ms={ms:.1f}")
+        if name in ("db-query", "render"):
+            fields.append(f"{key}_count={count}")
+    fields.append(f"rows={timing.rows}")
+    fields.append(f"cache_hits={timing.cache_hits}")
+    fields.append(f"cache_misses={timing.cache_misses}")
+    logger.info("request_timing %s", " ".join(fields))
+    return response
+
+
+def init_app(app):
+    """
+    Time every request.
+
+    Register before other after_request handlers, so the timing includes
+    their work (after_request handlers run in reverse order).
+
+    Args:
+        app (Flask): The application.
+    """
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_start_render, app)
+    template_rendered.connect(_end_render, app)
@@ -0,0 +1,44 @@
+"""
+Utility functions module.
+
+This module provides small helpers shared by report modules.
+"""
+
+
+def frame_to_records(frame, iso_dates=False):
+    """
+    Convert a pandas DataFrame to JSON-serializable row dictionaries.
+
+    Args:
+        frame (pandas.DataFrame): The rows to convert.
+        iso_dates (bool, optional): Convert dates to ISO format strings, for
+            CSV exports. The JSON provider serializes dates itself. Defaults
+            to False.
+
+    Returns:
+        list: Row dictionaries with missing values as None.
+    """
+    frame = frame.astype(object).where(frame.notna(), None)
+    records = frame.to_dict("records")
+
+    if iso_dates:
+        for row in records:
+            for key, value in row.items():
+                if hasattr(value, "isoformat"):
+                    row[key] = value.isoformat()
+    return records
+
+
+def copy_rows(result):
+    """
+    Copy query results so a caller can modify them without changing a cache.
+
+    Args:
+        result (list or dict): Rows from execute_query, or a single row.
+
+    Returns:
+        list or dict: New row dictionaries holding the same values.
+    """
+    if isinstance(result, list):
+        return [dict(row) for row in result]
+    return dict(result) if result is not None else None
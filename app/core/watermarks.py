@@ -0,0 +1,144 @@
+"""
+Table watermark module.
+
+This module lets report caches declare the source tables they depend on and
+invalidates them only when one of those tables changes. A background poll
+reads each table's last write time from SQL Server's index usage statistics,
+one query per database, which is cheap and catches updates and deletes as
+well as inserts.
+"""
+
+import logging
+import threading
+from flask import current_app
+
+from app.core.background import BackgroundRefresher
+from app.core.database import execute_query
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+def get_table_updates(tables, db_key):
+    """
+    Get the last write time of each table in a database.
+
+    Tables with no writes since SQL Server last started have no row.
+
+    Args:
+        tables (list): Schema-qualified table names, such as 'azteca.WORKORDER'.
+        db_key (str): The database key.
+
+    Returns:
+        tuple: (SQL query string, query parameters, database key)
+    """
+    placeholders = ", ".join("OBJECT_ID(?)" for _ in tables)
+    query = f"""
+    SELECT
+        OBJECT_SCHEMA_NAME(object_id) + '.' + OBJECT_NAME(object_id) AS table_name,
+        MAX(last_user_update) AS last_user_update
+    FROM sys.dm_db_index_usage_stats
+    WHERE database_id = DB_ID()
+        AND object_id IN ({placeholders})
+    GROUP BY object_id
+    """
+    return query, tuple(tables), db_key
+
+
+class WatermarkPoller:
+    """
+    Invalidate caches when the tables they depend on change.
+
+    The first poll records each table's watermark; later polls call the
+    invalidation functions of every table whose watermark moved.
+    """
+
+    def __init__(self):
+        """Initialize with no dependencies."""
+        self.lock = threading.Lock()
+        self.dependents = {}
+        self.watermarks = {}
+        self.refresher = BackgroundRefresher("watermarks")
+
+    def depends_on(self, db_key, table, invalidate):
+        """
+        Declare that a cache depends on a table.
+
+        Args:
+            db_key (str): The database key, such as "cw" or "nws".
+            table (str): Schema-qualified table name, such as 'azteca.WORKORDER'.
+            invalidate (callable): Called with no arguments when the table changes.
+        """
+        with self.lock:
+            self.dependents.setdefault((db_key, table.lower()), []).append(invalidate)
+
+    def poll(self, full=False):
+        """
+        Check every watched table and invalidate the dependents of changed ones.
+
+        Must be called within an application context.
+
+        Args:
+            full (bool, optional): Unused; accepted for BackgroundRefresher.
+
+        Returns:
+            list: (db_key, table) pairs that changed.
+        """
+        with self.lock:
+            watched = {}
+            for db_key, table in self.dependents:
+                watched.setdefault(db_key, []).append(table)
+
+        changed = []
+        for db_key, tables in watched.items():
+            try:
+                query, params, db_key = get_table_updates(tables, db_key)
+                rows = execute_query(query, params, db_key=db_key)
+            except Exception as e:
+                logger.warning("Could not read %s table watermarks: %s", db_key, str(e))
+                continue
+
+            updates = {
+                str(row["table_name"]).lower(): row["last_user_update"] for row in rows
+            }
+            for table in tables:
+                key = (db_key, table)
+                watermark = updates.get(table)
+                if key in self.watermarks and self.watermarks[key] != watermark:
+                    changed.append(key)
+                self.watermarks[key] = watermark
+
+        for key in changed:
+            with self.lock:
+                callbacks = list(self.dependents.get(key, []))
+            for invalidate in callbacks:
+                invalidate()
+            logger.info(
+                "Table %s on %s changed; invalidated %d caches",
+                key[1],
+                key[0],
+                len(callbacks),
+            )
+        return changed
+
+    def check(self):
+        """Start a background poll if one is due. Runs before each request."""
+        app = current_app._get_current_object()
+        if not app.config.get("WATERMARKS_ENABLED", True):
+            return
+        self.refresher.trigger(
+            app, self.poll, app.config.get("WATERMARK_POLL_SECONDS", 60)
+        )
+
+    def init_app(self, app):
+        """
+        Poll the watched tables in the background as requests arrive.
+
+        Args:
+            app (Flask): The application.
+        """
+        app.before_request(self.check)
+
+
+# Shared poller; report modules declare their dependencies on it
+watermarks = WatermarkPoller()
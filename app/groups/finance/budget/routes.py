@@ -10,7 +10,11 @@ from datetime import datetime
 import csv
 from io import StringIO
 
+from app.core.admission import limit_concurrency
 from app.core.database import execute_query
+from app.core.db_routing import allow_replica
+from app.core.stale_cache import StaleReportCache
+from app.core.watermarks import watermarks
 from app.groups.finance.budget import bp
 from app.groups.finance.budget.queries import (
     get_fiscal_years,
@@ -24,6 +28,14 @@ from app.groups.finance.budget.queries import (
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Budget results only change when journals are posted, so keep them until the
+# journal tables change (or for up to a day)
+report_cache = StaleReportCache(
+    "budget", fresh_seconds=3600, max_stale_seconds=86400
+)
+watermarks.depends_on("nws", "dbo.JournalDetail", report_cache.invalidate)
+watermarks.depends_on("nws", "dbo.JournalHeader", report_cache.invalidate)
+
 
 @bp.route("/")
 def index():
@@ -83,6 +95,8 @@ def index():
 
 
 @bp.route("/api/chart-data")
+@limit_concurrency("nws", "heavy")
+@allow_replica(86400)
 def api_chart_data():
     """
     API endpoint for fetching amended budget chart data.
@@ -113,7 +127,7 @@ def api_chart_data():
         query, params, db_key = get_amended_budget_by_fiscal_year(
             selected_fiscal_year, selected_department
         )
-        data = execute_query(query, params, db_key=db_key)
+        data, freshness = report_cache.query(query, params, db_key)
 
         # Check if we have any data
         if not data:
@@ -130,12 +144,15 @@ def api_chart_data():
 
         # Return data for chart
         logger.info("Retrieved %d data points for budget chart", len(fiscal_years))
-        return jsonify(
-            {
-                "success": True,
-                "fiscal_years": fiscal_years,
-                "amended_totals": amended_totals,
-            }
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "fiscal_years": fiscal_years,
+                    "amended_totals": amended_totals,
+                    "freshness": freshness.to_json(),
+                }
+            )
         )
 
     except Exception as e:
@@ -144,6 +161,8 @@ def api_chart_data():
 
 
 @bp.route("/api/budget-summary")
+@limit_concurrency("nws", "heavy")
+@allow_replica(86400)
 def api_budget_summary():
     """
     API endpoint to get budget summary data.
@@ -164,7 +183,7 @@ def api_budget_summary():
 
         # Get data
         query, params, db_key = get_budget_summary(fiscal_year, fund_category)
-        data = execute_query(query, params, db_key=db_key)
+        data, freshness = report_cache.query(query, params, db_key)
 
         # Process data for response
         result = []
@@ -193,7 +212,11 @@ def api_budget_summary():
             )
 
         logger.info("Retrieved budget summary with %d rows", len(result))
-        return jsonify({"success": True, "data": result})
+        return freshness.apply(
+            jsonify(
+                {"success": True, "data": result, "freshness": freshness.to_json()}
+            )
+        )
 
     except Exception as e:
         logger.error("Error fetching budget summary data: %s", str(e))
@@ -201,6 +224,8 @@ def api_budget_summary():
 
 
 @bp.route("/api/monthly-trend")
+@limit_concurrency("nws", "heavy")
+@allow_replica(86400)
 def api_monthly_trend():
     """
     API endpoint to get monthly trend data.
@@ -225,7 +250,7 @@ def api_monthly_trend():
 
         # Get data
         query, params, db_key = get_monthly_trend(fiscal_year, fund, department)
-        data = execute_query(query, params, db_key=db_key)
+        data, freshness = report_cache.query(query, params, db_key)
 
         # Process data for response
         result = []
@@ -247,7 +272,11 @@ def api_monthly_trend():
             )
 
         logger.info("Retrieved monthly trend data with %d data points", len(result))
-        return jsonify({"success": True, "data": result})
+        return freshness.apply(
+            jsonify(
+                {"success": True, "data": result, "freshness": freshness.to_json()}
+            )
+        )
 
     except Exception as e:
         logger.error("Error fetching monthly trend data: %s", str(e))
@@ -255,6 +284,8 @@ def api_monthly_trend():
 
 
 @bp.route("/export")
+@limit_concurrency("nws", "heavy")
+@allow_replica(86400)
 def export_data():
     """
     Export budget data as CSV.
@@ -275,7 +306,7 @@ def export_data():
 
         # Fetch data
         query, params, db_key = get_budget_summary(fiscal_year, fund_category)
-        data = execute_query(query, params, db_key=db_key)
+        data, _ = report_cache.query(query, params, db_key)
 
         if not data:
             logger.warning(
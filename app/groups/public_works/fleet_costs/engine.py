@@ -0,0 +1,220 @@
+# app/groups/public_works/fleet_costs/engine.py
+"""
+Fleet Costs Engine.
+
+This module fetches the fleet cost detail rows for a date range through a
+per-day range cache and computes the department, vehicle and time-series
+summaries from them with pandas, so the report's endpoints share the same
+cached rows and only query the days they have not seen.
+"""
+
+import logging
+import pandas as pd
+
+from app.core.database import stream_query
+from app.core.dimensions import DimensionTable
+from app.core.range_cache import RangeCache
+from app.core.watermarks import watermarks
+from app.groups.public_works.fleet_costs.queries import (
+    get_fleet_costs,
+    get_motor_fleet,
+    get_motor_fleet_signature,
+)
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Vehicle model and department by EUID, from the motor fleet GIS layer
+motor_fleet = DimensionTable(
+    "motor_fleet",
+    get_motor_fleet,
+    key="EUID",
+    get_signature_query=get_motor_fleet_signature,
+)
+
+# Columns returned by get_fleet_costs, in order
+DETAIL_COLUMNS = [
+    "WORKORDERID",
+    "ACTUALFINISHDATE",
+    "WOCATEGORY",
+    "WOLABORCOST",
+    "WOMATCOST",
+    "ACCTNUM",
+    "STATUS",
+    "WORKORDERSID",
+    "ENTITYUID",
+]
+
+INTERVALS = ["day", "week", "month", "quarter", "year"]
+
+
+def period_start(date_obj, interval):
+    """
+    Get the start of the reporting period containing a date.
+
+    Args:
+        date_obj (datetime): The date.
+        interval (str): 'month', 'quarter' or 'year'. Other intervals return
+            the start of the day.
+
+    Returns:
+        datetime: Midnight on the first day of the period.
+    """
+    date_obj = date_obj.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "year":
+        return date_obj.replace(month=1, day=1)
+    if interval == "quarter":
+        return date_obj.replace(month=((date_obj.month - 1) // 3) * 3 + 1, day=1)
+    if interval == "month":
+        return date_obj.replace(day=1)
+    return date_obj
+
+
+def _fetch_rows(start_date, end_date):
+    """Load the fleet cost detail rows for a date range as tuples."""
+    query, params, db_key = get_fleet_costs(start_date, end_date)
+
+    records = []
+    for _, rows in stream_query(query, params, db_key=db_key):
+        records.extend(tuple(row) for row in rows)
+
+    logger.info(
+        "Loaded %d fleet cost rows for %s to %s", len(records), start_date, end_date
+    )
+    return records
+
+
+# Detail rows in per-day partitions of ACTUALFINISHDATE
+_rows = RangeCache(
+    "fleet_costs", _fetch_rows, DETAIL_COLUMNS.index("ACTUALFINISHDATE")
+)
+watermarks.depends_on("cw", "azteca.WORKORDER", _rows.invalidate_open)
+
+
+def get_fleet_frame(start_date, end_date, department=None):
+    """
+    Get fleet cost detail rows for a date range and optional department.
+
+    Rows come from the range cache, so only days that are not cached yet (or
+    are recent enough to still change) are queried. Vehicle model and
+    department are joined from the motor fleet dimension and the department
+    filter is applied in memory.
+
+    Args:
+        start_date (datetime): Start of the report period.
+        end_date (datetime): End of the report period.
+        department (str, optional): Only include vehicles in this department.
+
+    Returns:
+        pandas.DataFrame: Detail rows, newest first.
+    """
+    records = _rows.get(start_date, end_date)
+
+    frame = pd.DataFrame.from_records(records, columns=DETAIL_COLUMNS)
+    frame["ACTUALFINISHDATE"] = pd.to_datetime(frame["ACTUALFINISHDATE"])
+    frame["WOLABORCOST"] = pd.to_numeric(frame["WOLABORCOST"]).astype(float)
+    frame["WOMATCOST"] = pd.to_numeric(frame["WOMATCOST"]).astype(float)
+
+    frame = motor_fleet.get().join(frame, "ENTITYUID", ["Model", "Department"])
+    if department:
+        # Compare as SQL Server does: ignoring case and trailing spaces
+        names = frame["Department"].astype("string").str.rstrip().str.casefold()
+        frame = frame[(names == department.rstrip().casefold()).fillna(False)]
+
+    return frame.sort_values("ACTUALFINISHDATE", ascending=False, kind="stable")
+
+
+def get_departments():
+    """
+    Get the departments with fleet vehicles.
+
+    Returns:
+        list: Department names in alphabetical order.
+    """
+    departments = motor_fleet.get().column("Department").dropna().unique()
+    return sorted(str(department) for department in departments)
+
+
+def _summarize(frame, keys):
+    """Group rows and total work orders and costs as the SQL summaries did."""
+    frame = frame.assign(TotalCost=frame["WOLABORCOST"] + frame["WOMATCOST"])
+    grouped = frame.groupby(keys, dropna=False, sort=False)
+
+    summary = pd.DataFrame(
+        {
+            "WorkOrderCount": grouped["WORKORDERID"].nunique(),
+            "TotalLaborCost": grouped["WOLABORCOST"].sum(min_count=1),
+            "TotalMaterialCost": grouped["WOMATCOST"].sum(min_count=1),
+            "TotalCost": grouped["TotalCost"].sum(min_count=1),
+        }
+    ).reset_index()
+
+    # Costs are summed as floats, so drop accumulated rounding error
+    cost_columns = ["TotalLaborCost", "TotalMaterialCost", "TotalCost"]
+    summary[cost_columns] = summary[cost_columns].round(2)
+    return summary
+
+
+def summarize_by_department(frame):
+    """
+    Total work orders and costs for each department.
+
+    Args:
+        frame (pandas.DataFrame): Detail rows from get_fleet_frame.
+
+    Returns:
+        pandas.DataFrame: One row per department, highest total cost first.
+    """
+    frame = frame[frame["Department"].notna()].astype({"Department": object})
+    summary = _summarize(frame, ["Department"])
+    return summary.sort_values("TotalCost", ascending=False, na_position="last")
+
+
+def summarize_by_vehicle(frame):
+    """
+    Total work orders and costs for each vehicle.
+
+    Args:
+        frame (pandas.DataFrame): Detail rows from get_fleet_frame.
+
+    Returns:
+        pandas.DataFrame: One row per vehicle, highest total cost first.
+    """
+    frame = frame[frame["ENTITYUID"].notna()]
+    frame = frame.astype({"Model": object, "Department": object})
+    summary = _summarize(frame, ["ENTITYUID", "Model", "Department"])
+    summary = summary.rename(columns={"ENTITYUID": "VehicleID", "Model": "VehicleModel"})
+    return summary.sort_values("TotalCost", ascending=False, na_position="last")
+
+
+def summarize_over_time(frame, interval="month"):
+    """
+    Total work orders and costs for each time period.
+
+    Weeks start on Sunday, matching SQL Server's default DATEFIRST.
+
+    Args:
+        frame (pandas.DataFrame): Detail rows from get_fleet_frame.
+        interval (str, optional): 'day', 'week', 'month', 'quarter' or 'year'.
+            Defaults to 'month'.
+
+    Returns:
+        pandas.DataFrame: One row per period with a TimePeriod date, oldest first.
+    """
+    day = frame["ACTUALFINISHDATE"].dt.normalize()
+
+    if interval == "day":
+        period = day
+    elif interval == "week":
+        period = day - pd.to_timedelta((day.dt.weekday + 1) % 7, unit="D")
+    elif interval == "quarter":
+        period = day.dt.to_period("Q").dt.start_time
+    elif interval == "year":
+        period = day.dt.to_period("Y").dt.start_time
+    else:
+        period = day.dt.to_period("M").dt.start_time
+
+    frame = frame.assign(TimePeriod=period.dt.date)
+    frame = frame[frame["TimePeriod"].notna()]
+    summary = _summarize(frame, ["TimePeriod"])
+    return summary.sort_values("TimePeriod")
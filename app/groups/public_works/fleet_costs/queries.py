@@ -39,17 +39,18 @@ def format_date_for_query(date_obj):
     return date_obj.strftime("%Y-%m-%d %H:%M:%S")
 
 
-def get_fleet_costs(start_date=None, end_date=None, department=None):
+def get_fleet_costs(start_date=None, end_date=None):
     """
-    Get fleet costs data for the specified date range and department.
+    Get fleet maintenance work orders for the specified date range.
+
+    Vehicle model and department come from the motor fleet dimension, joined
+    in Python, so this is a CityWorks-only query.
 
     Args:
         start_date (datetime, optional): Start date for the report period.
             If None, defaults to 90 days ago.
         end_date (datetime, optional): End date for the report period.
             If None, defaults to current date.
-        department (str, optional): Filter by specific department.
-            If None, returns data for all departments.
 
     Returns:
         tuple: (SQL query string, query parameters, database key)
@@ -62,10 +63,10 @@ def get_fleet_costs(start_date=None, end_date=None, department=None):
     start_date_str = format_date_for_query(start_date)
     end_date_str = format_date_for_query(end_date)
 
-    # Initialize parameters list
+    # Parameters
     params = [start_date_str, end_date_str]
 
-    # Build the base query
+    # Build the query
     query = """
     SELECT WO.[WORKORDERID],
         WO.[ACTUALFINISHDATE],
@@ -75,274 +76,53 @@ def get_fleet_costs(start_date=None, end_date=None, department=None):
         WO.[ACCTNUM],
         WO.[STATUS],
         WO.[WORKORDERSID],
-        WOE.[ENTITYUID],
-        MF.[Model],
-        MF.[Department]
+        WOE.[ENTITYUID]
     FROM [CW].[azteca].[WORKORDER] WO
     LEFT JOIN [CW].[azteca].[WORKORDERENTITY] WOE
         ON WOE.[WORKORDERID] = WO.[WORKORDERID]
-    LEFT JOIN [TOC_SDE].[GISMGR].[MOTOR_FLEET] MF
-        ON MF.[EUID] = WOE.[ENTITYUID]
     WHERE WO.[WOCATEGORY] = 'MF'
         AND WO.[ACTUALFINISHDATE] BETWEEN ? AND ?
+    ORDER BY WO.[ACTUALFINISHDATE] DESC
     """
 
-    # Add department filter if provided
-    if department:
-        query += " AND MF.[Department] = ?"
-        params.append(department)
-
-    # Add ordering
-    query += " ORDER BY WO.[ACTUALFINISHDATE] DESC"
-
     logger.info(
-        "Generated fleet costs query for period %s to %s%s",
+        "Generated fleet costs query for period %s to %s",
         start_date_str,
         end_date_str,
-        f" for department {department}" if department else "",
     )
 
     return query, tuple(params), "cw"
 
 
-def get_departments():
+def get_motor_fleet():
     """
-    Get a list of all departments with fleet vehicles.
+    Get the motor fleet GIS layer for the vehicle dimension.
 
     Returns:
         tuple: (SQL query string, query parameters, database key)
     """
     query = """
-    SELECT DISTINCT [Department] 
-    FROM [TOC_SDE].[GISMGR].[MOTOR_FLEET]
-    WHERE [Department] IS NOT NULL
-    ORDER BY [Department]
+    SELECT [EUID], [Model], [Department]
+    FROM [GISMGR].[MOTOR_FLEET]
+    WHERE [EUID] IS NOT NULL
     """
 
-    logger.info("Retrieving list of departments with fleet vehicles")
-    return query, (), "cw"
+    logger.info("Retrieving motor fleet dimension")
+    return query, (), "gis"
 
 
-def get_cost_summary_by_department(start_date=None, end_date=None):
+def get_motor_fleet_signature():
     """
-    Get cost summary grouped by department.
-
-    Args:
-        start_date (datetime, optional): Start date for the report period.
-            If None, defaults to 90 days ago.
-        end_date (datetime, optional): End date for the report period.
-            If None, defaults to current date.
+    Get a change-detection signature for the motor fleet GIS layer.
 
     Returns:
         tuple: (SQL query string, query parameters, database key)
     """
-    # Use default dates if not provided
-    if start_date is None or end_date is None:
-        start_date, end_date = get_default_date_range()
-
-    # Convert dates to strings for SQL
-    start_date_str = format_date_for_query(start_date)
-    end_date_str = format_date_for_query(end_date)
-
-    # Parameters
-    params = [start_date_str, end_date_str]
-
-    # Build the query
     query = """
-    SELECT 
-        MF.[Department],
-        COUNT(DISTINCT WO.[WORKORDERID]) AS WorkOrderCount,
-        SUM(WO.[WOLABORCOST]) AS TotalLaborCost,
-        SUM(WO.[WOMATCOST]) AS TotalMaterialCost,
-        SUM(WO.[WOLABORCOST] + WO.[WOMATCOST]) AS TotalCost
-    FROM [CW].[azteca].[WORKORDER] WO
-    LEFT JOIN [CW].[azteca].[WORKORDERENTITY] WOE
-        ON WOE.[WORKORDERID] = WO.[WORKORDERID]
-    LEFT JOIN [TOC_SDE].[GISMGR].[MOTOR_FLEET] MF
-        ON MF.[EUID] = WOE.[ENTITYUID]
-    WHERE WO.[WOCATEGORY] = 'MF'
-        AND WO.[ACTUALFINISHDATE] BETWEEN ? AND ?
-        AND MF.[Department] IS NOT NULL
-    GROUP BY MF.[Department]
-    ORDER BY TotalCost DESC
+    SELECT
+        COUNT_BIG(*) AS row_count,
+        CHECKSUM_AGG(BINARY_CHECKSUM([EUID], [Model], [Department])) AS row_checksum
+    FROM [GISMGR].[MOTOR_FLEET]
     """
 
-    logger.info(
-        "Generated department cost summary query for period %s to %s",
-        start_date_str,
-        end_date_str,
-    )
-    return query, tuple(params), "cw"
-
-
-def get_cost_summary_by_vehicle(start_date=None, end_date=None, department=None):
-    """
-    Get cost summary grouped by vehicle.
-
-    Args:
-        start_date (datetime, optional): Start date for the report period.
-            If None, defaults to 90 days ago.
-        end_date (datetime, optional): End date for the report period.
-            If None, defaults to current date.
-        department (str, optional): Filter by specific department.
-            If None, returns data for all departments.
-
-    Returns:
-        tuple: (SQL query string, query parameters, database key)
-    """
-    # Use default dates if not provided
-    if start_date is None or end_date is None:
-        start_date, end_date = get_default_date_range()
-
-    # Convert dates to strings for SQL
-    start_date_str = format_date_for_query(start_date)
-    end_date_str = format_date_for_query(end_date)
-
-    # Initialize parameters list
-    params = [start_date_str, end_date_str]
-
-    # Build the base query
-    query = """
-    SELECT 
-        WOE.[ENTITYUID] AS VehicleID,
-        MF.[Model] AS VehicleModel,
-        MF.[Department],
-        COUNT(DISTINCT WO.[WORKORDERID]) AS WorkOrderCount,
-        SUM(WO.[WOLABORCOST]) AS TotalLaborCost,
-        SUM(WO.[WOMATCOST]) AS TotalMaterialCost,
-        SUM(WO.[WOLABORCOST] + WO.[WOMATCOST]) AS TotalCost
-    FROM [CW].[azteca].[WORKORDER] WO
-    LEFT JOIN [CW].[azteca].[WORKORDERENTITY] WOE
-        ON WOE.[WORKORDERID] = WO.[WORKORDERID]
-    LEFT JOIN [TOC_SDE].[GISMGR].[MOTOR_FLEET] MF
-        ON MF.[EUID] = WOE.[ENTITYUID]
-    WHERE WO.[WOCATEGORY] = 'MF'
-        AND WO.[ACTUALFINISHDATE] BETWEEN ? AND ?
-        AND WOE.[ENTITYUID] IS NOT NULL
-    """
-
-    # Add department filter if provided
-    if department:
-        query += " AND MF.[Department] = ?"
-        params.append(department)
-
-    # Complete the query with GROUP BY and ORDER BY
-    query += """
-    GROUP BY WOE.[ENTITYUID], MF.[Model], MF.[Department]
-    ORDER BY TotalCost DESC
-    """
-
-    logger.info(
-        "Generated vehicle cost summary query for period %s to %s%s",
-        start_date_str,
-        end_date_str,
-        f" for department {department}" if department else "",
-    )
-    return query, tuple(params), "cw"
-
-
-def get_costs_over_time(
-    start_date=None, end_date=None, department=None, interval="month"
-):
-    """
-    Get fleet costs aggregated over time periods.
-
-    Args:
-        start_date (datetime, optional): Start date for the report period.
-            If None, defaults to 90 days ago.
-        end_date (datetime, optional): End date for the report period.
-            If None, defaults to current date.
-        department (str, optional): Filter by specific department.
-            If None, returns data for all departments.
-        interval (str, optional): Time interval for aggregation.
-            Options: 'day', 'week', 'month', 'quarter', 'year'.
-            Defaults to 'month'.
-
-    Returns:
-        tuple: (SQL query string, query parameters, database key)
-    """
-    # Use default dates if not provided
-    if start_date is None or end_date is None:
-        start_date, end_date = get_default_date_range()
-
-    # For time-based analysis, make sure to include the entire period
-    if interval == "year":
-        # Always start from beginning of the year for yearly data
-        start_date = start_date.replace(month=1, day=1, hour=0, minute=0, second=0)
-    elif interval == "month":
-        # Start from beginning of month for monthly data
-        start_date = start_date.replace(day=1, hour=0, minute=0, second=0)
-    elif interval == "quarter":
-        # Start from beginning of quarter for quarterly data
-        start_quarter_month = ((start_date.month - 1) // 3) * 3 + 1
-        start_date = start_date.replace(
-            month=start_quarter_month, day=1, hour=0, minute=0, second=0
-        )
-
-    # Always ensure we include up to 23:59:59 on the end date for complete coverage
-    end_date = end_date.replace(hour=23, minute=59, second=59)
-
-    # Convert dates to strings for SQL
-    start_date_str = format_date_for_query(start_date)
-    end_date_str = format_date_for_query(end_date)
-
-    # Initialize parameters list
-    params = [start_date_str, end_date_str]
-
-    # Determine date grouping based on interval
-    date_group_expr = ""
-    if interval == "day":
-        # Group by day - simpler expression to avoid timezone issues
-        date_group_expr = "CAST(WO.[ACTUALFINISHDATE] AS DATE)"
-    elif interval == "week":
-        # Improved week grouping - get start of the week (Monday)
-        date_group_expr = "DATEADD(DAY, -(DATEPART(WEEKDAY, WO.[ACTUALFINISHDATE]) - 1), CAST(WO.[ACTUALFINISHDATE] AS DATE))"
-    elif interval == "month":
-        # Group by month - simplified to avoid inconsistencies
-        date_group_expr = "DATEFROMPARTS(YEAR(WO.[ACTUALFINISHDATE]), MONTH(WO.[ACTUALFINISHDATE]), 1)"
-    elif interval == "quarter":
-        # Group by quarter - calculate first day of the quarter
-        date_group_expr = "DATEFROMPARTS(YEAR(WO.[ACTUALFINISHDATE]), ((DATEPART(QUARTER, WO.[ACTUALFINISHDATE]) - 1) * 3) + 1, 1)"
-    elif interval == "year":
-        # Group by year - first day of the year
-        date_group_expr = "DATEFROMPARTS(YEAR(WO.[ACTUALFINISHDATE]), 1, 1)"
-    else:
-        # Default to monthly if invalid interval provided
-        date_group_expr = "DATEFROMPARTS(YEAR(WO.[ACTUALFINISHDATE]), MONTH(WO.[ACTUALFINISHDATE]), 1)"
-
-    # Build the base query
-    query = f"""
-    SELECT 
-        {date_group_expr} AS TimePeriod,
-        COUNT(DISTINCT WO.[WORKORDERID]) AS WorkOrderCount,
-        SUM(WO.[WOLABORCOST]) AS TotalLaborCost,
-        SUM(WO.[WOMATCOST]) AS TotalMaterialCost,
-        SUM(WO.[WOLABORCOST] + WO.[WOMATCOST]) AS TotalCost
-    FROM [CW].[azteca].[WORKORDER] WO
-    LEFT JOIN [CW].[azteca].[WORKORDERENTITY] WOE
-        ON WOE.[WORKORDERID] = WO.[WORKORDERID]
-    LEFT JOIN [TOC_SDE].[GISMGR].[MOTOR_FLEET] MF
-        ON MF.[EUID] = WOE.[ENTITYUID]
-    WHERE WO.[WOCATEGORY] = 'MF'
-        AND WO.[ACTUALFINISHDATE] BETWEEN ? AND ?
-    """
-
-    # Add department filter if provided
-    if department:
-        query += " AND MF.[Department] = ?"
-        params.append(department)
-
-    # Complete the query with GROUP BY and ORDER BY
-    query += f"""
-    GROUP BY {date_group_expr}
-    ORDER BY {date_group_expr}
-    """
-
-    logger.info(
-        "Generated time-based cost query for period %s to %s, interval %s%s",
-        start_date_str,
-        end_date_str,
-        interval,
-        f", department {department}" if department else "",
-    )
-    return query, tuple(params), "cw"
+    return query, (), "gis"
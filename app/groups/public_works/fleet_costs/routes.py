@@ -7,19 +7,22 @@ This module defines the routes for the Fleet Costs report blueprint.
 
 import logging
 import csv
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 from io import StringIO
 from flask import render_template, request, jsonify, Response
 
-from app.core.database import execute_query
+from app.core.admission import limit_concurrency
+from app.core.db_routing import allow_replica
+from app.core.utils import frame_to_records
 from app.groups.public_works.fleet_costs import bp
-from app.groups.public_works.fleet_costs.queries import (
-    get_fleet_costs,
+from app.groups.public_works.fleet_costs.engine import (
+    INTERVALS,
     get_departments,
-    get_cost_summary_by_department,
-    get_cost_summary_by_vehicle,
-    format_date_for_query,
-    get_costs_over_time,
+    get_fleet_frame,
+    period_start,
+    summarize_by_department,
+    summarize_by_vehicle,
+    summarize_over_time,
 )
 
 # Configure logger
@@ -39,12 +42,8 @@ def index():
         end_date = datetime.now().strftime("%Y-%m-%d")
         start_date = (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d")
 
-        # Get list of departments
-        query, params, db_key = get_departments()
-        departments = execute_query(query, params, db_key=db_key)
-
-        # Convert to simpler format for dropdown
-        department_list = [dept["Department"] for dept in departments]
+        # Get list of departments from the motor fleet dimension
+        department_list = get_departments()
 
         return render_template(
             "groups/public_works/fleet_costs/index.html",
@@ -59,7 +58,36 @@ def index():
         return render_template("error.html", error=str(e))
 
 
+def parse_date_range():
+    """
+    Parse the report date range from the request.
+
+    Returns:
+        tuple: (start_date, end_date) covering whole days. Defaults to the
+        last 90 days.
+
+    Raises:
+        ValueError: If a date is not in YYYY-MM-DD format.
+    """
+    start_date_str = request.args.get("start_date", "")
+    end_date_str = request.args.get("end_date", "")
+
+    if start_date_str and end_date_str:
+        start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
+        end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
+    else:
+        # Use default dates (last 90 days)
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=90)
+
+    start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=0)
+    return start_date, end_date
+
+
 @bp.route("/data")
+@limit_concurrency("cw", "heavy")
+@allow_replica(3600)
 def get_report_data():
     """
     Get report data as JSON for AJAX requests.
@@ -68,45 +96,16 @@ def get_report_data():
         Response: JSON response with report data.
     """
     try:
-        # Get date filters and department from request
-        start_date_str = request.args.get("start_date", "")
-        end_date_str = request.args.get("end_date", "")
         department = request.args.get("department", "")
 
-        # Parse dates if provided
-        if start_date_str and end_date_str:
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d").replace(
-                tzinfo=timezone.utc
-            )
-            start_date = start_date.replace(hour=0, minute=0, second=0)
-
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d").replace(
-                hour=23, minute=59, second=59, tzinfo=timezone.utc
-            )
-        else:
-            # Use default dates (last 90 days)
-            end_date = datetime.now().replace(hour=23, minute=59, second=59)
-            start_date = (start_date - timedelta(days=90)).replace(
-                hour=0, minute=0, second=0
-            )
-
-        # Get query and parameters
-        query, params, db_key = get_fleet_costs(
-            start_date, end_date, department if department else None
-        )
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        try:
+            start_date, end_date = parse_date_range()
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid date format: {e}"}), 400
 
-        # Process date fields for JSON serialization
-        for row in results:
-            if row.get("ACTUALFINISHDATE"):
-                row["ACTUALFINISHDATE"] = (
-                    row["ACTUALFINISHDATE"].isoformat()
-                    if hasattr(row["ACTUALFINISHDATE"], "isoformat")
-                    else row["ACTUALFINISHDATE"]
-                )
+        # Detail rows come from the shared fleet cost frame
+        frame = get_fleet_frame(start_date, end_date, department or None)
+        results = frame_to_records(frame)
 
         # Return data as JSON
         return jsonify(
@@ -128,6 +127,8 @@ def get_report_data():
 
 
 @bp.route("/summary/department")
+@limit_concurrency("cw", "heavy")
+@allow_replica(3600)
 def get_department_summary():
     """
     Get cost summary by department as JSON for AJAX requests.
@@ -136,29 +137,13 @@ def get_department_summary():
         Response: JSON response with department summary data.
     """
     try:
-        # Get date filters from request
-        start_date_str = request.args.get("start_date", "")
-        end_date_str = request.args.get("end_date", "")
-
-        # Parse dates if provided
-        if start_date_str and end_date_str:
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-            start_date = start_date.replace(hour=0, minute=0, second=0)
-
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-            end_date = end_date.replace(hour=23, minute=59, second=59)
-        else:
-            # Use default dates (last 90 days)
-            end_date = datetime.now().replace(hour=23, minute=59, second=59)
-            start_date = (end_date - timedelta(days=90)).replace(
-                hour=0, minute=0, second=0
-            )
-
-        # Get query and parameters
-        query, params, db_key = get_cost_summary_by_department(start_date, end_date)
+        try:
+            start_date, end_date = parse_date_range()
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid date format: {e}"}), 400
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        frame = get_fleet_frame(start_date, end_date)
+        results = frame_to_records(summarize_by_department(frame))
 
         # Return data as JSON
         return jsonify(
@@ -178,6 +163,8 @@ def get_department_summary():
 
 
 @bp.route("/summary/vehicle")
+@limit_concurrency("cw", "heavy")
+@allow_replica(3600)
 def get_vehicle_summary():
     """
     Get cost summary by vehicle as JSON for AJAX requests.
@@ -186,32 +173,15 @@ def get_vehicle_summary():
         Response: JSON response with vehicle summary data.
     """
     try:
-        # Get date filters and department from request
-        start_date_str = request.args.get("start_date", "")
-        end_date_str = request.args.get("end_date", "")
         department = request.args.get("department", "")
 
-        # Parse dates if provided
-        if start_date_str and end_date_str:
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-            start_date = start_date.replace(hour=0, minute=0, second=0)
-
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-            end_date = end_date.replace(hour=23, minute=59, second=59)
-        else:
-            # Use default dates (last 90 days)
-            end_date = datetime.now().replace(hour=23, minute=59, second=59)
-            start_date = (end_date - timedelta(days=90)).replace(
-                hour=0, minute=0, second=0
-            )
-
-        # Get query and parameters
-        query, params, db_key = get_cost_summary_by_vehicle(
-            start_date, end_date, department if department else None
-        )
+        try:
+            start_date, end_date = parse_date_range()
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid date format: {e}"}), 400
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        frame = get_fleet_frame(start_date, end_date, department or None)
+        results = frame_to_records(summarize_by_vehicle(frame))
 
         # Return data as JSON
         return jsonify(
@@ -232,6 +202,8 @@ def get_vehicle_summary():
 
 
 @bp.route("/export")
+@limit_concurrency("cw", "heavy")
+@allow_replica(3600)
 def export_report():
     """
     Export fleet costs data to CSV.
@@ -240,32 +212,15 @@ def export_report():
         Response: CSV file download.
     """
     try:
-        # Get date filters and department from request
-        start_date_str = request.args.get("start_date", "")
-        end_date_str = request.args.get("end_date", "")
         department = request.args.get("department", "")
 
-        # Parse dates if provided
-        if start_date_str and end_date_str:
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-            start_date = start_date.replace(hour=0, minute=0, second=0)
-
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-            end_date = end_date.replace(hour=23, minute=59, second=59)
-        else:
-            # Use default dates (last 90 days)
-            end_date = datetime.now().replace(hour=23, minute=59, second=59)
-            start_date = (end_date - timedelta(days=90)).replace(
-                hour=0, minute=0, second=0
-            )
-
-        # Get query and parameters
-        query, params, db_key = get_fleet_costs(
-            start_date, end_date, department if department else None
-        )
+        try:
+            start_date, end_date = parse_date_range()
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid date format: {e}"}), 400
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        frame = get_fleet_frame(start_date, end_date, department or None)
+        results = frame_to_records(frame, iso_dates=True)
 
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
@@ -295,9 +250,9 @@ def export_report():
         # Write data rows
         for row in results:
             # Calculate total cost
-            labor_cost = row.get("WOLABORCOST", 0) or 0
-            material_cost = row.get("WOMATCOST", 0) or 0
-            total_cost = labor_cost + material_cost
+            labor_cost = row.get("WOLABORCOST") or 0
+            material_cost = row.get("WOMATCOST") or 0
+            total_cost = round(labor_cost + material_cost, 2)
 
             writer.writerow(
                 [
@@ -333,6 +288,8 @@ def export_report():
 
 
 @bp.route("/time-series")
+@limit_concurrency("cw", "heavy")
+@allow_replica(3600)
 def get_time_series_data():
     """
     Get costs over time data as JSON for AJAX requests.
@@ -341,41 +298,15 @@ def get_time_series_data():
         Response: JSON response with time series data.
     """
     try:
-        # Get date filters, department, and interval from request
-        start_date_str = request.args.get("start_date", "")
-        end_date_str = request.args.get("end_date", "")
         department = request.args.get("department", "")
         interval = request.args.get("interval", "month")
 
         # Validate interval
-        valid_intervals = ["day", "week", "month", "quarter", "year"]
-        if interval not in valid_intervals:
+        if interval not in INTERVALS:
             interval = "month"  # Default to month if invalid
 
-        # Parse dates if provided with better error handling
         try:
-            if start_date_str and end_date_str:
-                # Parse the input dates, handling potential format issues
-                start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-                start_date = start_date.replace(hour=0, minute=0, second=0)
-
-                end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-                # Make sure end date is the end of the day to include all data
-                end_date = end_date.replace(hour=23, minute=59, second=59)
-
-                # Debug logging
-                logger.info(
-                    "Time series request with interval %s from %s to %s",
-                    interval,
-                    start_date.strftime("%Y-%m-%d %H:%M:%S"),
-                    end_date.strftime("%Y-%m-%d %H:%M:%S"),
-                )
-            else:
-                # Use default dates (last 90 days)
-                end_date = datetime.now().replace(hour=23, minute=59, second=59)
-                start_date = (end_date - timedelta(days=90)).replace(
-                    hour=0, minute=0, second=0
-                )
+            start_date, end_date = parse_date_range()
         except ValueError as e:
             logger.error("Date parsing error: %s", str(e))
             return (
@@ -383,64 +314,18 @@ def get_time_series_data():
                 400,
             )
 
-        # Get query and parameters
-        query, params, db_key = get_costs_over_time(
-            start_date, end_date, department if department else None, interval
-        )
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Include the whole first period so its totals are complete
+        start_date = period_start(start_date, interval)
 
-        # Add debug logging for the data
-        logger.debug("Time series query results count: %d", len(results))
-
-        # Log details about specific periods for debugging
-        if interval == "month":
-            current_month = datetime.now().month
-            current_year = datetime.now().year
-
-            # Check if we have data for the current month
-            current_month_data = [
-                r
-                for r in results
-                if hasattr(r["TimePeriod"], "month")
-                and r["TimePeriod"].month == current_month
-                and r["TimePeriod"].year == current_year
-            ]
-            logger.debug(
-                "Data for current month (%d/%d): %s",
-                current_month,
-                current_year,
-                "Found" if current_month_data else "Not found",
-            )
-
-            # Check full range of months in the data
-            if results:
-                months = [
-                    (
-                        (r["TimePeriod"].year, r["TimePeriod"].month)
-                        if hasattr(r["TimePeriod"], "year")
-                        and hasattr(r["TimePeriod"], "month")
-                        else ("unknown", "unknown")
-                    )
-                    for r in results
-                ]
-                logger.debug("Months in results (year, month): %s", months)
+        logger.info(
+            "Time series request with interval %s from %s to %s",
+            interval,
+            start_date.strftime("%Y-%m-%d %H:%M:%S"),
+            end_date.strftime("%Y-%m-%d %H:%M:%S"),
+        )
 
-        # Process date fields for JSON serialization with enhanced handling
-        for row in results:
-            if row.get("TimePeriod"):
-                try:
-                    # Ensure consistent date format for output
-                    if hasattr(row["TimePeriod"], "strftime"):
-                        # Use ISO format for most consistent parsing on client side
-                        row["TimePeriod"] = row["TimePeriod"].isoformat()
-                    else:
-                        # If it's not a datetime object somehow, convert to string
-                        row["TimePeriod"] = str(row["TimePeriod"])
-                except Exception as e:
-                    logger.error("Error formatting date: %s", str(e))
-                    row["TimePeriod"] = str(row["TimePeriod"])
+        frame = get_fleet_frame(start_date, end_date, department or None)
+        results = frame_to_records(summarize_over_time(frame, interval))
 
         # Return data as JSON
         return jsonify(
@@ -5,8 +5,12 @@ This module defines routes for the main Groups dashboard.
 """
 
 import logging
-from flask import render_template
-from app.core.report_registry import get_all_groups, get_group_reports
+import os
+from flask import current_app, render_template, send_file
+from app.core.auth import admin_required
+from app.core.profiler import get_profile_path, list_profiles
+from app.core.report_metrics import report_metrics
+from app.core.report_registry import get_all_groups, get_all_reports, get_group_reports
 
 from app.groups import bp
 
@@ -37,3 +41,79 @@ def index():
     except Exception as e:
         logger.error("Error rendering Groups dashboard: %s", str(e))
         return render_template("error.html", error=str(e))
+
+
+@bp.route("/admin/profiles")
+@admin_required
+def profiles():
+    """
+    Render the list of recent request profiles.
+
+    Returns:
+        str: Rendered HTML template.
+    """
+    return render_template(
+        "groups/admin/profiles.html",
+        title="Request Profiles",
+        profiles=list_profiles(),
+    )
+
+
+@bp.route("/admin/profiles/<profile_id>")
+@admin_required
+def download_profile(profile_id):
+    """
+    Download a request profile in speedscope format.
+
+    Args:
+        profile_id (str): The profile ID.
+
+    Returns:
+        Response: The speedscope file.
+    """
+    path = get_profile_path(profile_id)
+    if path is None:
+        return render_template("error.html", error="Profile not found."), 404
+    return send_file(
+        path,
+        mimetype="application/json",
+        as_attachment=True,
+        download_name=os.path.basename(path),
+    )
+
+
+@bp.route("/admin/reports")
+@admin_required
+def report_performance():
+    """
+    Render the performance of every registered report in this worker.
+
+    Reports are listed by the total time spent serving them, so the ones
+    most worth optimizing come first.
+
+    Returns:
+        str: Rendered HTML template.
+    """
+    stats = report_metrics.get_stats()
+    groups = {group["id"]: group["name"] for group in get_all_groups()}
+    reports = [
+        {
+            "report": report,
+            "group_name": groups.get(report["group_id"], report["group_id"]),
+            "stats": stats.get((report["group_id"], report["id"])),
+        }
+        for report in get_all_reports()
+    ]
+    reports.sort(
+        key=lambda entry: entry["stats"]["total_seconds"] if entry["stats"] else -1,
+        reverse=True,
+    )
+    return render_template(
+        "groups/admin/reports.html",
+        title="Report Performance",
+        reports=reports,
+        window_minutes=report_metrics.window_seconds / 60,
+        pid=os.getpid(),
+        enabled=current_app.config.get("REPORT_METRICS_ENABLED", True)
+        and current_app.config.get("REQUEST_TIMING_ENABLED", True),
+    )
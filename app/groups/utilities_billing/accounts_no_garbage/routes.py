@@ -11,7 +11,7 @@ from io import StringIO
 
 from flask import Response, jsonify, render_template, request
 
-from app.core.database import execute_query
+from app.core.stale_cache import StaleReportCache
 from app.groups.utilities_billing.accounts_no_garbage import bp
 from app.groups.utilities_billing.accounts_no_garbage.queries import (
     get_accounts_no_garbage, get_street_summary)
@@ -19,6 +19,12 @@ from app.groups.utilities_billing.accounts_no_garbage.queries import (
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Garbage service changes slowly: serve results for 15 minutes, then stale
+# while refreshing, for up to 4 hours
+report_cache = StaleReportCache(
+    "accounts_no_garbage", fresh_seconds=900, max_stale_seconds=14400
+)
+
 
 @bp.route("/")
 def index():
@@ -51,11 +57,20 @@ def get_report_data():
         # Get query and parameters
         query, params, db_key = get_accounts_no_garbage()
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, served stale while they refresh when allowed
+        results, freshness = report_cache.query(query, params, db_key)
 
         # Return data as JSON
-        return jsonify({"success": True, "data": results, "count": len(results)})
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": results,
+                    "count": len(results),
+                    "freshness": freshness.to_json(),
+                }
+            )
+        )
 
     except Exception as e:
         logger.error(f"Error fetching accounts no garbage data: {str(e)}")
@@ -74,11 +89,20 @@ def get_streets_data():
         # Get query and parameters
         query, params, db_key = get_street_summary()
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, served stale while they refresh when allowed
+        results, freshness = report_cache.query(query, params, db_key)
 
         # Return data as JSON
-        return jsonify({"success": True, "data": results, "count": len(results)})
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": results,
+                    "count": len(results),
+                    "freshness": freshness.to_json(),
+                }
+            )
+        )
 
     except Exception as e:
         logger.error(f"Error fetching street summary data: {str(e)}")
@@ -97,8 +121,8 @@ def export_report():
         # Get query and parameters
         query, params, db_key = get_accounts_no_garbage()
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, served stale while they refresh when allowed
+        results, _ = report_cache.query(query, params, db_key)
 
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
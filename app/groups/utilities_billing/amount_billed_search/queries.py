@@ -6,17 +6,20 @@ Each function returns a SQL query string and optional parameters.
 """
 
 import logging
+from decimal import Decimal
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
 
-def get_bill_amount_search(amount):
+def get_bill_amount_search(amount, tolerance=None):
     """
     Get bill amount search results.
 
     Args:
         amount (str): The bill amount to search for, can include wildcards.
+        tolerance (Decimal, optional): If set, match bill amounts within plus
+            or minus this many dollars of an exact amount instead of by pattern.
 
     Returns:
         tuple: (SQL query string, query parameters)
@@ -26,18 +29,27 @@ def get_bill_amount_search(amount):
         # Return a query that will return no results
         return "SELECT 1 WHERE 1=0", ()
 
-    # Prepare the search parameter
-    search_amount = amount
+    if tolerance:
+        # Range search around an exact amount
+        exact_amount = Decimal(amount)
+        where_clause = "BA.BillAmount BETWEEN ? AND ?"
+        params = (exact_amount - tolerance, exact_amount + tolerance)
+        logger.info("Preparing bill amount search for %s +/- %s", amount, tolerance)
+    else:
+        # Prepare the search parameter
+        search_amount = amount
 
-    # Check if wildcards are already included
-    if "%" not in search_amount:
-        # Add wildcards for partial matching
-        search_amount = f"%{search_amount}%"
+        # Check if wildcards are already included
+        if "%" not in search_amount:
+            # Add wildcards for partial matching
+            search_amount = f"%{search_amount}%"
 
-    logger.info(f"Preparing bill amount search for: {search_amount}")
+        where_clause = "BA.BillAmount LIKE ?"
+        params = (search_amount,)
+        logger.info("Preparing bill amount search for: %s", search_amount)
 
     # Build the query based on the original SSRS query
-    query = """
+    query = f"""
     SELECT 
         BA.BillAmount, 
         UA.FullAccountNumber, 
@@ -48,13 +60,10 @@ def get_bill_amount_search(amount):
         [LogosDB].[dbo].[UtilityAccount] AS UA
         ON BA.UtilityAccountID = UA.UtilityAccountID
     WHERE 
-        BA.BillAmount LIKE ?
+        {where_clause}
     ORDER BY 
         BA.AuditDate DESC
     OPTION (RECOMPILE)
     """
 
-    # Parameters
-    params = (search_amount,)
-
     return query, params, "nws"
@@ -5,16 +5,76 @@ This module defines the routes for the Amount Billed Search report blueprint.
 """
 
 import logging
+from decimal import Decimal, InvalidOperation
 from flask import render_template, request, jsonify
 
 from app.core.database import execute_query
 from app.groups.utilities_billing.amount_billed_search import bp
 from app.groups.utilities_billing.amount_billed_search.queries import get_bill_amount_search
+from app.groups.utilities_billing.amount_index import (
+    SOURCE_BILL,
+    find_bill_amounts,
+    get_amount_index,
+    parse_tolerance,
+)
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
 
+def parse_search_parameters():
+    """
+    Read and validate the amount and tolerance request parameters.
+
+    Returns:
+        tuple: (amount, tolerance, error message or None)
+    """
+    amount = request.args.get("amount", "").strip()
+    if not amount:
+        return amount, None, "Please provide an amount to search for"
+
+    try:
+        tolerance = parse_tolerance(request.args.get("tolerance", ""))
+    except ValueError as e:
+        return amount, None, str(e)
+
+    if tolerance:
+        # Tolerance searches need an exact amount rather than a pattern
+        try:
+            exact_amount = Decimal(amount)
+        except InvalidOperation:
+            exact_amount = None
+
+        if exact_amount is None or not exact_amount.is_finite():
+            return (
+                amount,
+                None,
+                "Tolerance search requires an exact amount without wildcards",
+            )
+
+    return amount, tolerance, None
+
+
+def search_bill_amounts(amount, tolerance=None):
+    """
+    Search bill amounts using the local amount index when it is available.
+
+    Args:
+        amount (str): The bill amount or LIKE pattern to search for.
+        tolerance (Decimal, optional): Range to search around an exact amount.
+
+    Returns:
+        tuple: (list of result rows, "index" or "database")
+    """
+    index = get_amount_index()
+    if index is not None and index.covers((SOURCE_BILL,)) and "[" not in amount:
+        return find_bill_amounts(index, amount, tolerance), "index"
+
+    # Fall back to scanning the audit table
+    query, params, db_key = get_bill_amount_search(amount, tolerance)
+    return execute_query(query, params, db_key=db_key), "database"
+
+
 @bp.route("/")
 def index():
     """
@@ -43,25 +103,13 @@ def search():
         Response: JSON response with search results.
     """
     try:
-        # Get amount parameter from request
-        amount = request.args.get("amount", "")
+        # Get search parameters from request
+        amount, tolerance, error = parse_search_parameters()
+        if error:
+            return jsonify({"success": False, "error": error}), 400
 
-        if not amount:
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "error": "Please provide an amount to search for",
-                    }
-                ),
-                400,
-            )
-
-        # Get query and parameters
-        query, params, db_key = get_bill_amount_search(amount)
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Search the amount index (or the database while it is unavailable)
+        results, searched = search_bill_amounts(amount, tolerance)
 
         # Return data as JSON
         return jsonify(
@@ -69,7 +117,8 @@ def search():
                 "success": True,
                 "data": results,
                 "count": len(results),
-                "search_criteria": {"amount": amount},
+                "search_criteria": {"amount": amount, "tolerance": tolerance},
+                "source": searched,
             }
         )
 
@@ -92,25 +141,13 @@ def export():
         from io import StringIO
         from datetime import datetime
 
-        # Get amount parameter from request
-        amount = request.args.get("amount", "")
-
-        if not amount:
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "error": "Please provide an amount to search for",
-                    }
-                ),
-                400,
-            )
-
-        # Get query and parameters
-        query, params, db_key = get_bill_amount_search(amount)
+        # Get search parameters from request
+        amount, tolerance, error = parse_search_parameters()
+        if error:
+            return jsonify({"success": False, "error": error}), 400
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Search the amount index (or the database while it is unavailable)
+        results, _ = search_bill_amounts(amount, tolerance)
 
         if not results:
             return (
@@ -0,0 +1,809 @@
+"""
+Utilities Billing Amount Index.
+
+This module maintains a local, incrementally refreshed index of billed and
+paid amounts so the Amount Billed Search and Dollar Search reports can answer
+lookups without scanning UtilityBillAudit and the payment tables per request.
+
+Each snapshot is a set of parallel NumPy arrays sorted by amount (in cents)
+and searched with binary search. A trigram index over the distinct amount
+strings answers SQL LIKE-style wildcard searches. A background thread refreshes
+the snapshot by reloading the most recent day(s) of every source, and rebuilds
+it from scratch periodically to pick up back-dated changes. Each snapshot is
+published to the shared array cache, and other worker processes map it
+instead of querying the sources themselves.
+"""
+
+import logging
+import re
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+from flask import current_app
+
+from app.core.background import BackgroundRefresher
+from app.core.database import stream_query
+from app.core.shared_arrays import SharedArrayStore
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Source codes stored in the index
+SOURCE_BILL = 0
+SOURCE_UTILITY_PAYMENT = 1
+SOURCE_ONLINE_PAYMENT = 2
+SOURCE_CASH_CHECK_PAYMENT = 3
+
+SOURCE_NAMES = {
+    SOURCE_BILL: "Bill",
+    SOURCE_UTILITY_PAYMENT: "Utility Payment",
+    SOURCE_ONLINE_PAYMENT: "Online Payment",
+    SOURCE_CASH_CHECK_PAYMENT: "Cash/Check Payment",
+}
+
+PAYMENT_SOURCES = (
+    SOURCE_UTILITY_PAYMENT,
+    SOURCE_ONLINE_PAYMENT,
+    SOURCE_CASH_CHECK_PAYMENT,
+)
+
+# Default and maximum tolerance for range searches
+DEFAULT_TOLERANCE = Decimal("0.50")
+MAX_TOLERANCE = Decimal("10.00")
+
+# Stamp used for rows without a date (sorts before every real date)
+NULL_STAMP = np.iinfo(np.int64).min
+
+_EPOCH = datetime(1970, 1, 1)
+_EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+
+
+def format_date_for_query(date_obj):
+    """
+    Format a datetime object for SQL Server query.
+
+    Args:
+        date_obj (datetime): The datetime object to format.
+
+    Returns:
+        str: Formatted date string for SQL Server.
+    """
+    return date_obj.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def get_bill_amounts_since(cutoff=None):
+    """
+    Get billed amounts audited on or after a cutoff date.
+
+    Args:
+        cutoff (datetime, optional): Earliest audit date to load.
+            If None, the full history is loaded.
+
+    Returns:
+        tuple: (SQL query string, query parameters, database key)
+    """
+    query = """
+    SELECT
+        BA.BillAmount AS Amount,
+        UA.FullAccountNumber AS AccountOrRef,
+        BA.AuditDate AS EntryDate
+    FROM
+        [LogosDB].[dbo].[UtilityBillAudit] AS BA
+    INNER JOIN
+        [LogosDB].[dbo].[UtilityAccount] AS UA
+        ON BA.UtilityAccountID = UA.UtilityAccountID
+    """
+
+    if cutoff is None:
+        return query, (), "nws"
+
+    query += " WHERE BA.AuditDate >= ?"
+    return query, (format_date_for_query(cutoff),), "nws"
+
+
+def get_utility_payments_since(cutoff=None):
+    """
+    Get utility account payment totals per account and transaction date.
+
+    Args:
+        cutoff (datetime, optional): Earliest transaction date to load.
+            If None, the full history is loaded.
+
+    Returns:
+        tuple: (SQL query string, query parameters, database key)
+    """
+    where_clause = "WHERE S.TransactionDate >= ?" if cutoff is not None else ""
+
+    query = f"""
+    SELECT SUM(S.TransSummaryAmount) AS Amount,
+        UA.FullAccountNumber AS AccountOrRef,
+        S.TransactionDate AS EntryDate
+    FROM UtilityAccount UA
+    INNER JOIN UtilityTransactionSummary S
+        ON UA.UtilityAccountID = S.UtilityAccountID
+    {where_clause}
+    GROUP BY UA.FullAccountNumber,
+        S.TransactionDate
+    """
+
+    params = (format_date_for_query(cutoff),) if cutoff is not None else ()
+    return query, params, "nws"
+
+
+def get_online_payments_since(cutoff=None):
+    """
+    Get online portal payments made on or after a cutoff date.
+
+    Args:
+        cutoff (datetime, optional): Earliest transaction date to load.
+            If None, the full history is loaded.
+
+    Returns:
+        tuple: (SQL query string, query parameters, database key)
+    """
+    where_clause = "WHERE T.TransactionDate >= ?" if cutoff is not None else ""
+
+    query = f"""
+    SELECT T.Amount AS Amount,
+        D.ReferenceCode AS AccountOrRef,
+        T.TransactionDate AS EntryDate
+    FROM [LogosDB].[ePay].[Transaction] T
+    INNER JOIN epay.TransactionDetail D
+        ON T.TransactionId = D.TransactionId
+    {where_clause}
+    """
+
+    params = (format_date_for_query(cutoff),) if cutoff is not None else ()
+    return query, params, "nws"
+
+
+def get_cash_check_payments_since(cutoff=None):
+    """
+    Get cash and check receipt payments made on or after a cutoff date.
+
+    Args:
+        cutoff (datetime, optional): Earliest payment date to load.
+            If None, the full history is loaded.
+
+    Returns:
+        tuple: (SQL query string, query parameters, database key)
+    """
+    where_clause = "WHERE R.PaymentDate >= ?" if cutoff is not None else ""
+
+    query = f"""
+    SELECT RP.PaymentAmount AS Amount,
+        (R.ReceiptNumber + '   ' + R.ReceivedFromName) AS AccountOrRef,
+        R.PaymentDate AS EntryDate
+    FROM dbo.Receipt R
+    INNER JOIN ReceiptBatch RB
+        ON R.ReceiptBatchID = RB.ReceiptBatchID
+    INNER JOIN dbo.CollectionStation CS
+        ON R.CollectionStationID = CS.CollectionStationID
+    INNER JOIN dbo.SecurityUser SU
+        ON R.CashierID = SU.UserID
+    LEFT JOIN dbo.ReceiptPayment RP
+        ON R.ReceiptID = RP.ReceiptID
+    INNER JOIN dbo.ReceiptTransaction RT
+        ON R.ReceiptID = RT.ReceiptID
+    {where_clause}
+    """
+
+    params = (format_date_for_query(cutoff),) if cutoff is not None else ()
+    return query, params, "nws"
+
+
+# Loader query for each indexed source
+_SOURCE_QUERIES = {
+    SOURCE_BILL: get_bill_amounts_since,
+    SOURCE_UTILITY_PAYMENT: get_utility_payments_since,
+    SOURCE_ONLINE_PAYMENT: get_online_payments_since,
+    SOURCE_CASH_CHECK_PAYMENT: get_cash_check_payments_since,
+}
+
+
+def to_cents(amount):
+    """
+    Convert a dollar amount to integer cents.
+
+    Args:
+        amount (Decimal, float, int or str): The dollar amount.
+
+    Returns:
+        int: The amount in cents, rounded to the nearest cent.
+    """
+    return int((Decimal(str(amount)) * 100).to_integral_value())
+
+
+def format_cents(cents):
+    """
+    Format integer cents the way SQL Server renders a money value as text.
+
+    Args:
+        cents (int): The amount in cents.
+
+    Returns:
+        str: The amount with two decimal places and no separators (e.g. "-12.05").
+    """
+    cents = int(cents)
+    sign = "-" if cents < 0 else ""
+    whole, fraction = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{fraction:02d}"
+
+
+def parse_tolerance(value):
+    """
+    Parse a tolerance request parameter.
+
+    Args:
+        value (str): The raw parameter value (dollars). Empty means exact match.
+
+    Returns:
+        Decimal: The tolerance in dollars, capped at MAX_TOLERANCE.
+
+    Raises:
+        ValueError: If the value is not a non-negative number.
+    """
+    if not value:
+        return Decimal("0")
+
+    try:
+        tolerance = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError("Invalid tolerance. Please enter a dollar amount.")
+
+    if not tolerance.is_finite() or tolerance < 0:
+        raise ValueError("Invalid tolerance. Please enter a dollar amount.")
+
+    return min(tolerance, MAX_TOLERANCE)
+
+
+def _to_stamp(value):
+    """Convert a date or datetime to microseconds since the epoch."""
+    if value is None:
+        return NULL_STAMP
+    if not isinstance(value, datetime):
+        if isinstance(value, date):
+            value = datetime(value.year, value.month, value.day)
+        else:
+            return NULL_STAMP
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_stamp(stamp):
+    """Convert microseconds since the epoch back to a datetime."""
+    if stamp == NULL_STAMP:
+        return None
+    return _EPOCH + timedelta(microseconds=int(stamp))
+
+
+def _like_to_regex(pattern):
+    """Compile a SQL LIKE pattern ('%' and '_' wildcards) to a regex."""
+    parts = []
+    for char in pattern:
+        if char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts), re.DOTALL)
+
+
+def _trigrams(text):
+    """Return the set of 3-character substrings of a string."""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class AmountIndex:
+    """
+    Immutable snapshot of indexed amounts.
+
+    Entries are stored as parallel arrays sorted by amount in cents:
+    ``cents`` (int64), ``stamps`` (int64 microseconds since the epoch),
+    ``refs`` (int64 positions in ``ref_table``, a tuple of account numbers
+    and references) and ``sources`` (int8).
+    """
+
+    def __init__(self, cents, stamps, refs, sources, ref_table, coverage, previous=None):
+        self.cents = cents
+        self.stamps = stamps
+        self.refs = refs
+        self.sources = sources
+        self.ref_table = ref_table
+        self.coverage = coverage
+        self.built_at = datetime.now()
+        # When the lineage of this snapshot was last rebuilt from scratch
+        self.rebuilt_at = self.built_at if previous is None else previous.rebuilt_at
+        self.distinct = np.unique(cents)
+
+        if previous is None:
+            self._gram_amounts = np.empty(0, dtype=np.int64)
+            self._grams = {}
+        else:
+            self._gram_amounts = previous._gram_amounts
+            self._grams = previous._grams
+        self._extend_grams()
+
+        # Latest date loaded for each source, used as the refresh watermark
+        self.watermarks = {}
+        for source in _SOURCE_QUERIES:
+            source_stamps = stamps[sources == source]
+            if len(source_stamps):
+                latest = int(source_stamps.max())
+                if latest != NULL_STAMP:
+                    self.watermarks[source] = _from_stamp(latest)
+
+    def __len__(self):
+        return len(self.cents)
+
+    def _extend_grams(self):
+        """
+        Extend the trigram postings to cover every distinct amount.
+
+        Postings carried over from the previous snapshot are reused; only
+        amounts that were not indexed before are tokenized. Postings may still
+        list amounts that have since dropped out of the index, which is
+        harmless because every candidate is resolved against the sorted arrays.
+        """
+        added = np.setdiff1d(self.distinct, self._gram_amounts, assume_unique=True)
+        if not len(added):
+            return
+
+        additions = {}
+        for cents in added.tolist():
+            for gram in _trigrams(format_cents(cents)):
+                additions.setdefault(gram, []).append(cents)
+
+        grams = dict(self._grams)
+        for gram, values in additions.items():
+            values = np.asarray(values, dtype=np.int64)
+            if gram in grams:
+                grams[gram] = np.union1d(grams[gram], values)
+            else:
+                grams[gram] = values
+
+        self._grams = grams
+        self._gram_amounts = np.union1d(self._gram_amounts, added)
+
+    def covers(self, sources, start_date=None):
+        """
+        Check whether the index holds the full history needed for a search.
+
+        Args:
+            sources (iterable): Source codes the search needs.
+            start_date (datetime, optional): Earliest date the search needs.
+
+        Returns:
+            bool: True if every source was loaded back to start_date.
+        """
+        for source in sources:
+            cutoff = self.coverage.get(source)
+            if cutoff is None:
+                continue
+            if start_date is None or start_date < cutoff:
+                return False
+        return True
+
+    def match_amounts(self, pattern):
+        """
+        Find the distinct amounts whose text matches a SQL LIKE pattern.
+
+        Args:
+            pattern (str): LIKE pattern using '%' and '_' wildcards.
+
+        Returns:
+            numpy.ndarray: Matching amounts in cents.
+        """
+        literals = [part for part in re.split(r"[%_]", pattern) if part]
+        candidates = None
+        for literal in literals:
+            for gram in _trigrams(literal):
+                postings = self._grams.get(gram)
+                if postings is None:
+                    return np.empty(0, dtype=np.int64)
+                candidates = (
+                    postings
+                    if candidates is None
+                    else np.intersect1d(candidates, postings, assume_unique=True)
+                )
+
+        if candidates is None:
+            candidates = self.distinct
+
+        regex = _like_to_regex(pattern)
+        matched = [
+            cents
+            for cents in candidates.tolist()
+            if regex.fullmatch(format_cents(cents))
+        ]
+        return np.asarray(matched, dtype=np.int64)
+
+    def positions_for_amounts(self, amounts):
+        """Return entry positions for an array of exact amounts in cents."""
+        if not len(amounts):
+            return _EMPTY_POSITIONS
+        lefts = np.searchsorted(self.cents, amounts, side="left")
+        rights = np.searchsorted(self.cents, amounts, side="right")
+        ranges = [np.arange(lo, hi) for lo, hi in zip(lefts, rights) if hi > lo]
+        return np.concatenate(ranges) if ranges else _EMPTY_POSITIONS
+
+    def positions_for_range(self, low_cents, high_cents):
+        """Return entry positions for amounts between two bounds (inclusive)."""
+        lo = np.searchsorted(self.cents, low_cents, side="left")
+        hi = np.searchsorted(self.cents, high_cents, side="right")
+        return np.arange(lo, hi)
+
+    def filter(self, positions, sources=None, start_date=None, end_date=None):
+        """
+        Filter entry positions by source and date, newest first.
+
+        Args:
+            positions (numpy.ndarray): Entry positions to filter.
+            sources (iterable, optional): Source codes to keep.
+            start_date (datetime, optional): Earliest date to keep.
+            end_date (datetime, optional): Latest date to keep.
+
+        Returns:
+            numpy.ndarray: Filtered positions ordered by date descending.
+        """
+        if not len(positions):
+            return positions
+
+        if sources is not None:
+            keep = np.isin(self.sources[positions], list(sources))
+            positions = positions[keep]
+
+        stamps = self.stamps[positions]
+        if start_date is not None:
+            keep = stamps >= _to_stamp(start_date)
+            positions, stamps = positions[keep], stamps[keep]
+        if end_date is not None:
+            keep = (stamps <= _to_stamp(end_date)) & (stamps != NULL_STAMP)
+            positions, stamps = positions[keep], stamps[keep]
+
+        order = np.argsort(stamps, kind="stable")[::-1]
+        return positions[order]
+
+    def entries(self, positions):
+        """
+        Yield the entries at the given positions.
+
+        Yields:
+            tuple: (amount as Decimal, account/reference, date, source code)
+        """
+        for position in positions.tolist():
+            yield (
+                Decimal(int(self.cents[position])).scaleb(-2),
+                self.ref_table[int(self.refs[position])],
+                _from_stamp(int(self.stamps[position])),
+                int(self.sources[position]),
+            )
+
+
+def find_bill_amounts(index, amount, tolerance=None):
+    """
+    Search indexed bill amounts.
+
+    Args:
+        index (AmountIndex): The index snapshot to search.
+        amount (str): Amount or LIKE pattern. Values without wildcards are
+            matched as a substring, as the SQL report does.
+        tolerance (Decimal, optional): If set, match numeric amounts within
+            plus or minus this many dollars instead of by pattern.
+
+    Returns:
+        list: Dictionaries with BillAmount, FullAccountNumber and AuditDate.
+    """
+    if tolerance:
+        cents = to_cents(amount)
+        spread = to_cents(tolerance)
+        positions = index.positions_for_range(cents - spread, cents + spread)
+    else:
+        pattern = amount if "%" in amount else f"%{amount}%"
+        positions = index.positions_for_amounts(index.match_amounts(pattern))
+
+    positions = index.filter(positions, sources=(SOURCE_BILL,))
+    return [
+        {"BillAmount": value, "FullAccountNumber": ref, "AuditDate": entry_date}
+        for value, ref, entry_date, _ in index.entries(positions)
+    ]
+
+
+def find_payments(index, amount, start_date, end_date, tolerance=None):
+    """
+    Search indexed payments across all payment sources.
+
+    Args:
+        index (AmountIndex): The index snapshot to search.
+        amount (float or Decimal): The payment amount.
+        start_date (datetime): Start of the transaction date range.
+        end_date (datetime): End of the transaction date range.
+        tolerance (Decimal, optional): Match amounts within plus or minus
+            this many dollars.
+
+    Returns:
+        list: Dictionaries with AccountOrRef, Amount, TransactionDate and PaymentType.
+    """
+    cents = to_cents(amount)
+    spread = to_cents(tolerance) if tolerance else 0
+    positions = index.positions_for_range(cents - spread, cents + spread)
+    positions = index.filter(positions, PAYMENT_SOURCES, start_date, end_date)
+    return [
+        {
+            "AccountOrRef": ref,
+            "Amount": value,
+            "TransactionDate": entry_date,
+            "PaymentType": SOURCE_NAMES[source],
+        }
+        for value, ref, entry_date, source in index.entries(positions)
+    ]
+
+
+class _IndexState:
+    """Process-wide holder for the current snapshot and reference table."""
+
+    def __init__(self):
+        self.snapshot = None
+        self.ref_ids = {}
+        self.ref_table = []
+        # Shared array cache version of the snapshot, if it was shared
+        self.version = None
+
+
+_state = _IndexState()
+_refresher = BackgroundRefresher("amount-index-refresh")
+_store = SharedArrayStore("amount-index")
+
+
+def _publish_index(snapshot):
+    """Share a snapshot with other worker processes."""
+    _state.version = _store.publish(
+        {
+            "cents": snapshot.cents,
+            "stamps": snapshot.stamps,
+            "refs": snapshot.refs,
+            "sources": snapshot.sources,
+            "ref_table": np.asarray(snapshot.ref_table, dtype=object),
+        },
+        {"coverage": snapshot.coverage, "rebuilt_at": snapshot.rebuilt_at},
+    )
+
+
+def _map_shared_index(previous, full, config):
+    """
+    Map a snapshot another worker published since this one was built.
+
+    The snapshot must be younger than AMOUNT_INDEX_REFRESH_SECONDS, and when a
+    full rebuild is due, rebuilt within AMOUNT_INDEX_REBUILD_SECONDS.
+
+    Returns:
+        AmountIndex: The mapped snapshot, or None if there is no such one.
+    """
+    shared = _store.load(config.get("AMOUNT_INDEX_REFRESH_SECONDS", 300))
+    if shared is None or shared.version == _state.version:
+        return None
+
+    rebuilt_at = shared.meta["rebuilt_at"]
+    if previous is not None:
+        if shared.published_at <= previous.built_at:
+            return None
+        rebuild_seconds = config.get("AMOUNT_INDEX_REBUILD_SECONDS", 86400)
+        if full and (datetime.now() - rebuilt_at).total_seconds() > rebuild_seconds:
+            return None
+
+    _state.ref_table = shared.arrays["ref_table"].tolist()
+    _state.ref_ids = {ref: ref_id for ref_id, ref in enumerate(_state.ref_table)}
+    snapshot = AmountIndex(
+        shared.arrays["cents"],
+        shared.arrays["stamps"],
+        shared.arrays["refs"],
+        shared.arrays["sources"],
+        tuple(_state.ref_table),
+        shared.meta["coverage"],
+        previous=previous,
+    )
+    snapshot.rebuilt_at = rebuilt_at
+    _state.snapshot = snapshot
+    _state.version = shared.version
+    return snapshot
+
+
+def _history_cutoff(source, config, now):
+    """Return the earliest date loaded for a source on a full build."""
+    if source == SOURCE_BILL:
+        days = config.get("AMOUNT_INDEX_BILL_HISTORY_DAYS")
+    else:
+        days = config.get("AMOUNT_INDEX_PAYMENT_HISTORY_DAYS")
+    if not days:
+        return None
+    return (now - timedelta(days=days)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def _intern_ref(ref):
+    """Return the ref_table position for an account number or reference."""
+    ref_id = _state.ref_ids.get(ref)
+    if ref_id is None:
+        ref_id = len(_state.ref_table)
+        _state.ref_table.append(ref)
+        _state.ref_ids[ref] = ref_id
+    return ref_id
+
+
+def _compact_refs(refs):
+    """
+    Drop references no entry uses any more and renumber the rest.
+
+    Incremental refreshes intern new references and replace old entries, so
+    without compaction the reference table would only ever grow.
+
+    Args:
+        refs (numpy.ndarray): ref_table positions of every entry.
+
+    Returns:
+        tuple: (renumbered positions, the compacted table as a tuple)
+    """
+    used, refs = np.unique(refs, return_inverse=True)
+    ref_table = tuple(_state.ref_table[ref_id] for ref_id in used.tolist())
+    _state.ref_table = list(ref_table)
+    _state.ref_ids = {ref: ref_id for ref_id, ref in enumerate(ref_table)}
+    return refs.astype(np.int64), ref_table
+
+
+def _load_source(source, cutoff):
+    """Load one source from the database into unsorted arrays."""
+    query, params, db_key = _SOURCE_QUERIES[source](cutoff)
+
+    cents, stamps, refs = [], [], []
+    for columns, rows in stream_query(query, params, db_key=db_key):
+        amount_pos = columns.index("Amount")
+        ref_pos = columns.index("AccountOrRef")
+        date_pos = columns.index("EntryDate")
+        for row in rows:
+            amount = row[amount_pos]
+            if amount is None:
+                continue
+            cents.append(to_cents(amount))
+            stamps.append(_to_stamp(row[date_pos]))
+            refs.append(_intern_ref(row[ref_pos]))
+
+    count = len(cents)
+    return (
+        np.asarray(cents, dtype=np.int64),
+        np.asarray(stamps, dtype=np.int64),
+        np.asarray(refs, dtype=np.int64),
+        np.full(count, source, dtype=np.int8),
+    )
+
+
+def refresh_amount_index(full=False):
+    """
+    Refresh the amount index from the database.
+
+    An incremental refresh reloads each source from the start of the day of
+    its watermark (minus AMOUNT_INDEX_RELOAD_DAYS), replacing the entries it
+    already held for that period. A full refresh reloads every source back to
+    its configured history limit. A recent enough snapshot published by another
+    worker is mapped instead. Must be called within an application context.
+
+    Args:
+        full (bool, optional): Force a full rebuild. Defaults to False.
+
+    Returns:
+        AmountIndex: The new snapshot.
+    """
+    config = current_app.config
+    started = time.monotonic()
+    now = datetime.now()
+    previous = _state.snapshot
+
+    shared = _map_shared_index(previous, full, config)
+    if shared is not None:
+        logger.info(
+            "Mapped shared amount index with %d entries in %.2fs",
+            len(shared),
+            time.monotonic() - started,
+        )
+        return shared
+
+    if previous is None:
+        full = True
+
+    if full:
+        _state.ref_ids = {}
+        _state.ref_table = []
+
+    reload_days = config.get("AMOUNT_INDEX_RELOAD_DAYS", 1)
+    coverage = {}
+    cutoffs = {}
+    loaded = []
+
+    for source in _SOURCE_QUERIES:
+        history_cutoff = _history_cutoff(source, config, now)
+        watermark = None if full else previous.watermarks.get(source)
+
+        if watermark is None:
+            cutoff = history_cutoff if full else previous.coverage.get(source)
+        else:
+            cutoff = (watermark - timedelta(days=reload_days)).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+
+        coverage[source] = history_cutoff if full else previous.coverage.get(source)
+        cutoffs[source] = cutoff
+        loaded.append(_load_source(source, cutoff))
+
+    parts = [list(part) for part in zip(*loaded)]
+
+    if not full:
+        # Keep previous entries that precede each reloaded window
+        keep = np.ones(len(previous), dtype=bool)
+        for source, cutoff in cutoffs.items():
+            reloaded = previous.sources == source
+            if cutoff is not None:
+                reloaded &= previous.stamps >= _to_stamp(cutoff)
+            keep &= ~reloaded
+        parts[0].append(previous.cents[keep])
+        parts[1].append(previous.stamps[keep])
+        parts[2].append(previous.refs[keep])
+        parts[3].append(previous.sources[keep])
+
+    cents, stamps, refs, sources = (np.concatenate(part) for part in parts)
+    refs, ref_table = _compact_refs(refs)
+    order = np.argsort(cents, kind="stable")
+
+    snapshot = AmountIndex(
+        cents[order],
+        stamps[order],
+        refs[order],
+        sources[order],
+        ref_table,
+        coverage,
+        previous=None if full else previous,
+    )
+    _state.snapshot = snapshot
+
+    logger.info(
+        "%s amount index with %d entries (%d distinct amounts) in %.2fs",
+        "Rebuilt" if full else "Refreshed",
+        len(snapshot),
+        len(snapshot.distinct),
+        time.monotonic() - started,
+    )
+    _publish_index(snapshot)
+    return snapshot
+
+
+def get_amount_index():
+    """
+    Get the current amount index snapshot, scheduling a refresh when due.
+
+    Refreshes run in a background thread, so this never blocks on the
+    database. Until the first build completes, None is returned and callers
+    should fall back to querying the database directly.
+
+    Returns:
+        AmountIndex: The current snapshot, or None if unavailable.
+    """
+    app = current_app._get_current_object()
+    if not app.config.get("AMOUNT_INDEX_ENABLED", True):
+        return None
+
+    snapshot = _state.snapshot
+    full = snapshot is None or _refresher.is_full_due(
+        app.config.get("AMOUNT_INDEX_REBUILD_SECONDS", 86400)
+    )
+    _refresher.trigger(
+        app,
+        refresh_amount_index,
+        app.config.get("AMOUNT_INDEX_REFRESH_SECONDS", 300),
+        full=full,
+    )
+
+    return snapshot
@@ -10,7 +10,7 @@ from flask import render_template, request, jsonify, Response
 import csv
 from io import StringIO
 
-from app.core.database import execute_query
+from app.core.stale_cache import StaleReportCache
 from app.groups.utilities_billing.cash_only_accounts import bp
 from app.groups.utilities_billing.cash_only_accounts.queries import (
     get_cash_only_accounts,
@@ -21,6 +21,12 @@ from app.groups.utilities_billing.cash_only_accounts.queries import (
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Cash only flags change a few times a day: serve results for 10 minutes,
+# then stale while refreshing, for up to 2 hours
+report_cache = StaleReportCache(
+    "cash_only_accounts", fresh_seconds=600, max_stale_seconds=7200
+)
+
 
 @bp.route("/")
 def index():
@@ -72,35 +78,23 @@ def get_report_data():
         else:
             query, params, db_key = get_cash_only_accounts()
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
-
-        # Format dates for JSON serialization
-        for row in results:
-            if row.get("MessageStartDate"):
-                row["MessageStartDate"] = (
-                    row["MessageStartDate"].isoformat()
-                    if isinstance(row["MessageStartDate"], datetime)
-                    else row["MessageStartDate"]
-                )
-            if row.get("MessageEndDate"):
-                row["MessageEndDate"] = (
-                    row["MessageEndDate"].isoformat()
-                    if isinstance(row["MessageEndDate"], datetime)
-                    else row["MessageEndDate"]
-                )
+        # Get the results, served stale while they refresh when allowed
+        results, freshness = report_cache.query(query, params, db_key)
 
         # Return data as JSON
-        return jsonify(
-            {
-                "success": True,
-                "data": results,
-                "count": len(results),
-                "filters": {
-                    "start_date": start_date_str,
-                    "end_date": end_date_str,
-                },
-            }
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": results,
+                    "count": len(results),
+                    "filters": {
+                        "start_date": start_date_str,
+                        "end_date": end_date_str,
+                    },
+                    "freshness": freshness.to_json(),
+                }
+            )
         )
 
     except Exception as e:
@@ -120,24 +114,11 @@ def get_summary_data():
         # Get query and parameters for summary
         query, params, db_key = get_cash_only_accounts_summary()
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, served stale while they refresh when allowed
+        results, freshness = report_cache.query(query, params, db_key)
 
-        # Format dates for JSON serialization
         if results and len(results) > 0:
             summary = results[0]
-            if summary.get("OldestMessageDate"):
-                summary["OldestMessageDate"] = (
-                    summary["OldestMessageDate"].isoformat()
-                    if isinstance(summary["OldestMessageDate"], datetime)
-                    else summary["OldestMessageDate"]
-                )
-            if summary.get("NewestMessageDate"):
-                summary["NewestMessageDate"] = (
-                    summary["NewestMessageDate"].isoformat()
-                    if isinstance(summary["NewestMessageDate"], datetime)
-                    else summary["NewestMessageDate"]
-                )
         else:
             summary = {
                 "TotalAccounts": 0,
@@ -148,7 +129,11 @@ def get_summary_data():
             }
 
         # Return data as JSON
-        return jsonify({"success": True, "data": summary})
+        return freshness.apply(
+            jsonify(
+                {"success": True, "data": summary, "freshness": freshness.to_json()}
+            )
+        )
 
     except Exception as e:
         logger.error("Error fetching cash only accounts summary: %s", str(e))
@@ -186,8 +171,8 @@ def export_report():
         else:
             query, params, db_key = get_cash_only_accounts()
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, served stale while they refresh when allowed
+        results, _ = report_cache.query(query, params, db_key)
 
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
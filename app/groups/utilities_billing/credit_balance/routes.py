@@ -10,6 +10,7 @@ from datetime import datetime
 from io import StringIO
 from flask import render_template, request, jsonify, Response
 
+from app.core.admission import limit_concurrency
 from app.core.database import execute_query
 from app.groups.utilities_billing.credit_balance import bp
 from app.groups.utilities_billing.credit_balance.queries import (
@@ -41,6 +42,7 @@ def index():
 
 
 @bp.route("/data")
+@limit_concurrency("nws")
 def get_report_data():
     """
     Get report data as JSON for AJAX requests.
@@ -55,15 +57,6 @@ def get_report_data():
         # Execute query
         results = execute_query(query, params, db_key=db_key)
 
-        # Format dates for JSON serialization
-        for row in results:
-            if row.get("MoveOutDate"):
-                row["MoveOutDate"] = (
-                    row["MoveOutDate"].isoformat()
-                    if hasattr(row["MoveOutDate"], "isoformat")
-                    else row["MoveOutDate"]
-                )
-
         # Return data as JSON
         return jsonify(
             {
@@ -79,6 +72,7 @@ def get_report_data():
 
 
 @bp.route("/summary")
+@limit_concurrency("nws")
 def get_summary_data():
     """
     Get summary statistics as JSON for AJAX requests.
@@ -114,6 +108,7 @@ def get_summary_data():
 
 
 @bp.route("/export")
+@limit_concurrency("nws")
 def export_report():
     """
     Export report data to CSV.
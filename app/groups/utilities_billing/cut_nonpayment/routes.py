@@ -10,7 +10,8 @@ from datetime import datetime
 from io import StringIO
 from flask import render_template, request, jsonify, Response
 
-from app.core.database import execute_query
+from app.core.admission import limit_concurrency
+from app.core.coalesce import execute_coalesced
 from app.groups.utilities_billing.cut_nonpayment import bp
 from app.groups.utilities_billing.cut_nonpayment.queries import (
     get_cut_nonpayment_accounts,
@@ -34,7 +35,7 @@ def index():
     try:
         # Get available cycles for the filter dropdown
         query, params, db_key = get_available_cycles()
-        cycles = execute_query(query, params, db_key=db_key)
+        cycles = execute_coalesced(query, params, db_key=db_key)
 
         # Convert to simple list for template
         cycle_list = [cycle["Cycle"] for cycle in cycles]
@@ -51,6 +52,7 @@ def index():
 
 
 @bp.route("/data")
+@limit_concurrency("nws")
 def get_report_data():
     """
     Get report data as JSON for AJAX requests.
@@ -79,7 +81,7 @@ def get_report_data():
         query, params, db_key = get_cut_nonpayment_accounts(cut_date, cycles)
 
         # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        results = execute_coalesced(query, params, db_key=db_key)
 
         # Return data as JSON
         return jsonify(
@@ -100,6 +102,7 @@ def get_report_data():
 
 
 @bp.route("/summary")
+@limit_concurrency("nws")
 def get_summary_data():
     """
     Get summary data as JSON for AJAX requests.
@@ -128,7 +131,7 @@ def get_summary_data():
         query, params, db_key = get_cut_nonpayment_summary(cut_date, cycles)
 
         # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        results = execute_coalesced(query, params, db_key=db_key)
 
         # Return data as JSON
         return jsonify(
@@ -149,6 +152,7 @@ def get_summary_data():
 
 
 @bp.route("/export")
+@limit_concurrency("nws")
 def export_report():
     """
     Export report data to CSV.
@@ -177,7 +181,7 @@ def export_report():
         query, params, db_key = get_cut_nonpayment_accounts(cut_date, cycles)
 
         # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        results = execute_coalesced(query, params, db_key=db_key)
 
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
@@ -10,7 +10,9 @@ from datetime import datetime
 from io import StringIO
 from flask import render_template, request, jsonify, Response
 
-from app.core.database import execute_query
+from app.core.admission import limit_concurrency
+from app.core.coalesce import execute_coalesced
+from app.core.stale_cache import StaleReportCache
 from app.groups.utilities_billing.cycle_info import bp
 from app.groups.utilities_billing.cycle_info.queries import (
     get_cycle_info,
@@ -21,6 +23,12 @@ from app.groups.utilities_billing.cycle_info.queries import (
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Cycle schedules change rarely during the day: serve results for 5
+# minutes, then stale while refreshing, for up to 1 hour
+report_cache = StaleReportCache(
+    "cycle_info", fresh_seconds=300, max_stale_seconds=3600
+)
+
 
 @bp.route("/")
 def index():
@@ -33,7 +41,7 @@ def index():
     try:
         # Get available cycles for the filter dropdown
         query, params, db_key = get_available_cycles()
-        cycles = execute_query(query, params, db_key=db_key)
+        cycles = execute_coalesced(query, params, db_key=db_key)
 
         # Convert to simple list for template
         cycle_list = [cycle["Cycle"] for cycle in cycles]
@@ -50,6 +58,7 @@ def index():
 
 
 @bp.route("/data")
+@limit_concurrency("nws")
 def get_report_data():
     """
     Get report data as JSON for AJAX requests.
@@ -69,19 +78,22 @@ def get_report_data():
         # Get query and parameters
         query, params, db_key = get_cycle_info(cycles)
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, served stale while they refresh when allowed
+        results, freshness = report_cache.query(query, params, db_key)
 
         # Return data as JSON
-        return jsonify(
-            {
-                "success": True,
-                "data": results,
-                "count": len(results),
-                "filters": {
-                    "cycles": cycles_param,
-                },
-            }
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": results,
+                    "count": len(results),
+                    "filters": {
+                        "cycles": cycles_param,
+                    },
+                    "freshness": freshness.to_json(),
+                }
+            )
         )
 
     except Exception as e:
@@ -90,6 +102,7 @@ def get_report_data():
 
 
 @bp.route("/summary")
+@limit_concurrency("nws")
 def get_summary_data():
     """
     Get summary data as JSON for AJAX requests.
@@ -101,16 +114,19 @@ def get_summary_data():
         # Get query and parameters
         query, params, db_key = get_cycle_summary()
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, served stale while they refresh when allowed
+        results, freshness = report_cache.query(query, params, db_key)
 
         # Return data as JSON
-        return jsonify(
-            {
-                "success": True,
-                "data": results,
-                "count": len(results),
-            }
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": results,
+                    "count": len(results),
+                    "freshness": freshness.to_json(),
+                }
+            )
         )
 
     except Exception as e:
@@ -119,6 +135,7 @@ def get_summary_data():
 
 
 @bp.route("/export")
+@limit_concurrency("nws")
 def export_report():
     """
     Export report data to CSV.
@@ -138,8 +155,8 @@ def export_report():
         # Get query and parameters
         query, params, db_key = get_cycle_info(cycles)
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, served stale while they refresh when allowed
+        results, _ = report_cache.query(query, params, db_key)
 
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
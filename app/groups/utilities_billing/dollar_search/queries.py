@@ -7,6 +7,7 @@ Each function returns a SQL query string and optional parameters.
 
 import logging
 from datetime import datetime, timedelta
+from decimal import Decimal
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -38,7 +39,7 @@ def format_date_for_query(date_obj):
     return date_obj.strftime("%Y-%m-%d %H:%M:%S")
 
 
-def get_dollar_search(transaction_amount, start_date=None, end_date=None):
+def get_dollar_search(transaction_amount, start_date=None, end_date=None, tolerance=None):
     """
     Get payment transactions that match a specific dollar amount.
 
@@ -48,6 +49,8 @@ def get_dollar_search(transaction_amount, start_date=None, end_date=None):
             If None, defaults to 30 days ago.
         end_date (datetime, optional): End date for transaction search.
             If None, defaults to current date.
+        tolerance (float, optional): If set, match amounts within plus or
+            minus this many dollars instead of exactly.
 
     Returns:
         tuple: (SQL query string, query parameters, database key)
@@ -60,17 +63,26 @@ def get_dollar_search(transaction_amount, start_date=None, end_date=None):
     start_date_str = format_date_for_query(start_date)
     end_date_str = format_date_for_query(end_date)
 
+    # Amount bounds (equal unless a tolerance was requested)
+    amount = Decimal(str(transaction_amount))
+    tolerance = Decimal(str(tolerance or 0))
+    low_amount = amount - tolerance
+    high_amount = amount + tolerance
+
     # Parameters
     params = [
         start_date_str,
         end_date_str,
-        transaction_amount,
+        low_amount,
+        high_amount,
         start_date_str,
         end_date_str,
-        transaction_amount,
+        low_amount,
+        high_amount,
         start_date_str,
         end_date_str,
-        transaction_amount,
+        low_amount,
+        high_amount,
     ]
 
     # Build the query that combines payments from different sources
@@ -87,7 +99,7 @@ def get_dollar_search(transaction_amount, start_date=None, end_date=None):
             AND ?
     GROUP BY UA.FullAccountNumber,
         S.TransactionDate
-    HAVING SUM(S.TransSummaryAmount) = ?
+    HAVING SUM(S.TransSummaryAmount) BETWEEN ? AND ?
     
     UNION ALL
     
@@ -101,7 +113,7 @@ def get_dollar_search(transaction_amount, start_date=None, end_date=None):
         ON T.TransactionId = D.TransactionId
     WHERE T.TransactionDate BETWEEN ?
             AND ?
-        AND T.Amount = ?
+        AND T.Amount BETWEEN ? AND ?
     
     UNION ALL
     
@@ -123,7 +135,7 @@ def get_dollar_search(transaction_amount, start_date=None, end_date=None):
         ON R.ReceiptID = RT.ReceiptID
     WHERE R.PaymentDate BETWEEN ?
             AND ?
-        AND RP.PaymentAmount = ?
+        AND RP.PaymentAmount BETWEEN ? AND ?
 
     ORDER BY TransactionDate DESC
     """
@@ -135,96 +147,3 @@ def get_dollar_search(transaction_amount, start_date=None, end_date=None):
         end_date_str,
     )
     return query, tuple(params), "nws"
-
-
-def get_transaction_count(transaction_amount, start_date=None, end_date=None):
-    """
-    Get count of payment transactions that match a specific dollar amount.
-
-    Args:
-        transaction_amount (float): The specific amount to search for.
-        start_date (datetime, optional): Start date for transaction search.
-            If None, defaults to 30 days ago.
-        end_date (datetime, optional): End date for transaction search.
-            If None, defaults to current date.
-
-    Returns:
-        tuple: (SQL query string, query parameters, database key)
-    """
-    # Use default dates if not provided
-    if start_date is None or end_date is None:
-        start_date, end_date = get_default_date_range()
-
-    # Format dates for SQL
-    start_date_str = format_date_for_query(start_date)
-    end_date_str = format_date_for_query(end_date)
-
-    # Parameters
-    params = [
-        start_date_str,
-        end_date_str,
-        transaction_amount,
-        start_date_str,
-        end_date_str,
-        transaction_amount,
-        start_date_str,
-        end_date_str,
-        transaction_amount,
-    ]
-
-    # Build the query to count transactions by type
-    query = """
-    SELECT PaymentType, COUNT(*) AS TransactionCount
-    FROM (
-        /* Utility Account Payments */
-        SELECT 'Utility Payment' AS PaymentType
-        FROM UtilityAccount UA
-        LEFT JOIN UtilityTransactionSummary S
-            ON UA.UtilityAccountID = S.UtilityAccountID
-        WHERE S.TransactionDate BETWEEN ?
-                AND ?
-        GROUP BY UA.FullAccountNumber,
-            S.TransactionDate
-        HAVING SUM(S.TransSummaryAmount) = ?
-        
-        UNION ALL
-        
-        /* Online Payments */
-        SELECT 'Online Payment' AS PaymentType
-        FROM [LogosDB].[ePay].[Transaction] T
-        INNER JOIN epay.TransactionDetail D
-            ON T.TransactionId = D.TransactionId
-        WHERE T.TransactionDate BETWEEN ?
-                AND ?
-            AND T.Amount = ?
-        
-        UNION ALL
-        
-        /* Cash or Check Payments */
-        SELECT 'Cash/Check Payment' AS PaymentType
-        FROM dbo.Receipt R
-        INNER JOIN ReceiptBatch RB
-            ON R.ReceiptBatchID = RB.ReceiptBatchID
-        INNER JOIN dbo.CollectionStation CS
-            ON R.CollectionStationID = CS.CollectionStationID
-        INNER JOIN dbo.SecurityUser SU
-            ON R.CashierID = SU.UserID
-        LEFT JOIN dbo.ReceiptPayment RP
-            ON R.ReceiptID = RP.ReceiptID
-        INNER JOIN dbo.ReceiptTransaction RT
-            ON R.ReceiptID = RT.ReceiptID
-        WHERE R.PaymentDate BETWEEN ?
-                AND ?
-            AND RP.PaymentAmount = ?
-    ) AS CombinedResults
-    GROUP BY PaymentType
-    ORDER BY PaymentType
-    """
-
-    logger.info(
-        "Generated transaction count query for amount %.2f between %s and %s",
-        transaction_amount,
-        start_date_str,
-        end_date_str,
-    )
-    return query, tuple(params), "nws"
@@ -6,6 +6,7 @@ This module defines the routes for the Dollar Search report blueprint.
 
 import logging
 import csv
+import math
 from datetime import datetime
 from io import StringIO
 from flask import render_template, request, jsonify, Response
@@ -14,15 +15,68 @@ from app.core.database import execute_query
 from app.groups.utilities_billing.dollar_search import bp
 from app.groups.utilities_billing.dollar_search.queries import (
     get_dollar_search,
-    get_transaction_count,
     get_default_date_range,
     format_date_for_query,
 )
+from app.groups.utilities_billing.amount_index import (
+    PAYMENT_SOURCES,
+    find_payments,
+    get_amount_index,
+    parse_tolerance,
+)
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
 
+def search_payments(amount, start_date=None, end_date=None, tolerance=None):
+    """
+    Search payments using the local amount index when it covers the range.
+
+    Args:
+        amount (float): The dollar amount to search for.
+        start_date (datetime, optional): Start of the transaction date range.
+            If None, defaults to 30 days ago.
+        end_date (datetime, optional): End of the transaction date range.
+            If None, defaults to current date.
+        tolerance (Decimal, optional): Match amounts within plus or minus
+            this many dollars.
+
+    Returns:
+        tuple: (list of result rows, "index" or "database")
+    """
+    if start_date is None or end_date is None:
+        start_date, end_date = get_default_date_range()
+
+    index = get_amount_index()
+    if index is not None and index.covers(PAYMENT_SOURCES, start_date):
+        return find_payments(index, amount, start_date, end_date, tolerance), "index"
+
+    # Fall back to querying the payment tables
+    query, params, db_key = get_dollar_search(amount, start_date, end_date, tolerance)
+    return execute_query(query, params, db_key=db_key), "database"
+
+
+def count_by_payment_type(results):
+    """
+    Count search results by payment type.
+
+    Args:
+        results (list): Search result rows.
+
+    Returns:
+        list: Dictionaries with PaymentType and TransactionCount, ordered by type.
+    """
+    counts = {}
+    for row in results:
+        counts[row["PaymentType"]] = counts.get(row["PaymentType"], 0) + 1
+
+    return [
+        {"PaymentType": payment_type, "TransactionCount": counts[payment_type]}
+        for payment_type in sorted(counts)
+    ]
+
+
 @bp.route("/")
 def index():
     """
@@ -60,6 +114,8 @@ def search():
         try:
             amount_str = request.args.get("amount", "")
             amount = float(amount_str)
+            if not math.isfinite(amount):
+                raise ValueError(amount_str)
         except ValueError:
             return (
                 jsonify(
@@ -71,6 +127,11 @@ def search():
                 400,
             )
 
+        try:
+            tolerance = parse_tolerance(request.args.get("tolerance", ""))
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
         # Get date range parameters
         start_date_str = request.args.get("start_date", "")
         end_date_str = request.args.get("end_date", "")
@@ -87,28 +148,11 @@ def search():
             end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
             end_date = end_date.replace(hour=23, minute=59, second=59)
 
-        # Get query and parameters for transaction data
-        query, params, db_key = get_dollar_search(amount, start_date, end_date)
+        # Search the amount index (or the database when it does not cover the range)
+        results, searched = search_payments(amount, start_date, end_date, tolerance)
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
-
-        # Format dates for JSON serialization
-        for row in results:
-            if row.get("TransactionDate"):
-                row["TransactionDate"] = (
-                    row["TransactionDate"].isoformat()
-                    if hasattr(row["TransactionDate"], "isoformat")
-                    else row["TransactionDate"]
-                )
-
-        # Get query and parameters for transaction counts
-        count_query, count_params, count_db_key = get_transaction_count(
-            amount, start_date, end_date
-        )
-
-        # Execute count query
-        count_results = execute_query(count_query, count_params, db_key=count_db_key)
+        # Count transactions by payment type from the same result set
+        count_results = count_by_payment_type(results)
 
         # Return data as JSON
         return jsonify(
@@ -119,9 +163,11 @@ def search():
                 "total_count": len(results),
                 "filters": {
                     "amount": amount,
+                    "tolerance": tolerance,
                     "start_date": start_date_str,
                     "end_date": end_date_str,
                 },
+                "source": searched,
             }
         )
 
@@ -143,6 +189,8 @@ def export():
         try:
             amount_str = request.args.get("amount", "")
             amount = float(amount_str)
+            if not math.isfinite(amount):
+                raise ValueError(amount_str)
         except ValueError:
             return (
                 jsonify(
@@ -154,6 +202,11 @@ def export():
                 400,
             )
 
+        try:
+            tolerance = parse_tolerance(request.args.get("tolerance", ""))
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
         # Get date range parameters
         start_date_str = request.args.get("start_date", "")
         end_date_str = request.args.get("end_date", "")
@@ -170,11 +223,8 @@ def export():
             end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
             end_date = end_date.replace(hour=23, minute=59, second=59)
 
-        # Get query and parameters
-        query, params, db_key = get_dollar_search(amount, start_date, end_date)
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Search the amount index (or the database when it does not cover the range)
+        results, _ = search_payments(amount, start_date, end_date, tolerance)
 
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
@@ -12,6 +12,7 @@ from typing import List, Dict, Any
 
 from flask import render_template, request, jsonify, Response
 
+from app.core.admission import limit_concurrency
 from app.core.database import execute_query
 from app.groups.utilities_billing.high_balance import bp
 from app.groups.utilities_billing.high_balance.queries import (
@@ -50,6 +51,7 @@ def index():
 
 
 @bp.route("/data")
+@limit_concurrency("nws")
 def get_report_data():
     """
     Get report data as JSON for AJAX requests.
@@ -104,6 +106,7 @@ def get_report_data():
 
 
 @bp.route("/summary")
+@limit_concurrency("nws")
 def get_summary_data():
     """
     Get summary data for high balance accounts.
@@ -155,6 +158,7 @@ def get_summary_data():
 
 
 @bp.route("/export")
+@limit_concurrency("nws")
 def export_report():
     """
     Export report data to CSV.
@@ -10,7 +10,9 @@ from datetime import datetime
 from io import StringIO
 from flask import render_template, request, jsonify, Response
 
-from app.core.database import execute_query
+from app.core.admission import limit_concurrency
+from app.core.stale_cache import StaleReportCache
+from app.core.watermarks import watermarks
 from app.groups.utilities_billing.late_fees import bp
 from app.groups.utilities_billing.late_fees.queries import (
     get_late_fees_accounts,
@@ -21,6 +23,15 @@ from app.groups.utilities_billing.late_fees.queries import (
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Late fee balances only change when utility transactions post, so keep them
+# until the transaction summary changes (or for up to 4 hours)
+report_cache = StaleReportCache(
+    "late_fees", fresh_seconds=1800, max_stale_seconds=14400
+)
+watermarks.depends_on(
+    "nws", "dbo.UtilityTransactionSummary", report_cache.invalidate
+)
+
 
 @bp.route("/")
 def index():
@@ -33,7 +44,7 @@ def index():
     try:
         # Get billing profiles for the dropdown
         query, params, db_key = get_billing_profiles()
-        billing_profiles = execute_query(query, params, db_key=db_key)
+        billing_profiles, _ = report_cache.query(query, params, db_key)
 
         return render_template(
             "groups/utilities_billing/late_fees/index.html",
@@ -47,6 +58,7 @@ def index():
 
 
 @bp.route("/data")
+@limit_concurrency("nws", "heavy")
 def get_report_data():
     """
     Get report data as JSON for AJAX requests.
@@ -67,18 +79,11 @@ def get_report_data():
         # Get query and parameters
         query, params, db_key = get_late_fees_accounts(billing_profile_id)
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, cached until the transactions change
+        results, freshness = report_cache.query(query, params, db_key)
 
-        # Format dates and monetary values for display
+        # Format phone numbers for display
         for row in results:
-            if "CurrentDueDate" in row and row["CurrentDueDate"]:
-                row["CurrentDueDate"] = (
-                    row["CurrentDueDate"].isoformat()
-                    if hasattr(row["CurrentDueDate"], "isoformat")
-                    else row["CurrentDueDate"]
-                )
-
             # Convert phone numbers to string format with proper formatting
             for phone_field in ["CellPhone", "PrimaryPhone", "WorkPhone"]:
                 if phone_field in row and row[phone_field]:
@@ -94,13 +99,16 @@ def get_report_data():
                         pass
 
         # Return data as JSON
-        return jsonify(
-            {
-                "success": True,
-                "data": results,
-                "count": len(results),
-                "billing_profile": billing_profile_id,
-            }
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": results,
+                    "count": len(results),
+                    "billing_profile": billing_profile_id,
+                    "freshness": freshness.to_json(),
+                }
+            )
         )
 
     except Exception as e:
@@ -109,6 +117,7 @@ def get_report_data():
 
 
 @bp.route("/summary")
+@limit_concurrency("nws", "heavy")
 def get_summary_data():
     """
     Get summary statistics for late fees accounts.
@@ -129,16 +138,19 @@ def get_summary_data():
         # Get query and parameters
         query, params, db_key = get_late_fees_summary(billing_profile_id)
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, cached until the transactions change
+        results, freshness = report_cache.query(query, params, db_key)
 
         # Return data as JSON
-        return jsonify(
-            {
-                "success": True,
-                "data": results[0] if results else {},  # Get first row if exists
-                "billing_profile": billing_profile_id,
-            }
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": results[0] if results else {},  # Get first row if exists
+                    "billing_profile": billing_profile_id,
+                    "freshness": freshness.to_json(),
+                }
+            )
         )
 
     except Exception as e:
@@ -147,6 +159,7 @@ def get_summary_data():
 
 
 @bp.route("/export")
+@limit_concurrency("nws", "heavy")
 def export_report():
     """
     Export report data to CSV.
@@ -167,8 +180,8 @@ def export_report():
         # Get query and parameters
         query, params, db_key = get_late_fees_accounts(billing_profile_id)
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, cached until the transactions change
+        results, _ = report_cache.query(query, params, db_key)
 
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
@@ -13,7 +13,9 @@ from io import StringIO
 
 from flask import render_template, request, jsonify, Response, current_app, send_file
 
+from app.core.admission import limit_concurrency
 from app.core.database import execute_query
+from app.core.shared_arrays import SharedRowCache
 from app.groups.utilities_billing.vflex import bp
 from app.groups.utilities_billing.vflex.queries import (
     get_vflex_data,
@@ -26,6 +28,17 @@ from app.groups.utilities_billing.vflex.queries import (
 logger = logging.getLogger(__name__)
 
 
+def _load_vflex_data():
+    """Run the VFLEX export procedure."""
+    query, params, db_key = get_vflex_data()
+    return execute_query(query, params, db_key=db_key)
+
+
+# VFLEX rows shared by every worker while paging; exports always run the
+# procedure so the file sent to Sensus is current
+vflex_snapshot = SharedRowCache("vflex", _load_vflex_data, "VFLEX_SNAPSHOT_SECONDS")
+
+
 @bp.route("/")
 def index():
     """
@@ -63,6 +76,7 @@ def index():
 
 
 @bp.route("/data")
+@limit_concurrency("nws", "heavy")
 def get_report_data():
     """
     Get VFLEX data as JSON for AJAX requests.
@@ -75,30 +89,30 @@ def get_report_data():
         page = int(request.args.get("page", 1))
         page_size = int(request.args.get("limit", 50))
 
-        # Execute the stored procedure query
-        query, params, db_key = get_vflex_data()
-        all_results = execute_query(query, params, db_key=db_key)
-
-        # Calculate total pages and paginate results
-        total_results = len(all_results)
-        total_pages = (total_results + page_size - 1) // page_size
-
         # Calculate start and end indices for pagination
         start_idx = (page - 1) * page_size
-        end_idx = min(start_idx + page_size, total_results)
+        end_idx = start_idx + page_size
 
-        # Get paginated results
-        paginated_results = all_results[start_idx:end_idx]
+        # Get the page from the shared snapshot of the stored procedure
+        paginated_results, total_results, freshness = vflex_snapshot.get(
+            start_idx, end_idx
+        )
 
-        # Return data as JSON
-        return jsonify(
-            {
-                "success": True,
-                "data": paginated_results,
-                "total": total_results,
-                "page": page,
-                "pages": total_pages,
-            }
+        # Calculate total pages
+        total_pages = (total_results + page_size - 1) // page_size
+
+        # Return data as JSON, marked stale if served while the database is down
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": paginated_results,
+                    "total": total_results,
+                    "page": page,
+                    "pages": total_pages,
+                    "freshness": freshness.to_json(),
+                }
+            )
         )
 
     except Exception as e:
@@ -122,15 +136,6 @@ def get_logs():
         query, params, db_key = get_vflex_error_log(limit)
         results = execute_query(query, params, db_key=db_key)
 
-        # Format timestamps for JSON serialization
-        for row in results:
-            if row.get("ErrorTime"):
-                row["ErrorTime"] = (
-                    row["ErrorTime"].isoformat()
-                    if hasattr(row["ErrorTime"], "isoformat")
-                    else row["ErrorTime"]
-                )
-
         # Return data as JSON
         return jsonify({"success": True, "data": results, "count": len(results)})
 
@@ -140,6 +145,7 @@ def get_logs():
 
 
 @bp.route("/export")
+@limit_concurrency("nws", "heavy")
 def export_data():
     """
     Export the VFLEX data to CSV.
@@ -184,6 +190,7 @@ def export_data():
 
 
 @bp.route("/export-fixed")
+@limit_concurrency("nws", "heavy")
 def export_fixed_width():
     """
     Export the VFLEX data to a fixed-width text file format.
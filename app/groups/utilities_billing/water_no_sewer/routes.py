@@ -10,7 +10,7 @@ from datetime import datetime
 from io import StringIO
 from flask import render_template, request, jsonify, Response
 
-from app.core.database import execute_query
+from app.core.stale_cache import StaleReportCache
 from app.groups.utilities_billing.water_no_sewer import bp
 from app.groups.utilities_billing.water_no_sewer.queries import (
     get_water_no_sewer_accounts,
@@ -20,6 +20,12 @@ from app.groups.utilities_billing.water_no_sewer.queries import (
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Sewer service changes slowly: serve results for 15 minutes, then stale
+# while refreshing, for up to 4 hours
+report_cache = StaleReportCache(
+    "water_no_sewer", fresh_seconds=900, max_stale_seconds=14400
+)
+
 
 @bp.route("/")
 def index():
@@ -52,11 +58,20 @@ def get_report_data():
         # Get query and parameters
         query, params, db_key = get_water_no_sewer_accounts()
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, served stale while they refresh when allowed
+        results, freshness = report_cache.query(query, params, db_key)
 
         # Return data as JSON
-        return jsonify({"success": True, "data": results, "count": len(results)})
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": results,
+                    "count": len(results),
+                    "freshness": freshness.to_json(),
+                }
+            )
+        )
 
     except Exception as e:
         logger.error("Error fetching water no sewer data: %s", str(e))
@@ -75,11 +90,20 @@ def get_summary_data():
         # Get query and parameters
         query, params, db_key = get_account_type_summary()
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, served stale while they refresh when allowed
+        results, freshness = report_cache.query(query, params, db_key)
 
         # Return data as JSON
-        return jsonify({"success": True, "data": results, "count": len(results)})
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": results,
+                    "count": len(results),
+                    "freshness": freshness.to_json(),
+                }
+            )
+        )
 
     except Exception as e:
         logger.error("Error fetching account type summary data: %s", str(e))
@@ -98,8 +122,8 @@ def export_report():
         # Get query and parameters
         query, params, db_key = get_water_no_sewer_accounts()
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get the results, served stale while they refresh when allowed
+        results, _ = report_cache.query(query, params, db_key)
 
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
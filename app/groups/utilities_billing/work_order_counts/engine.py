@@ -0,0 +1,91 @@
+"""
+Work Order Counts Engine.
+
+This module keeps per-day work order counts (by requesting user and type) in
+a range cache and totals them by user, day or type in Python, so the report's
+endpoints share the same cached days.
+"""
+
+import logging
+from collections import Counter
+
+from app.core.database import execute_query
+from app.core.range_cache import RangeCache, as_datetime
+from app.groups.utilities_billing.work_order_counts.queries import (
+    get_work_order_daily_breakdown,
+)
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+def _fetch_breakdown(start_date, end_date):
+    """Load the per-day counts for a date range."""
+    query, params, db_key = get_work_order_daily_breakdown(start_date, end_date)
+    return execute_query(query, params, db_key=db_key)
+
+
+# Per-day counts in per-day partitions of CreateDate
+_breakdown = RangeCache("work_order_counts", _fetch_breakdown, "CreateDate")
+
+
+def _total(rows, key):
+    """Sum WorkOrderCount over rows for each value of a column."""
+    totals = Counter()
+    for row in rows:
+        totals[row[key]] += row["WorkOrderCount"] or 0
+    return totals
+
+
+def get_counts_by_user(start_date, end_date):
+    """
+    Get work order counts for each requesting user.
+
+    Args:
+        start_date (datetime): Start of the report period.
+        end_date (datetime): End of the report period.
+
+    Returns:
+        list: UserName and CountUser dictionaries, highest count first.
+    """
+    rows = [row for row in _breakdown.get(start_date, end_date) if row["HasUser"]]
+    totals = _total(rows, "UserName")
+    return [
+        {"UserName": name, "CountUser": count} for name, count in totals.most_common()
+    ]
+
+
+def get_daily_counts(start_date, end_date):
+    """
+    Get work order counts for each day.
+
+    Args:
+        start_date (datetime): Start of the report period.
+        end_date (datetime): End of the report period.
+
+    Returns:
+        list: CreateDate (YYYY-MM-DD) and DailyCount dictionaries, oldest first.
+    """
+    totals = _total(_breakdown.get(start_date, end_date), "CreateDate")
+    days = sorted((as_datetime(day), count) for day, count in totals.items())
+    return [
+        {"CreateDate": day.strftime("%Y-%m-%d"), "DailyCount": count}
+        for day, count in days
+    ]
+
+
+def get_counts_by_type(start_date, end_date):
+    """
+    Get work order counts for each work order type.
+
+    Args:
+        start_date (datetime): Start of the report period.
+        end_date (datetime): End of the report period.
+
+    Returns:
+        list: TypeName and TypeCount dictionaries, highest count first.
+    """
+    totals = _total(_breakdown.get(start_date, end_date), "TypeName")
+    return [
+        {"TypeName": name, "TypeCount": count} for name, count in totals.most_common()
+    ]
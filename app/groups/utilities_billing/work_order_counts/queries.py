@@ -38,54 +38,14 @@ def format_date_for_query(date_obj):
     return date_obj.strftime("%Y-%m-%d %H:%M:%S")
 
 
-def get_work_order_counts_by_user(start_date=None, end_date=None):
+def get_work_order_daily_breakdown(start_date=None, end_date=None):
     """
-    Get work order counts grouped by user.
+    Get work order counts for each day, requesting user and type.
 
-    Args:
-        start_date (datetime, optional): Start date for the report period.
-            If None, defaults to 30 days ago.
-        end_date (datetime, optional): End date for the report period.
-            If None, defaults to current date.
-
-    Returns:
-        tuple: (SQL query string, query parameters, database key)
-    """
-    # Use default dates if not provided
-    if start_date is None or end_date is None:
-        start_date, end_date = get_default_date_range()
-
-    # Convert dates to strings for SQL
-    start_date_str = format_date_for_query(start_date)
-    end_date_str = format_date_for_query(end_date)
-
-    # Parameters
-    params = [start_date_str, end_date_str]
-
-    # Build the query
-    query = """
-    SELECT su.UserName,
-        COUNT(*) AS CountUser
-    FROM [LogosDB].[dbo].[WorkOrders] AS wo
-    INNER JOIN [LogosDB].[dbo].[SecurityUser] AS su
-        ON su.UserID = wo.RequestedByEmployeeID
-    WHERE wo.CreateDate BETWEEN ?
-            AND ?
-    GROUP BY su.UserName
-    ORDER BY CountUser DESC
-    """
-
-    logger.info(
-        "Generated work order counts query for period %s to %s",
-        start_date_str,
-        end_date_str,
-    )
-    return query, tuple(params), "nws"
-
-
-def get_work_orders_daily_counts(start_date=None, end_date=None):
-    """
-    Get daily counts of work orders.
+    The report's user, daily and type totals are all sums of these counts,
+    so they can be computed from cached days instead of separate queries.
+    Work orders whose requester has no security user are included (with
+    HasUser = 0) so the daily and type totals count them.
 
     Args:
         start_date (datetime, optional): Start date for the report period.
@@ -109,64 +69,27 @@ def get_work_orders_daily_counts(start_date=None, end_date=None):
 
     # Build the query
     query = """
-    SELECT 
+    SELECT
         CONVERT(date, wo.CreateDate) AS CreateDate,
-        COUNT(*) AS DailyCount
-    FROM [LogosDB].[dbo].[WorkOrders] AS wo
-    WHERE wo.CreateDate BETWEEN ?
-            AND ?
-    GROUP BY CONVERT(date, wo.CreateDate)
-    ORDER BY CONVERT(date, wo.CreateDate)
-    """
-
-    logger.info(
-        "Generated daily work order counts query for period %s to %s",
-        start_date_str,
-        end_date_str,
-    )
-    return query, tuple(params), "nws"
-
-
-def get_work_orders_by_type(start_date=None, end_date=None):
-    """
-    Get work order counts grouped by type.
-
-    Args:
-        start_date (datetime, optional): Start date for the report period.
-            If None, defaults to 30 days ago.
-        end_date (datetime, optional): End date for the report period.
-            If None, defaults to current date.
-
-    Returns:
-        tuple: (SQL query string, query parameters, database key)
-    """
-    # Use default dates if not provided
-    if start_date is None or end_date is None:
-        start_date, end_date = get_default_date_range()
-
-    # Convert dates to strings for SQL
-    start_date_str = format_date_for_query(start_date)
-    end_date_str = format_date_for_query(end_date)
-
-    # Parameters
-    params = [start_date_str, end_date_str]
-
-    # Build the query
-    query = """
-    SELECT ISNULL(LTRIM(wot.WorkOrderCode), 'Unknown') AS TypeName,
-        COUNT(*) AS TypeCount
+        su.UserName,
+        CASE WHEN su.UserID IS NULL THEN 0 ELSE 1 END AS HasUser,
+        ISNULL(LTRIM(wot.WorkOrderCode), 'Unknown') AS TypeName,
+        COUNT(*) AS WorkOrderCount
     FROM [LogosDB].[dbo].[WorkOrders] AS wo
+    LEFT JOIN [LogosDB].[dbo].[SecurityUser] AS su
+        ON su.UserID = wo.RequestedByEmployeeID
     LEFT JOIN [LogosDB].[dbo].[WorkOrderType] AS wot
         ON wo.WorkOrderTypeID = wot.WorkOrderTypeID
     WHERE wo.CreateDate BETWEEN ?
             AND ?
-    GROUP BY LTRIM(wot.WorkOrderCode)
-    ORDER BY TypeCount DESC;
-
+    GROUP BY CONVERT(date, wo.CreateDate),
+        su.UserID,
+        su.UserName,
+        LTRIM(wot.WorkOrderCode)
     """
 
     logger.info(
-        "Generated work order type counts query for period %s to %s",
+        "Generated daily work order breakdown query for period %s to %s",
         start_date_str,
         end_date_str,
     )
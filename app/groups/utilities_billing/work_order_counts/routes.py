@@ -11,13 +11,11 @@ from io import StringIO
 
 from flask import render_template, request, jsonify, Response
 
-from app.core.database import execute_query
 from app.groups.utilities_billing.work_order_counts import bp
-from app.groups.utilities_billing.work_order_counts.queries import (
-    get_work_order_counts_by_user,
-    get_work_orders_daily_counts,
-    get_work_orders_by_type,
-    format_date_for_query,
+from app.groups.utilities_billing.work_order_counts.engine import (
+    get_counts_by_user,
+    get_counts_by_type,
+    get_daily_counts as get_daily_count_rows,
 )
 
 # Configure logger
@@ -76,11 +74,8 @@ def get_report_data():
                 hour=0, minute=0, second=0
             )
 
-        # Get query and parameters
-        query, params, db_key = get_work_order_counts_by_user(start_date, end_date)
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Total the cached daily counts by user
+        results = get_counts_by_user(start_date, end_date)
 
         # Return data as JSON
         return jsonify(
@@ -127,20 +122,8 @@ def get_daily_counts():
                 hour=0, minute=0, second=0
             )
 
-        # Get query and parameters
-        query, params, db_key = get_work_orders_daily_counts(start_date, end_date)
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
-
-        # Convert dates to strings for JSON serialization
-        for row in results:
-            if row.get("CreateDate"):
-                row["CreateDate"] = (
-                    row["CreateDate"].strftime("%Y-%m-%d")
-                    if hasattr(row["CreateDate"], "strftime")
-                    else row["CreateDate"]
-                )
+        # Total the cached daily counts by day
+        results = get_daily_count_rows(start_date, end_date)
 
         # Return data as JSON
         return jsonify(
@@ -186,11 +169,8 @@ def get_type_counts():
                 hour=0, minute=0, second=0
             )
 
-        # Get query and parameters
-        query, params, db_key = get_work_orders_by_type(start_date, end_date)
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Total the cached daily counts by type
+        results = get_counts_by_type(start_date, end_date)
 
         # Return data as JSON
         return jsonify(
@@ -236,11 +216,8 @@ def export_report():
                 hour=0, minute=0, second=0
             )
 
-        # Get query and parameters
-        query, params, db_key = get_work_order_counts_by_user(start_date, end_date)
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Total the cached daily counts by user
+        results = get_counts_by_user(start_date, end_date)
 
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
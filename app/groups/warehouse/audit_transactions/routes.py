@@ -10,7 +10,11 @@ from datetime import datetime, timedelta
 from io import StringIO
 from flask import render_template, request, jsonify, Response
 
+from app.core.admission import limit_concurrency
 from app.core.database import execute_query
+from app.core.db_routing import allow_replica
+from app.core.range_cache import RangeCache
+from app.core.watermarks import watermarks
 from app.groups.warehouse.audit_transactions import bp
 from app.groups.warehouse.audit_transactions.queries import (
     get_audit_transactions,
@@ -24,6 +28,25 @@ from app.groups.warehouse.audit_transactions.queries import (
 logger = logging.getLogger(__name__)
 
 
+def _fetch_transactions(start_date, end_date, account_number, material_id):
+    """Load audit transactions for a date range and filters."""
+    query, params, db_key = get_audit_transactions(
+        start_date, end_date, account_number, material_id
+    )
+    return execute_query(query, params, db_key=db_key)
+
+
+# Transactions in per-day partitions, by account and material filters
+transactions_cache = RangeCache(
+    "audit_transactions",
+    _fetch_transactions,
+    "TRANSDATETIME",
+    order_by=(("ACCTNUM", False), ("MATERIALUID", False)),
+)
+watermarks.depends_on("cw", "azteca.TRANSHISTORY", transactions_cache.invalidate_open)
+watermarks.depends_on("cw", "azteca.MATAUDIT", transactions_cache.invalidate_open)
+
+
 @bp.route("/")
 def index():
     """
@@ -51,6 +74,8 @@ def index():
 
 
 @bp.route("/data")
+@limit_concurrency("cw", "heavy")
+@allow_replica(3600)
 def get_report_data():
     """
     Get report data as JSON for AJAX requests.
@@ -82,23 +107,11 @@ def get_report_data():
             "material_id": material_id or None,
         }
 
-        # Get query and parameters
-        query, params, db_key = get_audit_transactions(
+        # Get rows from the range cache, querying only uncached days
+        results = transactions_cache.get(
             start_date, end_date, filters["account_number"], filters["material_id"]
         )
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
-
-        # Process datetime fields for JSON serialization
-        for row in results:
-            if row.get("TRANSDATETIME"):
-                row["TRANSDATETIME"] = (
-                    row["TRANSDATETIME"].isoformat()
-                    if hasattr(row["TRANSDATETIME"], "isoformat")
-                    else row["TRANSDATETIME"]
-                )
-
         # Return data as JSON
         return jsonify(
             {
@@ -120,6 +133,8 @@ def get_report_data():
 
 
 @bp.route("/account-summary")
+@limit_concurrency("cw", "heavy")
+@allow_replica(3600)
 def get_accounts_summary():
     """
     Get account summary data as JSON for AJAX requests.
@@ -168,6 +183,8 @@ def get_accounts_summary():
 
 
 @bp.route("/material-summary")
+@limit_concurrency("cw", "heavy")
+@allow_replica(3600)
 def get_materials_summary():
     """
     Get material summary data as JSON for AJAX requests.
@@ -216,6 +233,8 @@ def get_materials_summary():
 
 
 @bp.route("/export")
+@limit_concurrency("cw", "heavy")
+@allow_replica(3600)
 def export_report():
     """
     Export report data to CSV.
@@ -241,14 +260,11 @@ def export_report():
             # Use default dates
             start_date, end_date = get_default_date_range()
 
-        # Get query and parameters with filters
-        query, params, db_key = get_audit_transactions(
+        # Get rows from the range cache, querying only uncached days
+        results = transactions_cache.get(
             start_date, end_date, account_number or None, material_id or None
         )
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
-
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
 
@@ -11,7 +11,8 @@ from flask import render_template, request, jsonify, Response
 import csv
 from io import StringIO
 
-from app.core.database import execute_query
+from app.core.stale_cache import Freshness, StaleReportCache
+from app.core.watermarks import watermarks
 from app.groups.warehouse.fifo_stock import bp
 from app.groups.warehouse.fifo_stock.queries import (
     get_inventory_by_category,
@@ -23,6 +24,13 @@ from app.groups.warehouse.fifo_stock.queries import (
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# FIFO stock costs only change when stock is received or issued, so keep them
+# until the LIFOFIFO table changes (or for up to 4 hours)
+report_cache = StaleReportCache(
+    "fifo_stock", fresh_seconds=1800, max_stale_seconds=14400
+)
+watermarks.depends_on("cw", "azteca.LIFOFIFO", report_cache.invalidate)
+
 
 @bp.route("/")
 def index():
@@ -52,14 +60,22 @@ def get_categories():
     """
     try:
         query, params, db_key = get_inventory_categories()
-        results = execute_query(query, params, db_key=db_key)
+        results, freshness = report_cache.query(query, params, db_key)
         categories = [
             row["CATEGORY"]
             for row in results
             if row["CATEGORY"] and row["CATEGORY"].strip()
         ]
         logger.info("Found %d valid category options", len(categories))
-        return jsonify({"success": True, "data": categories})
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": categories,
+                    "freshness": freshness.to_json(),
+                }
+            )
+        )
     except Exception as e:
         logger.error("Error fetching inventory categories: %s", str(e))
         return jsonify({"success": False, "error": str(e)}), 500
@@ -101,10 +117,13 @@ def get_report_data():
             )
 
         all_results = []
+        loads = []
         for category in unique_categories:
             query, params, db_key = get_inventory_by_category(category)
-            results = execute_query(query, params, db_key=db_key)
+            results, category_freshness = report_cache.query(query, params, db_key)
             all_results.extend(results)
+            loads.append(category_freshness)
+        freshness = Freshness.oldest(loads)
 
         logger.info(
             "Processed inventory data for %d categories, found %d items",
@@ -112,13 +131,16 @@ def get_report_data():
             len(all_results),
         )
 
-        return jsonify(
-            {
-                "success": True,
-                "data": all_results,
-                "count": len(all_results),
-                "categories": unique_categories,
-            }
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": all_results,
+                    "count": len(all_results),
+                    "categories": unique_categories,
+                    "freshness": freshness.to_json(),
+                }
+            )
         )
     except Exception as e:
         logger.error("Error fetching inventory data: %s", str(e))
@@ -169,10 +191,12 @@ def get_cost_trends_data():
 
         all_results = []
         material_data = {}
+        loads = []
 
         for category_name in unique_categories:
             query, params, db_key = get_inventory_cost_trends(category_name)
-            results = execute_query(query, params, db_key=db_key)
+            results, category_freshness = report_cache.query(query, params, db_key)
+            loads.append(category_freshness)
 
             for row in results:
                 # Treat null PercentChange as 0 for filtering
@@ -201,16 +225,20 @@ def get_cost_trends_data():
             len(material_data),
         )
 
-        return jsonify(
-            {
-                "success": True,
-                "data": all_results,
-                "materialData": material_data,
-                "count": len(all_results),
-                "category": ", ".join(unique_categories),
-                "categories": unique_categories,
-                "significantThreshold": significant_threshold,
-            }
+        freshness = Freshness.oldest(loads)
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": all_results,
+                    "materialData": material_data,
+                    "count": len(all_results),
+                    "category": ", ".join(unique_categories),
+                    "categories": unique_categories,
+                    "significantThreshold": significant_threshold,
+                    "freshness": freshness.to_json(),
+                }
+            )
         )
     except Exception as e:
         logger.error("Error fetching cost trend data: %s", str(e))
@@ -255,10 +283,12 @@ def get_summary_data():
         all_results = []
         total_category_value = 0
         total_category_quantity = 0
+        loads = []
 
         for category_name in unique_categories:
             query, params, db_key = get_inventory_summary_by_category(category_name)
-            results = execute_query(query, params, db_key=db_key)
+            results, category_freshness = report_cache.query(query, params, db_key)
+            loads.append(category_freshness)
 
             for row in results:
                 row["CategoryName"] = category_name
@@ -274,16 +304,20 @@ def get_summary_data():
             len(all_results),
         )
 
-        return jsonify(
-            {
-                "success": True,
-                "data": all_results,
-                "count": len(all_results),
-                "category": ", ".join(unique_categories),
-                "categories": unique_categories,
-                "totalValue": total_category_value,
-                "totalQuantity": total_category_quantity,
-            }
+        freshness = Freshness.oldest(loads)
+        return freshness.apply(
+            jsonify(
+                {
+                    "success": True,
+                    "data": all_results,
+                    "count": len(all_results),
+                    "category": ", ".join(unique_categories),
+                    "categories": unique_categories,
+                    "totalValue": total_category_value,
+                    "totalQuantity": total_category_quantity,
+                    "freshness": freshness.to_json(),
+                }
+            )
         )
     except Exception as e:
         logger.error("Error fetching inventory summary data: %s", str(e))
@@ -329,6 +363,7 @@ def export_report():
             "type", "detail"
         )  # 'detail', 'summary' or 'trends'
         all_results = []
+        loads = []
 
         for category_name in unique_categories:
             if export_type == "summary":
@@ -338,7 +373,8 @@ def export_report():
             else:
                 query, params, db_key = get_inventory_by_category(category_name)
 
-            results = execute_query(query, params, db_key=db_key)
+            results, category_freshness = report_cache.query(query, params, db_key)
+            loads.append(category_freshness)
 
             for row in results:
                 row["CategoryName"] = category_name
@@ -377,10 +413,12 @@ def export_report():
 
         filename = f"inventory_{category_str}_{export_type}_{datetime.now().strftime('%Y%m%d')}.csv"
 
-        return Response(
-            output,
-            mimetype="text/csv",
-            headers={"Content-disposition": f"attachment; filename={filename}"},
+        return Freshness.oldest(loads).apply(
+            Response(
+                output,
+                mimetype="text/csv",
+                headers={"Content-disposition": f"attachment; filename={filename}"},
+            )
         )
     except Exception as e:
         logger.error("Error exporting report: %s", str(e))
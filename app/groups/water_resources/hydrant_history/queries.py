@@ -74,8 +74,7 @@ def get_hydrant_inspections(start_date=None, end_date=None, hydrant_id=None):
         [INSPDATE],
         [STATUS]
     FROM [CW].[azteca].[INSPECTION]
-    WHERE [INSPTEMPLATENAME] = 'Fire Hydrant Inspection'
-        OR [INSPTEMPLATENAME] = 'Hydrant Flow Test'
+    WHERE [INSPTEMPLATENAME] IN ('Fire Hydrant Inspection', 'Hydrant Flow Test')
         AND [INSPDATE] BETWEEN ? AND ?
     """
 
@@ -12,6 +12,9 @@ from io import StringIO
 from flask import render_template, request, jsonify, Response
 
 from app.core.database import execute_query
+from app.core.db_routing import allow_replica
+from app.core.range_cache import RangeCache
+from app.core.watermarks import watermarks
 from app.groups.water_resources.hydrant_history import bp
 from app.groups.water_resources.hydrant_history.queries import (
     get_hydrant_inspections,
@@ -23,6 +26,43 @@ from app.groups.water_resources.hydrant_history.queries import (
 logger = logging.getLogger(__name__)
 
 
+def _fetch_inspections(start_date, end_date, hydrant_id):
+    """Load hydrant inspections for a date range."""
+    query, params, db_key = get_hydrant_inspections(start_date, end_date, hydrant_id)
+    return execute_query(query, params, db_key=db_key)
+
+
+def _fetch_work_orders(start_date, end_date, hydrant_id):
+    """Load hydrant work orders for a date range."""
+    query, params, db_key = get_hydrant_work_orders(start_date, end_date, hydrant_id)
+    return execute_query(query, params, db_key=db_key)
+
+
+def _hydrant_number(row):
+    """Sort key for a hydrant ID, matching the query's CAST to INT."""
+    try:
+        return int(row["ENTITYUID"])
+    except (TypeError, ValueError):
+        return None
+
+
+# Inspections and work orders in per-day partitions, by hydrant filter
+inspections_cache = RangeCache(
+    "hydrant_inspections",
+    _fetch_inspections,
+    "INSPDATE",
+    order_by=(("INSPDATE", True),),
+)
+work_orders_cache = RangeCache(
+    "hydrant_work_orders",
+    _fetch_work_orders,
+    "ACTUALFINISHDATE",
+    order_by=((_hydrant_number, False), ("ACTUALFINISHDATE", True)),
+)
+watermarks.depends_on("cw", "azteca.INSPECTION", inspections_cache.invalidate_open)
+watermarks.depends_on("cw", "azteca.WORKORDER", work_orders_cache.invalidate_open)
+
+
 @bp.route("/")
 def index():
     """
@@ -49,6 +89,7 @@ def index():
 
 
 @bp.route("/inspections")
+@allow_replica(3600)
 def get_inspections_data():
     """
     Get hydrant inspection data as JSON for AJAX requests.
@@ -76,22 +117,8 @@ def get_inspections_data():
                 hour=0, minute=0, second=0
             )
 
-        # Get query and parameters
-        query, params, db_key = get_hydrant_inspections(
-            start_date, end_date, hydrant_id if hydrant_id else None
-        )
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
-
-        # Process date fields for JSON serialization
-        for row in results:
-            if row.get("INSPDATE"):
-                row["INSPDATE"] = (
-                    row["INSPDATE"].isoformat()
-                    if hasattr(row["INSPDATE"], "isoformat")
-                    else row["INSPDATE"]
-                )
+        # Get rows from the range cache, querying only uncached days
+        results = inspections_cache.get(start_date, end_date, hydrant_id or None)
 
         # Return data as JSON
         return jsonify(
@@ -113,6 +140,7 @@ def get_inspections_data():
 
 
 @bp.route("/work-orders")
+@allow_replica(3600)
 def get_work_orders_data():
     """
     Get hydrant work order data as JSON for AJAX requests.
@@ -140,22 +168,8 @@ def get_work_orders_data():
                 hour=0, minute=0, second=0
             )
 
-        # Get query and parameters
-        query, params, db_key = get_hydrant_work_orders(
-            start_date, end_date, hydrant_id if hydrant_id else None
-        )
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
-
-        # Process date fields for JSON serialization
-        for row in results:
-            if row.get("ACTUALFINISHDATE"):
-                row["ACTUALFINISHDATE"] = (
-                    row["ACTUALFINISHDATE"].isoformat()
-                    if hasattr(row["ACTUALFINISHDATE"], "isoformat")
-                    else row["ACTUALFINISHDATE"]
-                )
+        # Get rows from the range cache, querying only uncached days
+        results = work_orders_cache.get(start_date, end_date, hydrant_id or None)
 
         # Return data as JSON
         return jsonify(
@@ -177,6 +191,7 @@ def get_work_orders_data():
 
 
 @bp.route("/export-inspections")
+@allow_replica(3600)
 def export_inspections():
     """
     Export hydrant inspection data to CSV.
@@ -204,13 +219,8 @@ def export_inspections():
                 hour=0, minute=0, second=0
             )
 
-        # Get query and parameters
-        query, params, db_key = get_hydrant_inspections(
-            start_date, end_date, hydrant_id if hydrant_id else None
-        )
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get rows from the range cache, querying only uncached days
+        results = inspections_cache.get(start_date, end_date, hydrant_id or None)
 
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
@@ -263,6 +273,7 @@ def export_inspections():
 
 
 @bp.route("/export-work-orders")
+@allow_replica(3600)
 def export_work_orders():
     """
     Export hydrant work order data to CSV.
@@ -290,13 +301,8 @@ def export_work_orders():
                 hour=0, minute=0, second=0
             )
 
-        # Get query and parameters
-        query, params, db_key = get_hydrant_work_orders(
-            start_date, end_date, hydrant_id if hydrant_id else None
-        )
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Get rows from the range cache, querying only uncached days
+        results = work_orders_cache.get(start_date, end_date, hydrant_id or None)
 
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
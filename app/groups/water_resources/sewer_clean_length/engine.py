@@ -0,0 +1,225 @@
+"""
+Sewer Clean Length Engine.
+
+This module joins sewer cleaning work orders from CityWorks to the cached
+gravity main dimension and computes the report's daily and work type totals,
+and network coverage over rolling windows, in Python.
+"""
+
+import logging
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from flask import current_app
+
+from app.core.database import stream_query
+from app.core.dimensions import DimensionTable
+from app.core.range_cache import RangeCache
+from app.core.watermarks import watermarks
+from app.groups.water_resources.sewer_clean_length.queries import (
+    get_gravity_mains,
+    get_gravity_mains_signature,
+    get_sewer_clean_data,
+)
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Feet per unit of the gravity main layer's coordinate system
+FEET_PER_LENGTH_UNIT = {"m": 3.28084, "ft": 1.0, "ftUS": 1.000002}
+
+# Gravity main object ID and length by EUID, from the ssgravitymain GIS layer
+gravity_mains = DimensionTable(
+    "ssgravitymain",
+    get_gravity_mains,
+    key="euid",
+    numeric_columns=("length",),
+    get_signature_query=get_gravity_mains_signature,
+)
+
+# Columns returned by get_sewer_clean_data, in order
+DETAIL_COLUMNS = ["workorderid", "description", "actualfinishdate", "entityuid"]
+
+# Rolling coverage windows, in years
+COVERAGE_WINDOWS = (1, 3, 5)
+
+
+def get_length_unit():
+    """
+    Get the unit of gravity main lengths and the factor converting it to feet.
+
+    Shape.STLength() measures in the units of the layer's coordinate system,
+    which SQL Server does not report for geometry, so it is configured as
+    SEWER_MAIN_LENGTH_UNIT.
+
+    Returns:
+        tuple: (unit name, feet per unit)
+
+    Raises:
+        ValueError: If the configured unit is not known.
+    """
+    unit = current_app.config.get("SEWER_MAIN_LENGTH_UNIT", "m")
+    if unit not in FEET_PER_LENGTH_UNIT:
+        raise ValueError(
+            f"Unknown SEWER_MAIN_LENGTH_UNIT {unit!r}; "
+            f"expected one of {', '.join(FEET_PER_LENGTH_UNIT)}"
+        )
+    return unit, FEET_PER_LENGTH_UNIT[unit]
+
+
+def _fetch_cleanings(start_date, end_date):
+    """Load the cleaning work order rows for a date range as tuples."""
+    query, params, db_key = get_sewer_clean_data(start_date, end_date)
+
+    records = []
+    for _, rows in stream_query(query, params, db_key=db_key):
+        records.extend(tuple(row) for row in rows)
+
+    logger.info(
+        "Loaded %d sewer cleaning rows for %s to %s", len(records), start_date, end_date
+    )
+    return records
+
+
+# Cleaning work orders in per-day partitions of actualfinishdate
+_cleanings = RangeCache(
+    "sewer_clean_length",
+    _fetch_cleanings,
+    DETAIL_COLUMNS.index("actualfinishdate"),
+    order_by=((DETAIL_COLUMNS.index("actualfinishdate"), True),),
+)
+watermarks.depends_on("cw", "azteca.WORKORDER", _cleanings.invalidate_open)
+
+
+def _get_cleanings(start_date, end_date):
+    """Get the cleaning rows for a date range as a DataFrame, newest first."""
+    frame = pd.DataFrame.from_records(
+        _cleanings.get(start_date, end_date), columns=DETAIL_COLUMNS
+    )
+    frame["actualfinishdate"] = pd.to_datetime(frame["actualfinishdate"])
+    return frame
+
+
+def get_cleaning_frame(start_date, end_date):
+    """
+    Get cleaned gravity mains for a date range.
+
+    Work orders come from the range cache and are joined to the cached main
+    lengths. Work order entities that are not gravity mains are dropped, as
+    the inner join in the original query did.
+
+    Args:
+        start_date (datetime): Start of the report period.
+        end_date (datetime): End of the report period.
+
+    Returns:
+        pandas.DataFrame: One row per work order and main, newest first, with
+        objectid and length columns.
+    """
+    frame = _get_cleanings(start_date, end_date)
+    return gravity_mains.get().join(frame, "entityuid", how="inner")
+
+
+def _summarize(frame, key):
+    """Count distinct work orders and total main length for each group."""
+    grouped = frame.groupby(key, sort=False)
+    return pd.DataFrame(
+        {
+            "work_order_count": grouped["workorderid"].nunique(),
+            "total_length": grouped["length"].sum(min_count=1),
+        }
+    ).reset_index()
+
+
+def summarize_daily(frame):
+    """
+    Total cleaning for each day.
+
+    Args:
+        frame (pandas.DataFrame): Rows from get_cleaning_frame.
+
+    Returns:
+        pandas.DataFrame: clean_date, work_order_count and total_length,
+        newest day first.
+    """
+    frame = frame.assign(clean_date=frame["actualfinishdate"].dt.date)
+    summary = _summarize(frame, "clean_date")
+    return summary.sort_values("clean_date", ascending=False)
+
+
+def summarize_by_description(frame):
+    """
+    Total cleaning for each work type.
+
+    Args:
+        frame (pandas.DataFrame): Rows from get_cleaning_frame.
+
+    Returns:
+        pandas.DataFrame: work_type, work_order_count and total_length,
+        longest first.
+    """
+    frame = frame.rename(columns={"description": "work_type"})
+    summary = _summarize(frame, "work_type")
+    return summary.sort_values("total_length", ascending=False, na_position="last")
+
+
+def get_coverage(as_of=None, windows=COVERAGE_WINDOWS):
+    """
+    Measure how much of the gravity main network was cleaned recently.
+
+    Cleanings over the longest window are fetched once and reduced to the
+    last cleaning date of each main. Each window is then a boolean mask over
+    the mains (cleaned on or after the window start), so repeat cleanings of
+    the same main are only counted once.
+
+    Args:
+        as_of (datetime, optional): End of the windows. Defaults to now.
+        windows (tuple, optional): Window lengths in years. Defaults to (1, 3, 5).
+
+    Returns:
+        dict: total_mains, total_length and one entry per window with its
+        start date, mains_cleaned, length_cleaned and percent_length.
+    """
+    as_of = (as_of or datetime.now()).replace(
+        hour=23, minute=59, second=59, microsecond=0
+    )
+    day = pd.Timestamp(as_of).normalize()
+    starts = {years: day - pd.DateOffset(years=years) for years in windows}
+
+    mains = gravity_mains.get()
+    lengths = np.nan_to_num(np.asarray(mains.columns.get("length", []), dtype=float))
+
+    cleanings = _get_cleanings(min(starts.values()).to_pydatetime(), as_of)
+    positions, found = mains.positions(cleanings["entityuid"].tolist())
+    days = cleanings["actualfinishdate"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+    # Last cleaning day of each main (minimum int64 for never)
+    last_cleaned = np.full(len(mains), np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(last_cleaned, positions[found], days[found])
+
+    total_length = float(lengths.sum())
+    results = []
+    for years in windows:
+        start_day = np.datetime64(starts[years].date(), "D").astype(np.int64)
+        cleaned = last_cleaned >= start_day
+        length_cleaned = float(lengths[cleaned].sum())
+        results.append(
+            {
+                "years": years,
+                "start_date": starts[years].date().isoformat(),
+                "mains_cleaned": int(cleaned.sum()),
+                "length_cleaned": length_cleaned,
+                "percent_length": (
+                    round(length_cleaned / total_length * 100, 2)
+                    if total_length
+                    else 0.0
+                ),
+            }
+        )
+
+    return {
+        "as_of": day.date().isoformat(),
+        "total_mains": len(mains),
+        "total_length": total_length,
+        "windows": results,
+    }
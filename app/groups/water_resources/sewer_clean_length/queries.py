@@ -40,7 +40,10 @@ def format_date_for_query(date_obj):
 
 def get_sewer_clean_data(start_date=None, end_date=None):
     """
-    Get sewer clean data for the specified date range.
+    Get sewer gravity line cleaning work orders for the specified date range.
+
+    Main lengths come from the gravity main dimension, joined in Python, so
+    this is a CityWorks-only query.
 
     Args:
         start_date (datetime, optional): Start date for the report period.
@@ -62,20 +65,15 @@ def get_sewer_clean_data(start_date=None, end_date=None):
     # Parameters
     params = [start_date_str, end_date_str]
 
-    # Build the query based on the provided template
     query = """
     SELECT
         wo.workorderid,
         wo.description,
         wo.actualfinishdate,
-        we.entityuid,
-        gm.objectid,
-        gm.Shape.STLength() AS length
+        we.entityuid
     FROM cw.azteca.workorder AS wo
     INNER JOIN cw.azteca.workorderentity AS we
         ON wo.workorderid = we.workorderid
-    INNER JOIN toc_sde.gismgr.ssgravitymain AS gm
-        ON we.entityuid = gm.euid
     WHERE
         wo.actualfinishdate >= ?
         AND wo.actualfinishdate <= ?
@@ -95,111 +93,43 @@ def get_sewer_clean_data(start_date=None, end_date=None):
     return query, tuple(params), "cw"  # "cw" is the database key for CityWorks
 
 
-def get_daily_totals(start_date=None, end_date=None):
+def get_gravity_mains():
     """
-    Get daily aggregated cleaning totals.
-
-    Args:
-        start_date (datetime, optional): Start date for the report period.
-            If None, defaults to 30 days ago.
-        end_date (datetime, optional): End date for the report period.
-            If None, defaults to current date.
+    Get each sewer gravity main's length for the gravity main dimension.
 
     Returns:
         tuple: (SQL query string, query parameters, database key)
     """
-    # Use default dates if not provided
-    if start_date is None or end_date is None:
-        start_date, end_date = get_default_date_range()
-
-    # Convert dates to strings for SQL
-    start_date_str = format_date_for_query(start_date)
-    end_date_str = format_date_for_query(end_date)
-
-    # Parameters
-    params = [start_date_str, end_date_str]
-
-    # Build the query for daily aggregation
     query = """
     SELECT
-        CONVERT(date, wo.actualfinishdate) AS clean_date,
-        COUNT(DISTINCT wo.workorderid) AS work_order_count,
-        SUM(gm.Shape.STLength()) AS total_length
-    FROM cw.azteca.workorder AS wo
-    INNER JOIN cw.azteca.workorderentity AS we
-        ON wo.workorderid = we.workorderid
-    INNER JOIN toc_sde.gismgr.ssgravitymain AS gm
-        ON we.entityuid = gm.euid
-    WHERE
-        wo.actualfinishdate >= ?
-        AND wo.actualfinishdate <= ?
-        AND wo.description IN (
-            'Clean - Sewer Gravity Line',
-            'Clean Trouble Spots - Sewer Gravity Line'
-        )
-    GROUP BY CONVERT(date, wo.actualfinishdate)
-    ORDER BY clean_date DESC;
+        gm.euid,
+        gm.objectid,
+        gm.Shape.STLength() AS length
+    FROM gismgr.ssgravitymain AS gm
+    WHERE gm.euid IS NOT NULL;
     """
 
-    logger.info(
-        "Generated sewer clean daily totals query for period %s to %s",
-        start_date_str,
-        end_date_str,
-    )
-
-    return query, tuple(params), "cw"
+    logger.info("Retrieving sewer gravity main dimension")
+    return query, (), "gis"
 
 
-def get_description_totals(start_date=None, end_date=None):
+def get_gravity_mains_signature():
     """
-    Get work type aggregated cleaning totals.
+    Get a change-detection signature for the sewer gravity main layer.
 
-    Args:
-        start_date (datetime, optional): Start date for the report period.
-            If None, defaults to 30 days ago.
-        end_date (datetime, optional): End date for the report period.
-            If None, defaults to current date.
+    Geometry edits that keep the same IDs are picked up by the scheduled
+    full reload instead, since checksumming shapes would cost as much as
+    reloading them.
 
     Returns:
         tuple: (SQL query string, query parameters, database key)
     """
-    # Use default dates if not provided
-    if start_date is None or end_date is None:
-        start_date, end_date = get_default_date_range()
-
-    # Convert dates to strings for SQL
-    start_date_str = format_date_for_query(start_date)
-    end_date_str = format_date_for_query(end_date)
-
-    # Parameters
-    params = [start_date_str, end_date_str]
-
-    # Build the query for description aggregation
     query = """
     SELECT
-        wo.description AS work_type,
-        COUNT(DISTINCT wo.workorderid) AS work_order_count,
-        SUM(gm.Shape.STLength()) AS total_length
-    FROM cw.azteca.workorder AS wo
-    INNER JOIN cw.azteca.workorderentity AS we
-        ON wo.workorderid = we.workorderid
-    INNER JOIN toc_sde.gismgr.ssgravitymain AS gm
-        ON we.entityuid = gm.euid
-    WHERE
-        wo.actualfinishdate >= ?
-        AND wo.actualfinishdate <= ?
-        AND wo.description IN (
-            'Clean - Sewer Gravity Line',
-            'Clean Trouble Spots - Sewer Gravity Line'
-        )
-    GROUP BY wo.description
-    ORDER BY total_length DESC;
+        COUNT_BIG(*) AS row_count,
+        MAX(gm.objectid) AS max_objectid,
+        CHECKSUM_AGG(BINARY_CHECKSUM(gm.euid, gm.objectid)) AS row_checksum
+    FROM gismgr.ssgravitymain AS gm;
     """
 
-    logger.info(
-        "Generated sewer clean work type totals query for period %s to %s",
-        start_date_str,
-        end_date_str,
-    )
-
-    return query, tuple(params), "cw"
+    return query, (), "gis"
@@ -10,13 +10,15 @@ from datetime import datetime, timedelta
 from io import StringIO
 from flask import render_template, request, jsonify, Response
 
-from app.core.database import execute_query
+from app.core.db_routing import allow_replica
+from app.core.utils import frame_to_records
 from app.groups.water_resources.sewer_clean_length import bp
-from app.groups.water_resources.sewer_clean_length.queries import (
-    get_sewer_clean_data,
-    get_daily_totals,
-    get_description_totals,
-    format_date_for_query,
+from app.groups.water_resources.sewer_clean_length.engine import (
+    get_cleaning_frame,
+    get_coverage,
+    get_length_unit,
+    summarize_by_description,
+    summarize_daily,
 )
 
 # Configure logger
@@ -48,7 +50,35 @@ def index():
         return render_template("error.html", error=str(e))
 
 
+def parse_date_range():
+    """
+    Parse the report date range from the request.
+
+    Returns:
+        tuple: (start_date, end_date) covering whole days. Defaults to the
+        last 30 days.
+
+    Raises:
+        ValueError: If a date is not in YYYY-MM-DD format.
+    """
+    start_date_str = request.args.get("start_date", "")
+    end_date_str = request.args.get("end_date", "")
+
+    if start_date_str and end_date_str:
+        start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
+        end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
+    else:
+        # Use default dates (last 30 days)
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=30)
+
+    start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=0)
+    return start_date, end_date
+
+
 @bp.route("/data")
+@allow_replica(3600)
 def get_data():
     """
     Get sewer clean data as JSON for AJAX requests.
@@ -57,79 +87,35 @@ def get_data():
         Response: JSON response with sewer clean data.
     """
     try:
-        # Get date filters from request
-        start_date_str = request.args.get("start_date", "")
-        end_date_str = request.args.get("end_date", "")
-
-        # Parse dates if provided
-        if start_date_str and end_date_str:
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-            start_date = start_date.replace(hour=0, minute=0, second=0)
-
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-            end_date = end_date.replace(hour=23, minute=59, second=59)
-        else:
-            # Use default dates (last 30 days)
-            end_date = datetime.now().replace(hour=23, minute=59, second=59)
-            start_date = (end_date - timedelta(days=30)).replace(
-                hour=0, minute=0, second=0
-            )
-
-        # Get query and parameters
-        query, params, db_key = get_sewer_clean_data(start_date, end_date)
+        try:
+            start_date, end_date = parse_date_range()
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid date format: {e}"}), 400
 
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        # Cleaned mains joined to their cached lengths
+        frame = get_cleaning_frame(start_date, end_date)
+        results = frame_to_records(frame)
 
-        # Process date fields for JSON serialization
+        # Convert lengths from the GIS layer's unit to feet
+        _, to_feet = get_length_unit()
         for row in results:
-            if row.get("actualfinishdate"):
-                row["actualfinishdate"] = (
-                    row["actualfinishdate"].isoformat()
-                    if hasattr(row["actualfinishdate"], "isoformat")
-                    else row["actualfinishdate"]
-                )
-
-            # Convert length from meters to feet (if needed)
             if row.get("length"):
-                # Assuming the length is in meters and we want to show feet
-                # If it's already in feet, remove this conversion
-                row["length_ft"] = float(row["length"]) * 3.28084  # meters to feet
-
-        # Also get summary data (daily totals and description totals)
-        daily_query, daily_params, daily_db_key = get_daily_totals(start_date, end_date)
-        daily_results = execute_query(daily_query, daily_params, db_key=daily_db_key)
+                row["length_ft"] = float(row["length"]) * to_feet
 
+        # Summaries are computed from the same rows
+        daily_results = frame_to_records(summarize_daily(frame))
         for row in daily_results:
-            if row.get("clean_date"):
-                row["clean_date"] = (
-                    row["clean_date"].isoformat()
-                    if hasattr(row["clean_date"], "isoformat")
-                    else row["clean_date"]
-                )
-
-            # Convert total_length from meters to feet
             if row.get("total_length"):
-                row["total_length_ft"] = (
-                    float(row["total_length"]) * 3.28084
-                )  # meters to feet
-
-        # Get description totals
-        desc_query, desc_params, desc_db_key = get_description_totals(
-            start_date, end_date
-        )
-        desc_results = execute_query(desc_query, desc_params, db_key=desc_db_key)
+                row["total_length_ft"] = float(row["total_length"]) * to_feet
 
+        desc_results = frame_to_records(summarize_by_description(frame))
         for row in desc_results:
-            # Convert total_length from meters to feet
             if row.get("total_length"):
-                row["total_length_ft"] = (
-                    float(row["total_length"]) * 3.28084
-                )  # meters to feet
+                row["total_length_ft"] = float(row["total_length"]) * to_feet
 
         # Calculate overall totals
-        total_length = sum(float(row.get("length", 0)) for row in results)
-        total_length_ft = total_length * 3.28084  # meters to feet
+        total_length = sum(float(row.get("length") or 0) for row in results)
+        total_length_ft = total_length * to_feet
         total_work_orders = len(set(row.get("workorderid") for row in results))
 
         # Return data as JSON
@@ -157,7 +143,33 @@ def get_data():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@bp.route("/coverage")
+@allow_replica(3600)
+def get_coverage_data():
+    """
+    Get gravity main cleaning coverage over rolling windows as JSON.
+
+    Returns:
+        Response: JSON response with coverage for the last 1, 3 and 5 years.
+    """
+    try:
+        coverage = get_coverage()
+
+        # Convert lengths from the GIS layer's unit to feet
+        _, to_feet = get_length_unit()
+        coverage["total_length_ft"] = coverage["total_length"] * to_feet
+        for window in coverage["windows"]:
+            window["length_cleaned_ft"] = window["length_cleaned"] * to_feet
+
+        return jsonify({"success": True, "data": coverage})
+
+    except Exception as e:
+        logger.error("Error fetching sewer clean coverage: %s", str(e))
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @bp.route("/export")
+@allow_replica(3600)
 def export_data():
     """
     Export sewer clean data to CSV.
@@ -166,33 +178,21 @@ def export_data():
         Response: CSV file download.
     """
     try:
-        # Get date filters from request
-        start_date_str = request.args.get("start_date", "")
-        end_date_str = request.args.get("end_date", "")
-
-        # Parse dates if provided
-        if start_date_str and end_date_str:
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-            start_date = start_date.replace(hour=0, minute=0, second=0)
-
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-            end_date = end_date.replace(hour=23, minute=59, second=59)
-        else:
-            # Use default dates (last 30 days)
-            end_date = datetime.now().replace(hour=23, minute=59, second=59)
-            start_date = (end_date - timedelta(days=30)).replace(
-                hour=0, minute=0, second=0
-            )
+        try:
+            start_date, end_date = parse_date_range()
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid date format: {e}"}), 400
 
-        # Get query and parameters
-        query, params, db_key = get_sewer_clean_data(start_date, end_date)
-
-        # Execute query
-        results = execute_query(query, params, db_key=db_key)
+        results = frame_to_records(
+            get_cleaning_frame(start_date, end_date), iso_dates=True
+        )
 
         if not results:
             return jsonify({"success": False, "error": "No data to export"}), 404
 
+        # Lengths are in the GIS layer's unit, and in feet
+        unit, to_feet = get_length_unit()
+
         # Create CSV file in memory
         si = StringIO()
         writer = csv.writer(si)
@@ -205,16 +205,15 @@ def export_data():
                 "Finish Date",
                 "Entity UID",
                 "Object ID",
-                "Length (m)",
+                f"Length ({unit})",
                 "Length (ft)",
             ]
         )
 
         # Write data rows
         for row in results:
-            # Convert length to feet
-            length_m = float(row.get("length", 0))
-            length_ft = length_m * 3.28084
+            length = float(row.get("length") or 0)
+            length_ft = length * to_feet
 
             writer.writerow(
                 [
@@ -223,7 +222,7 @@ def export_data():
                     row.get("actualfinishdate", ""),
                     row.get("entityuid", ""),
                     row.get("objectid", ""),
-                    f"{length_m:.2f}",
+                    f"{length:.2f}",
                     f"{length_ft:.2f}",
                 ]
             )
@@ -245,6 +244,7 @@ def export_data():
 
 
 @bp.route("/summary-export")
+@allow_replica(3600)
 def export_summary():
     """
     Export sewer clean summary data to CSV.
@@ -253,33 +253,20 @@ def export_summary():
         Response: CSV file download with daily and type totals.
     """
     try:
-        # Get date filters from request
-        start_date_str = request.args.get("start_date", "")
-        end_date_str = request.args.get("end_date", "")
-
-        # Parse dates if provided
-        if start_date_str and end_date_str:
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-            start_date = start_date.replace(hour=0, minute=0, second=0)
-
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-            end_date = end_date.replace(hour=23, minute=59, second=59)
-        else:
-            # Use default dates (last 30 days)
-            end_date = datetime.now().replace(hour=23, minute=59, second=59)
-            start_date = (end_date - timedelta(days=30)).replace(
-                hour=0, minute=0, second=0
-            )
-
-        # Get daily summary data
-        daily_query, daily_params, daily_db_key = get_daily_totals(start_date, end_date)
-        daily_results = execute_query(daily_query, daily_params, db_key=daily_db_key)
-
-        # Get description summary data
-        desc_query, desc_params, desc_db_key = get_description_totals(
-            start_date, end_date
+        try:
+            start_date, end_date = parse_date_range()
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid date format: {e}"}), 400
+
+        # Daily and work type totals from the same cleaned mains
+        frame = get_cleaning_frame(start_date, end_date)
+        daily_results = frame_to_records(summarize_daily(frame), iso_dates=True)
+        desc_results = frame_to_records(
+            summarize_by_description(frame), iso_dates=True
         )
-        desc_results = execute_query(desc_query, desc_params, db_key=desc_db_key)
+
+        # Lengths are in the GIS layer's unit, and in feet
+        unit, to_feet = get_length_unit()
 
         # Create CSV file in memory
         si = StringIO()
@@ -288,19 +275,19 @@ def export_summary():
         # Write first header for daily data
         writer.writerow(["Daily Cleaning Totals"])
         writer.writerow(
-            ["Date", "Work Order Count", "Total Length (m)", "Total Length (ft)"]
+            ["Date", "Work Order Count", f"Total Length ({unit})", "Total Length (ft)"]
         )
 
         # Write daily data
         for row in daily_results:
-            length_m = float(row.get("total_length", 0))
-            length_ft = length_m * 3.28084
+            length = float(row.get("total_length") or 0)
+            length_ft = length * to_feet
 
             writer.writerow(
                 [
                     row.get("clean_date", ""),
                     row.get("work_order_count", ""),
-                    f"{length_m:.2f}",
+                    f"{length:.2f}",
                     f"{length_ft:.2f}",
                 ]
             )
@@ -312,19 +299,24 @@ def export_summary():
         # Write second header for work type data
         writer.writerow(["Work Type Cleaning Totals"])
         writer.writerow(
-            ["Work Type", "Work Order Count", "Total Length (m)", "Total Length (ft)"]
+            [
+                "Work Type",
+                "Work Order Count",
+                f"Total Length ({unit})",
+                "Total Length (ft)",
+            ]
         )
 
         # Write work type data
         for row in desc_results:
-            length_m = float(row.get("total_length", 0))
-            length_ft = length_m * 3.28084
+            length = float(row.get("total_length") or 0)
+            length_ft = length * to_feet
 
             writer.writerow(
                 [
                     row.get("work_type", ""),
                     row.get("work_order_count", ""),
-                    f"{length_m:.2f}",
+                    f"{length:.2f}",
                     f"{length_ft:.2f}",
                 ]
             )
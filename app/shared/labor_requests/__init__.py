@@ -5,9 +5,16 @@ This module defines a reusable labor requests report that can be
 registered with multiple group blueprints while controlling its visibility.
 """
 
+import csv
 import logging
-from flask import Blueprint, render_template, request
+from datetime import datetime, timedelta
+from io import StringIO
+from flask import Blueprint, render_template, request, jsonify, Response
+from app.core.database import execute_query
+from app.core.range_cache import RangeCache
 from app.core.template_helpers import get_blueprint_group_id
+from app.core.watermarks import watermarks
+from app.shared.labor_requests.queries import get_labor_requests
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -105,8 +112,6 @@ def index():
                 current_group = parts[2]  # /groups/{group}/labor_requests
 
         # Get default dates (last 30 days)
-        from datetime import datetime, timedelta
-
         end_date = datetime.now().strftime("%Y-%m-%d")
         start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
 
@@ -127,16 +132,128 @@ def index():
         return render_template("error.html", error=str(e))
 
 
-# Additional routes would go here
+def _fetch_labor_requests(start_date, end_date, category):
+    """Load labor requests for a date range and category."""
+    query, params, db_key = get_labor_requests(start_date, end_date, category)
+    return execute_query(query, params, db_key=db_key)
+
+
+# Labor requests in per-day partitions of TRANSDATE, by category
+labor_requests_cache = RangeCache(
+    "labor_requests",
+    _fetch_labor_requests,
+    "TRANSDATE",
+    order_by=(("DESCRIPTION", False),),
+)
+watermarks.depends_on("cw", "azteca.REQUESTLABOR", labor_requests_cache.invalidate_open)
+
+
+def parse_labor_parameters():
+    """
+    Parse the date range and category from the request.
+
+    Returns:
+        tuple: (start_date, end_date, category), defaulting to the last 30 days
+        and all categories.
+    """
+    start_date_str = request.args.get("start_date", "")
+    end_date_str = request.args.get("end_date", "")
+    category = request.args.get("category", "")
+
+    if start_date_str and end_date_str:
+        start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
+        start_date = start_date.replace(hour=0, minute=0, second=0)
+
+        end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
+        end_date = end_date.replace(hour=23, minute=59, second=59)
+    else:
+        # Use default dates (last 30 days)
+        end_date = datetime.now().replace(hour=23, minute=59, second=59)
+        start_date = (end_date - timedelta(days=30)).replace(
+            hour=0, minute=0, second=0
+        )
+
+    return start_date, end_date, category or None
+
+
 @labor_requests_blueprint.route("/data")
 def get_data():
     """API endpoint to get labor data."""
-    # Implementation would go here
-    pass
+    try:
+        start_date, end_date, category = parse_labor_parameters()
+
+        # Get rows from the range cache, querying only uncached days
+        results = labor_requests_cache.get(start_date, end_date, category)
+
+        return jsonify(
+            {
+                "success": True,
+                "data": results,
+                "count": len(results),
+                "filters": {
+                    "start_date": start_date.strftime("%Y-%m-%d"),
+                    "end_date": end_date.strftime("%Y-%m-%d"),
+                    "category": category or "",
+                },
+            }
+        )
+
+    except Exception as e:
+        logger.error("Error fetching labor requests data: %s", str(e))
+        return jsonify({"success": False, "error": str(e)}), 500
 
 
 @labor_requests_blueprint.route("/export")
 def export_data():
     """API endpoint to export labor data as CSV."""
-    # Implementation would go here
-    pass
+    try:
+        start_date, end_date, category = parse_labor_parameters()
+        results = labor_requests_cache.get(start_date, end_date, category)
+
+        if not results:
+            return jsonify({"success": False, "error": "No data to export"}), 404
+
+        si = StringIO()
+        writer = csv.writer(si)
+
+        # Write header row
+        writer.writerow(
+            [
+                "Request ID",
+                "Labor Name",
+                "Hours",
+                "Cost",
+                "Transaction Date",
+                "Description",
+                "Category",
+            ]
+        )
+
+        # Write data rows
+        for row in results:
+            writer.writerow(
+                [
+                    row.get("REQUESTID", ""),
+                    row.get("LABORNAME", ""),
+                    row.get("HOURS", ""),
+                    row.get("COST", ""),
+                    row.get("TRANSDATE", ""),
+                    row.get("DESCRIPTION", ""),
+                    row.get("REQCATEGORY", ""),
+                ]
+            )
+
+        # Create response with CSV file
+        output = si.getvalue()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"labor_requests_{timestamp}.csv"
+
+        return Response(
+            output,
+            mimetype="text/csv",
+            headers={"Content-disposition": f"attachment; filename={filename}"},
+        )
+
+    except Exception as e:
+        logger.error("Error exporting labor requests: %s", str(e))
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -107,15 +107,6 @@ def register_labor_requests_routes(bp, url_prefix="/labor_requests"):
             # Execute query to get real data from database
             results = execute_query(query, params, db_key=db_key)
 
-            # Process date fields for JSON serialization
-            for row in results:
-                if row.get("TRANSDATE"):
-                    row["TRANSDATE"] = (
-                        row["TRANSDATE"].isoformat()
-                        if hasattr(row["TRANSDATE"], "isoformat")
-                        else row["TRANSDATE"]
-                    )
-
             # Return data as JSON
             return jsonify(
                 {
@@ -5,10 +5,22 @@ This module defines a reusable work order comments search report that can be
 registered with multiple group blueprints while controlling its visibility.
 """
 
+import csv
 import logging
 from datetime import datetime, timedelta
+from io import StringIO
 from flask import Blueprint, render_template, request, jsonify, Response
+from app.core.database import execute_query
 from app.core.template_helpers import get_blueprint_group_id
+from app.shared.work_order_comments.queries import (
+    get_employee_list,
+    parse_search_terms,
+)
+from app.shared.work_order_comments.search_index import (
+    find_work_order_comments,
+    get_index_authors,
+    open_comment_index,
+)
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -111,9 +123,27 @@ def index():
         end_date = datetime.now().strftime("%Y-%m-%d")
         start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
 
+        # Offer the comment authors held in the local index, if it is ready
+        employees = []
+        try:
+            conn = open_comment_index()
+            if conn is not None:
+                try:
+                    employees = get_index_authors(conn)
+                finally:
+                    conn.close()
+        except Exception as e:
+            logger.warning("Could not load comment authors: %s", str(e))
+
+        # Otherwise list the employees from CityWorks
+        if not employees:
+            query, params, db_key = get_employee_list()
+            employees = execute_query(query, params, db_key=db_key)
+
         return render_template(
             "shared/work_order_comments/index.html",
             title="Work Order Comments Search",
+            employees=employees,
             default_start_date=start_date,
             default_end_date=end_date,
             current_group=current_group,
@@ -125,58 +155,89 @@ def index():
         return render_template("error.html", error=str(e))
 
 
+def parse_search_parameters():
+    """
+    Parse and validate the comment search parameters from the request.
+
+    Returns:
+        tuple: (search_term, start_date, end_date, author_sid)
+
+    Raises:
+        ValueError: If the search term is too short or a parameter is invalid.
+    """
+    search_term = request.args.get("search_term", "").strip()
+    start_date_str = request.args.get("start_date", "")
+    end_date_str = request.args.get("end_date", "")
+    author_str = request.args.get("author", "")
+
+    if len(search_term) < 2 or not parse_search_terms(search_term):
+        raise ValueError("Search term is required (min 2 characters)")
+
+    try:
+        if start_date_str:
+            start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
+        else:
+            start_date = datetime.now() - timedelta(days=30)
+        start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        if end_date_str:
+            end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
+        else:
+            end_date = datetime.now()
+        end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=0)
+    except ValueError as exc:
+        raise ValueError("Invalid date format") from exc
+
+    try:
+        author_sid = int(author_str) if author_str else None
+    except ValueError as exc:
+        raise ValueError("Invalid author") from exc
+
+    return search_term, start_date, end_date, author_sid
+
+
+def get_author_name(row):
+    """
+    Build a display name for a comment author.
+
+    Args:
+        row (dict): A comment row with FIRSTNAME and LASTNAME.
+
+    Returns:
+        str: The author's name, or "Unknown".
+    """
+    names = [row.get("FIRSTNAME"), row.get("LASTNAME")]
+    return " ".join(name for name in names if name) or "Unknown"
+
+
 @work_order_comments_blueprint.route("/search")
 def search_comments():
     """API endpoint to search work order comments."""
     try:
-        # Get search parameters
-        search_term = request.args.get("search_term", "")
-        start_date_str = request.args.get("start_date", "")
-        end_date_str = request.args.get("end_date", "")
-
-        # Validate parameters
-        if not search_term or len(search_term) < 2:
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "error": "Search term is required (min 2 characters)",
-                    }
-                ),
-                400,
-            )
-
-        # Process dates with proper error handling
         try:
-            if start_date_str:
-                start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-                start_date = start_date.replace(hour=0, minute=0, second=0)
-            else:
-                start_date = (datetime.now() - timedelta(days=30)).replace(
-                    hour=0, minute=0, second=0
-                )
-
-            if end_date_str:
-                end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-                end_date = end_date.replace(hour=23, minute=59, second=59)
-            else:
-                end_date = datetime.now().replace(hour=23, minute=59, second=59)
-        except ValueError:
-            return jsonify({"success": False, "error": "Invalid date format"}), 400
-
-        # Here you would implement your database query to search comments
-        # For this example, we'll return a placeholder response
-        results = []  # This would be populated from your database
+            search_term, start_date, end_date, author_sid = parse_search_parameters()
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        results, source = find_work_order_comments(
+            search_term, start_date, end_date, author_sid
+        )
+
+        # Add display names for the comment authors
+        for row in results:
+            row["AUTHOR_NAME"] = get_author_name(row)
 
         return jsonify(
             {
                 "success": True,
                 "data": results,
                 "count": len(results),
+                "source": source,
                 "filters": {
                     "search_term": search_term,
                     "start_date": start_date.strftime("%Y-%m-%d"),
                     "end_date": end_date.strftime("%Y-%m-%d"),
+                    "author": author_sid,
                 },
             }
         )
@@ -190,39 +251,18 @@ def search_comments():
 def export_comments():
     """API endpoint to export search results as CSV."""
     try:
-        # Get search parameters
-        search_term = request.args.get("search_term", "")
-        start_date_str = request.args.get("start_date", "")
-        end_date_str = request.args.get("end_date", "")
-
-        # Validate parameters
-        if not search_term or len(search_term) < 2:
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "error": "Search term is required (min 2 characters)",
-                    }
-                ),
-                400,
-            )
-
-        # Process dates with proper error handling
-        # (Similar to search_comments function)
-
-        # Here you would implement your database query to get the data for export
-        # For this example, we'll return a placeholder error
+        try:
+            search_term, start_date, end_date, author_sid = parse_search_parameters()
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
 
-        # Create CSV file in memory (assuming you have results)
-        results = []  # This would be populated from your database
+        results, _ = find_work_order_comments(
+            search_term, start_date, end_date, author_sid
+        )
 
         if not results:
             return jsonify({"success": False, "error": "No data found for export"}), 404
 
-        # Example CSV generation code (would be customized for your actual data)
-        import csv
-        from io import StringIO
-
         si = StringIO()
         writer = csv.writer(si)
 
@@ -235,12 +275,12 @@ def export_comments():
         for row in results:
             writer.writerow(
                 [
-                    row.get("work_order_id", ""),
-                    row.get("description", ""),
-                    row.get("status", ""),
-                    row.get("author", ""),
-                    row.get("comment", ""),
-                    row.get("date", ""),
+                    row.get("WORKORDERID", ""),
+                    row.get("DESCRIPTION", ""),
+                    row.get("STATUS", ""),
+                    get_author_name(row),
+                    row.get("COMMENTS", ""),
+                    row.get("DATECREATED", ""),
                 ]
             )
 
@@ -7,11 +7,15 @@ Each function returns a SQL query string and parameters.
 """
 
 import logging
+import re
 from datetime import datetime, timedelta
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# A quoted phrase (optionally followed by *) or a bare word
+SEARCH_TERM_PATTERN = re.compile(r'"([^"]*)"(\*?)|([^\s"]+)')
+
 
 def get_default_date_range():
     """
@@ -39,16 +43,48 @@ def format_date_for_query(date_obj):
     return date_obj.strftime("%Y-%m-%d %H:%M:%S")
 
 
-def get_work_order_comments(search_term, start_date=None, end_date=None):
+def parse_search_terms(search_term):
+    """
+    Split a search string into terms.
+
+    Words are matched individually and must all appear. Text in double quotes
+    is matched as a phrase, and a trailing * marks a prefix search
+    (e.g. hydr* matches hydrant and hydraulic).
+
+    Args:
+        search_term (str): The raw search text.
+
+    Returns:
+        list: (text, is_prefix) tuples; quoted phrases keep their spaces.
+    """
+    terms = []
+    for match in SEARCH_TERM_PATTERN.finditer(search_term or ""):
+        if match.group(1) is not None:
+            text, is_prefix = match.group(1).strip(), bool(match.group(2))
+        else:
+            word = match.group(3)
+            text, is_prefix = word.rstrip("*"), word.endswith("*")
+
+        # Skip terms with nothing searchable in them
+        if any(char.isalnum() for char in text):
+            terms.append((text, is_prefix))
+
+    return terms
+
+
+def get_work_order_comments(search_term, start_date=None, end_date=None, author_sid=None):
     """
     Get work order comments that match the search term within the date range.
 
+    Every term parsed from the search text must appear in the comment.
+
     Args:
-        search_term (str): The term to search for in comments.
+        search_term (str): The term(s) to search for in comments.
         start_date (datetime, optional): Start date for the report period.
             If None, defaults to 30 days ago.
         end_date (datetime, optional): End date for the report period.
             If None, defaults to current date.
+        author_sid (int, optional): Only include comments by this employee SID.
 
     Returns:
         tuple: (SQL query string, query parameters, database key)
@@ -61,8 +97,12 @@ def get_work_order_comments(search_term, start_date=None, end_date=None):
     start_date_str = format_date_for_query(start_date)
     end_date_str = format_date_for_query(end_date)
 
+    # One LIKE condition per term; fall back to the raw text if nothing parsed
+    terms = [text for text, _ in parse_search_terms(search_term)] or [search_term]
+    like_clause = " AND ".join("WOC.COMMENTS LIKE ?" for _ in terms)
+
     # Build the base query
-    query = """
+    query = f"""
     SELECT
         WOC.WORKORDERID,
         WOC.AUTHORSID,
@@ -79,14 +119,19 @@ def get_work_order_comments(search_term, start_date=None, end_date=None):
     LEFT JOIN CW.[azteca].WORKORDER AS WO
         ON WOC.WORKORDERID = WO.WORKORDERID
     WHERE 
-        WOC.COMMENTS LIKE ?
+        {like_clause}
         AND WOC.DATECREATED BETWEEN ? AND ?
-    ORDER BY WOC.DATECREATED DESC
     """
 
     # Parameters - using ? placeholder style for pyodbc
-    # Add wildcards to the search term for partial matching
-    params = [f"%{search_term}%", start_date_str, end_date_str]
+    # Add wildcards to each term for partial matching
+    params = [f"%{term}%" for term in terms] + [start_date_str, end_date_str]
+
+    if author_sid is not None:
+        query += " AND WOC.AUTHORSID = ?"
+        params.append(author_sid)
+
+    query += " ORDER BY WOC.DATECREATED DESC"
 
     logger.info(
         "Generated work order comments search query for term '%s' between %s and %s",
@@ -98,6 +143,72 @@ def get_work_order_comments(search_term, start_date=None, end_date=None):
     return query, tuple(params), "cw"  # "cw" is the database key for CityWorks
 
 
+def get_comments_since(last_comment_id=0, start_date=None):
+    """
+    Get work order comments added after a comment ID, for syncing the local index.
+
+    Args:
+        last_comment_id (int, optional): Only return comments with a higher ID.
+            Defaults to 0 (all comments).
+        start_date (datetime, optional): Only return comments created on or
+            after this date. If None, no date limit is applied.
+
+    Returns:
+        tuple: (SQL query string, query parameters, database key)
+    """
+    query = """
+    SELECT
+        WOC.COMMENTID,
+        WOC.WORKORDERID,
+        WOC.AUTHORSID,
+        E.EMPLOYEEID,
+        E.LASTNAME,
+        E.FIRSTNAME,
+        WOC.COMMENTS,
+        WOC.DATECREATED
+    FROM CW.[azteca].WORKORDERCOMMENT AS WOC
+    LEFT JOIN CW.[azteca].EMPLOYEE AS E
+        ON WOC.AUTHORSID = E.EMPLOYEESID
+    WHERE WOC.COMMENTID > ?
+    """
+
+    params = [last_comment_id]
+
+    if start_date is not None:
+        query += " AND WOC.DATECREATED >= ?"
+        params.append(format_date_for_query(start_date))
+
+    query += " ORDER BY WOC.COMMENTID"
+
+    logger.info("Retrieving work order comments after comment ID %s", last_comment_id)
+    return query, tuple(params), "cw"
+
+
+def get_work_order_summaries(work_order_ids):
+    """
+    Get the current description and status of specific work orders.
+
+    Args:
+        work_order_ids (list): Work order IDs to look up (at most 2000,
+            the SQL Server parameter limit).
+
+    Returns:
+        tuple: (SQL query string, query parameters, database key)
+    """
+    placeholders = ", ".join("?" for _ in work_order_ids)
+
+    query = f"""
+    SELECT
+        WORKORDERID,
+        DESCRIPTION,
+        STATUS
+    FROM CW.[azteca].WORKORDER
+    WHERE WORKORDERID IN ({placeholders})
+    """
+
+    return query, tuple(work_order_ids), "cw"
+
+
 def get_employee_list():
     """
     Get all employees for filter dropdown.
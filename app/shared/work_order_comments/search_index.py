@@ -0,0 +1,491 @@
+"""
+Work Order Comments Search Index.
+
+This module maintains a local SQLite FTS5 full-text index of CityWorks work
+order comments, so comment searches do not need a LIKE '%term%' scan of
+WORKORDERCOMMENT on every request.
+
+The index is synced incrementally by comment ID in a background thread and
+rebuilt periodically to pick up edited or deleted comments. Searches support
+multiple terms, quoted phrases and prefix (term*) queries ranked by BM25, with
+date and author filters applied inside SQLite.
+"""
+
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.core.background import BackgroundRefresher
+from app.core.database import execute_query, stream_query
+from app.core.range_cache import RangeCache
+from app.core.watermarks import watermarks
+from app.shared.work_order_comments.queries import (
+    get_comments_since,
+    get_work_order_comments,
+    get_work_order_summaries,
+    parse_search_terms,
+)
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Stored date format (sorts chronologically as text)
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Work orders looked up per CityWorks round trip
+SUMMARY_BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comments (
+    comment_id INTEGER PRIMARY KEY,
+    work_order_id TEXT,
+    author_sid INTEGER,
+    employee_id TEXT,
+    last_name TEXT,
+    first_name TEXT,
+    comments TEXT,
+    created TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_comments_created ON comments (created);
+CREATE INDEX IF NOT EXISTS ix_comments_author ON comments (author_sid, created);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5 (
+    comments,
+    content='comments',
+    content_rowid='comment_id',
+    tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS comments_ai AFTER INSERT ON comments BEGIN
+    INSERT INTO comments_fts (rowid, comments) VALUES (new.comment_id, new.comments);
+END;
+CREATE TRIGGER IF NOT EXISTS comments_ad AFTER DELETE ON comments BEGIN
+    INSERT INTO comments_fts (comments_fts, rowid, comments)
+    VALUES ('delete', old.comment_id, old.comments);
+END;
+CREATE TRIGGER IF NOT EXISTS comments_au AFTER UPDATE ON comments BEGIN
+    INSERT INTO comments_fts (comments_fts, rowid, comments)
+    VALUES ('delete', old.comment_id, old.comments);
+    INSERT INTO comments_fts (rowid, comments) VALUES (new.comment_id, new.comments);
+END;
+
+CREATE TABLE IF NOT EXISTS index_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_refresher = BackgroundRefresher("comment-index-sync")
+
+# Index files whose schema has been created by this process
+_initialized_paths = set()
+
+
+def get_index_path():
+    """
+    Get the path of the SQLite index file.
+
+    Returns:
+        str: COMMENT_INDEX_PATH, or a file in the application instance folder.
+    """
+    path = current_app.config.get("COMMENT_INDEX_PATH")
+    if not path:
+        path = os.path.join(current_app.instance_path, "work_order_comments.sqlite3")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return path
+
+
+def connect(path=None):
+    """
+    Open a connection to the index, creating the schema if needed.
+
+    Args:
+        path (str, optional): Index file path. Defaults to get_index_path().
+
+    Returns:
+        sqlite3.Connection: An open connection in WAL mode.
+    """
+    path = path or get_index_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+    if path not in _initialized_paths:
+        conn.executescript(SCHEMA)
+        _initialized_paths.add(path)
+
+    return conn
+
+
+def _get_meta(conn, key, default=None):
+    """Read a value from the index metadata table."""
+    row = conn.execute("SELECT value FROM index_meta WHERE key = ?", (key,)).fetchone()
+    return row["value"] if row else default
+
+
+def _set_meta(conn, key, value):
+    """Write a value to the index metadata table."""
+    conn.execute(
+        "INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)",
+        (key, None if value is None else str(value)),
+    )
+
+
+def _format_date(value):
+    """Format a comment date for storage."""
+    if value is None:
+        return None
+    if hasattr(value, "strftime"):
+        return value.strftime(DATE_FORMAT)
+    return str(value)
+
+
+def _parse_date(value):
+    """Parse a stored comment date back to a datetime."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, DATE_FORMAT)
+    except ValueError:
+        return value
+
+
+def sync_comment_index(full=False):
+    """
+    Sync the comment index with CityWorks.
+
+    An incremental sync loads comments with an ID above the highest one
+    indexed. A full sync reloads every comment within the configured history,
+    in one transaction, so comments edited or deleted in CityWorks are
+    corrected while readers keep the previous contents until it commits.
+    Incremental batches are committed with their watermark, so an interrupted
+    sync resumes where it stopped. Must be called within an application context.
+
+    Args:
+        full (bool, optional): Reload the entire index. Defaults to False.
+
+    Returns:
+        int: Number of comments loaded.
+    """
+    history_days = current_app.config.get("COMMENT_INDEX_HISTORY_DAYS", 0)
+    conn = connect()
+
+    try:
+        if _get_meta(conn, "last_comment_id") is None:
+            full = True
+
+        history_start = None
+        if history_days:
+            history_start = datetime.now().replace(
+                hour=0, minute=0, second=0, microsecond=0
+            ) - timedelta(days=history_days)
+
+        if full:
+            last_comment_id = 0
+        else:
+            last_comment_id = int(_get_meta(conn, "last_comment_id", 0))
+            history_start = None
+
+        query, params, db_key = get_comments_since(last_comment_id, history_start)
+
+        loaded = 0
+        conn.execute("BEGIN IMMEDIATE")
+        if full:
+            conn.execute("DELETE FROM comments")
+            _set_meta(conn, "coverage_start", _format_date(history_start))
+
+        for columns, rows in stream_query(query, params, db_key=db_key):
+            records = [dict(zip(columns, row)) for row in rows]
+            if not records:
+                continue
+            conn.executemany(
+                """
+                INSERT INTO comments (
+                    comment_id, work_order_id, author_sid, employee_id,
+                    last_name, first_name, comments, created
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (comment_id) DO UPDATE SET
+                    work_order_id = excluded.work_order_id,
+                    author_sid = excluded.author_sid,
+                    employee_id = excluded.employee_id,
+                    last_name = excluded.last_name,
+                    first_name = excluded.first_name,
+                    comments = excluded.comments,
+                    created = excluded.created
+                """,
+                [
+                    (
+                        record["COMMENTID"],
+                        record["WORKORDERID"],
+                        record["AUTHORSID"],
+                        record["EMPLOYEEID"],
+                        record["LASTNAME"],
+                        record["FIRSTNAME"],
+                        record["COMMENTS"] or "",
+                        _format_date(record["DATECREATED"]),
+                    )
+                    for record in records
+                ],
+            )
+            loaded += len(records)
+            last_comment_id = max(last_comment_id, records[-1]["COMMENTID"])
+            _set_meta(conn, "last_comment_id", last_comment_id)
+
+            # Commit in batches during incremental syncs so progress is kept
+            if not full:
+                conn.commit()
+                conn.execute("BEGIN IMMEDIATE")
+
+        _set_meta(conn, "last_comment_id", last_comment_id)
+        _set_meta(conn, "last_sync", _format_date(datetime.now()))
+        if full:
+            _set_meta(conn, "last_rebuild", _format_date(datetime.now()))
+        conn.commit()
+
+        if full:
+            conn.execute("INSERT INTO comments_fts (comments_fts) VALUES ('optimize')")
+            conn.commit()
+
+        logger.info(
+            "%s work order comment index with %d comments (last comment ID %s)",
+            "Rebuilt" if full else "Synced",
+            loaded,
+            last_comment_id,
+        )
+        return loaded
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _rebuild_due(conn, interval):
+    """Check whether the persisted index is due for a full rebuild."""
+    last_rebuild = _parse_date(_get_meta(conn, "last_rebuild"))
+    if not isinstance(last_rebuild, datetime):
+        return True
+    return (datetime.now() - last_rebuild).total_seconds() >= interval
+
+
+def open_comment_index():
+    """
+    Open the comment index for searching, scheduling a sync when due.
+
+    Syncs run in a background thread. None is returned until the index holds
+    a completed load, and callers should then query CityWorks directly.
+
+    Returns:
+        sqlite3.Connection: An open index connection, or None if unavailable.
+    """
+    app = current_app._get_current_object()
+    if not app.config.get("COMMENT_INDEX_ENABLED", True):
+        return None
+
+    conn = connect()
+    try:
+        ready = _get_meta(conn, "last_sync") is not None
+        full = _rebuild_due(conn, app.config.get("COMMENT_INDEX_REBUILD_SECONDS", 86400))
+    except Exception:
+        conn.close()
+        raise
+
+    _refresher.trigger(
+        app,
+        sync_comment_index,
+        app.config.get("COMMENT_INDEX_SYNC_SECONDS", 120),
+        full=full,
+    )
+
+    if not ready:
+        conn.close()
+        return None
+    return conn
+
+
+def build_match_expression(terms):
+    """
+    Build an FTS5 MATCH expression from parsed search terms.
+
+    Args:
+        terms (list): (text, is_prefix) tuples from parse_search_terms.
+
+    Returns:
+        str: Terms quoted as FTS5 strings (phrases keep word order) and ANDed.
+    """
+    parts = []
+    for text, is_prefix in terms:
+        quoted = '"' + text.replace('"', '""') + '"'
+        parts.append(quoted + ("*" if is_prefix else ""))
+    return " AND ".join(parts)
+
+
+def search_comment_index(conn, terms, start_date, end_date, author_sid=None, limit=5000):
+    """
+    Search the comment index.
+
+    Args:
+        conn (sqlite3.Connection): An open index connection.
+        terms (list): (text, is_prefix) tuples from parse_search_terms.
+        start_date (datetime): Start of the comment date range.
+        end_date (datetime): End of the comment date range.
+        author_sid (int, optional): Only include comments by this employee SID.
+        limit (int, optional): Maximum number of results. Defaults to 5000.
+
+    Returns:
+        list: Comment dictionaries ordered by relevance, then newest first.
+    """
+    query = """
+    SELECT
+        c.comment_id,
+        c.work_order_id,
+        c.author_sid,
+        c.employee_id,
+        c.last_name,
+        c.first_name,
+        c.comments,
+        c.created,
+        bm25(comments_fts) AS rank
+    FROM comments_fts
+    JOIN comments AS c ON c.comment_id = comments_fts.rowid
+    WHERE comments_fts MATCH ?
+        AND c.created BETWEEN ? AND ?
+    """
+    params = [
+        build_match_expression(terms),
+        _format_date(start_date),
+        _format_date(end_date),
+    ]
+
+    if author_sid is not None:
+        query += " AND c.author_sid = ?"
+        params.append(author_sid)
+
+    query += " ORDER BY rank, c.created DESC LIMIT ?"
+    params.append(limit)
+
+    return [
+        {
+            "WORKORDERID": row["work_order_id"],
+            "AUTHORSID": row["author_sid"],
+            "EMPLOYEEID": row["employee_id"],
+            "LASTNAME": row["last_name"],
+            "FIRSTNAME": row["first_name"],
+            "COMMENTS": row["comments"],
+            "DATECREATED": _parse_date(row["created"]),
+            "RELEVANCE": round(-row["rank"], 4),
+        }
+        for row in conn.execute(query, params)
+    ]
+
+
+def get_index_authors(conn):
+    """
+    Get the distinct comment authors held in the index.
+
+    Args:
+        conn (sqlite3.Connection): An open index connection.
+
+    Returns:
+        list: Dictionaries with EMPLOYEESID, EMPLOYEEID, FIRSTNAME and LASTNAME.
+    """
+    rows = conn.execute(
+        """
+        SELECT author_sid, MAX(employee_id) AS employee_id,
+            MAX(first_name) AS first_name, MAX(last_name) AS last_name
+        FROM comments
+        WHERE author_sid IS NOT NULL AND last_name IS NOT NULL
+        GROUP BY author_sid
+        ORDER BY last_name, first_name
+        """
+    )
+    return [
+        {
+            "EMPLOYEESID": row["author_sid"],
+            "EMPLOYEEID": row["employee_id"],
+            "FIRSTNAME": row["first_name"],
+            "LASTNAME": row["last_name"],
+        }
+        for row in rows
+    ]
+
+
+def _add_work_order_summaries(results):
+    """Attach current work order description and status to search results."""
+    work_order_ids = sorted({row["WORKORDERID"] for row in results if row["WORKORDERID"]})
+    summaries = {}
+
+    for i in range(0, len(work_order_ids), SUMMARY_BATCH_SIZE):
+        query, params, db_key = get_work_order_summaries(
+            work_order_ids[i : i + SUMMARY_BATCH_SIZE]
+        )
+        for row in execute_query(query, params, db_key=db_key):
+            summaries[str(row["WORKORDERID"])] = row
+
+    for row in results:
+        summary = summaries.get(str(row["WORKORDERID"]), {})
+        row["DESCRIPTION"] = summary.get("DESCRIPTION")
+        row["STATUS"] = summary.get("STATUS")
+
+
+def _fetch_database_comments(start_date, end_date, search_term, author_sid):
+    """Search the comments table directly for a date range."""
+    query, params, db_key = get_work_order_comments(
+        search_term, start_date, end_date, author_sid
+    )
+    return execute_query(query, params, db_key=db_key)
+
+
+# Database search results in per-day partitions, by search text and author
+database_results = RangeCache(
+    "work_order_comments",
+    _fetch_database_comments,
+    "DATECREATED",
+    order_by=(("DATECREATED", True),),
+)
+watermarks.depends_on("cw", "azteca.WORKORDERCOMMENT", database_results.invalidate_open)
+
+
+def find_work_order_comments(search_term, start_date, end_date, author_sid=None):
+    """
+    Search work order comments, using the local index when it is available.
+
+    Args:
+        search_term (str): Search text (words, "quoted phrases", prefix*).
+        start_date (datetime): Start of the comment date range.
+        end_date (datetime): End of the comment date range.
+        author_sid (int, optional): Only include comments by this employee SID.
+
+    Returns:
+        tuple: (list of comment dictionaries, "index" or "database")
+    """
+    terms = parse_search_terms(search_term)
+    conn = open_comment_index() if terms else None
+
+    if conn is not None:
+        try:
+            coverage_start = _parse_date(_get_meta(conn, "coverage_start"))
+            if not isinstance(coverage_start, datetime) or start_date >= coverage_start:
+                results = search_comment_index(
+                    conn,
+                    terms,
+                    start_date,
+                    end_date,
+                    author_sid,
+                    current_app.config.get("COMMENT_INDEX_MAX_RESULTS", 5000),
+                )
+                _add_work_order_summaries(results)
+                return results, "index"
+        finally:
+            conn.close()
+
+    # Fall back to scanning the comments table, one uncached day range at a time
+    results = database_results.get(start_date, end_date, search_term, author_sid)
+    return results, "database"
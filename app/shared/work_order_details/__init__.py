@@ -8,6 +8,7 @@ registered with multiple group blueprints while controlling its visibility.
 import logging
 from flask import Blueprint, render_template, request, jsonify
 from app.core.template_helpers import get_blueprint_group_id
+from app.shared.work_order_details.loader import get_work_order
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -140,14 +141,13 @@ def details(work_order_id):
             if len(parts) > 2:
                 current_group = parts[2]  # /groups/{group}/work_orders
 
-        # Here you would retrieve the work order details from your database
-        # For this example, we'll return a placeholder error
+        # Load the work order with its comments, labor and materials
+        result, _ = get_work_order(work_order_id)
 
-        # Query the database for work order details
-        work_order = None  # This would be populated from your database
-        comments = []  # This would be populated from your database
-        labor = []  # This would be populated from your database
-        materials = []  # This would be populated from your database
+        work_order = result.work_order if result else None
+        comments = result.comments if result else []
+        labor = result.labor if result else []
+        materials = result.materials if result else []
 
         error_message = None
         if not work_order:
@@ -193,16 +193,9 @@ def api_details(work_order_id):
         work_order_id (str): The work order ID to retrieve
     """
     try:
-        # Here you would retrieve the work order details from your database
-        # For this example, we'll return a placeholder response
+        result, cached = get_work_order(work_order_id)
 
-        # Query the database for work order details
-        work_order = None  # This would be populated from your database
-        comments = []  # This would be populated from your database
-        labor = []  # This would be populated from your database
-        materials = []  # This would be populated from your database
-
-        if not work_order:
+        if not result:
             return (
                 jsonify(
                     {"success": False, "error": f"Work order {work_order_id} not found"}
@@ -210,17 +203,7 @@ def api_details(work_order_id):
                 404,
             )
 
-        return jsonify(
-            {
-                "success": True,
-                "data": {
-                    "work_order": work_order,
-                    "comments": comments,
-                    "labor": labor,
-                    "materials": materials,
-                },
-            }
-        )
+        return jsonify({"success": True, "data": result.to_json(), "cached": cached})
 
     except Exception as e:
         logger.error("Error retrieving work order details via API: %s", str(e))
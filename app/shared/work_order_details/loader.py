@@ -0,0 +1,112 @@
+"""
+Work Order Details loader.
+
+This module loads a work order with its comments, labor and materials in a
+single database round trip and keeps recently viewed work orders in a short
+lived in-process cache.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from flask import current_app
+
+from app.core.cache import TTLCache
+from app.core.database import execute_batch
+from app.shared.work_order_details.queries import get_work_order_bundle
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Recently loaded work orders, sized from config on first use
+_cache = TTLCache()
+
+
+@dataclass
+class WorkOrderDetails:
+    """A work order and the records attached to it."""
+
+    work_order: dict
+    comments: list = field(default_factory=list)
+    labor: list = field(default_factory=list)
+    materials: list = field(default_factory=list)
+
+    def to_json(self):
+        """
+        Convert the work order to a JSON-serializable dictionary.
+
+        Returns:
+            dict: work_order, comments, labor and materials with dates in
+            ISO format.
+        """
+        return {
+            "work_order": _serialize_row(self.work_order),
+            "comments": [_serialize_row(row) for row in self.comments],
+            "labor": [_serialize_row(row) for row in self.labor],
+            "materials": [_serialize_row(row) for row in self.materials],
+        }
+
+
+def _serialize_row(row):
+    """Return a copy of a row with date values converted to ISO strings."""
+    return {
+        key: value.isoformat() if hasattr(value, "isoformat") else value
+        for key, value in row.items()
+    }
+
+
+def _format_name(row):
+    """Build a display name from a row's FIRSTNAME and LASTNAME."""
+    names = [row.get("FIRSTNAME"), row.get("LASTNAME")]
+    return " ".join(name for name in names if name) or "Unknown"
+
+
+def fetch_work_order_details(work_order_id):
+    """
+    Load a work order from CityWorks in a single round trip.
+
+    Args:
+        work_order_id (str): The ID of the work order to load.
+
+    Returns:
+        WorkOrderDetails: The work order, or None if it does not exist.
+    """
+    query, params, db_key = get_work_order_bundle(work_order_id)
+    result_sets = execute_batch(query, params, db_key=db_key)
+
+    # Pad in case the driver dropped trailing empty result sets
+    details, comments, labor, materials = (result_sets + [[], [], [], []])[:4]
+
+    if not details:
+        return None
+
+    for comment in comments:
+        comment["AUTHOR_NAME"] = _format_name(comment)
+
+    return WorkOrderDetails(
+        work_order=details[0],
+        comments=comments,
+        labor=labor,
+        materials=materials,
+    )
+
+
+def get_work_order(work_order_id):
+    """
+    Get a work order, serving recently viewed work orders from the cache.
+
+    Args:
+        work_order_id (str): The ID of the work order to retrieve.
+
+    Returns:
+        tuple: (WorkOrderDetails or None, True if served from the cache)
+    """
+    work_order_id = str(work_order_id).strip()
+    ttl = current_app.config.get("WORK_ORDER_CACHE_SECONDS", 60)
+
+    if ttl <= 0:
+        return fetch_work_order_details(work_order_id), False
+
+    _cache.resize(current_app.config.get("WORK_ORDER_CACHE_SIZE", 256), ttl)
+    return _cache.get_or_load(
+        work_order_id, lambda: fetch_work_order_details(work_order_id)
+    )
@@ -177,3 +177,36 @@ def get_work_order_materials(work_order_id):
     )
 
     return query, tuple(params), "cw"
+
+
+def get_work_order_bundle(work_order_id):
+    """
+    Get details, comments, labor and materials for a work order in one batch.
+
+    The batch returns four result sets in that order, so the whole work order
+    is loaded in a single database round trip.
+
+    Args:
+        work_order_id (str): The ID of the work order to retrieve.
+
+    Returns:
+        tuple: (SQL batch string, query parameters, database key)
+    """
+    statements = ["SET NOCOUNT ON;"]
+    params = []
+
+    for get_query in (
+        get_work_order_details,
+        get_work_order_comments,
+        get_work_order_labor,
+        get_work_order_materials,
+    ):
+        query, query_params, _ = get_query(work_order_id)
+        statements.append(query.strip() + ";")
+        params.extend(query_params)
+
+    logger.info(
+        "Generated work order bundle query for work order ID: %s", work_order_id
+    )
+
+    return "\n".join(statements), tuple(params), "cw"
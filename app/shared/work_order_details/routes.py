@@ -8,13 +8,7 @@ These routes can be registered with multiple group blueprints.
 import logging
 from flask import render_template, request, jsonify, abort, redirect, url_for
 
-from app.core.database import execute_query
-from app.shared.work_order_details.queries import (
-    get_work_order_details,
-    get_work_order_comments,
-    get_work_order_labor,
-    get_work_order_materials,
-)
+from app.shared.work_order_details.loader import get_work_order
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -72,15 +66,10 @@ def register_work_order_details_routes(bp, url_prefix="/work_orders"):
             str: Rendered HTML template.
         """
         try:
-            # Get work order details
-            details_query, details_params, details_db_key = get_work_order_details(
-                work_order_id
-            )
-            details = execute_query(
-                details_query, details_params, fetch_all=False, db_key=details_db_key
-            )
+            # Load the work order with its comments, labor and materials
+            result, _ = get_work_order(work_order_id)
 
-            if not details:
+            if not result:
                 logger.warning("Work order not found: %s", work_order_id)
                 # This is a search that returned no results, not an initial page load
                 return render_template(
@@ -95,59 +84,13 @@ def register_work_order_details_routes(bp, url_prefix="/work_orders"):
                     error_message=f"Work order {work_order_id} not found",
                 )
 
-            # Get work order comments
-            comments_query, comments_params, comments_db_key = get_work_order_comments(
-                work_order_id
-            )
-            comments = execute_query(
-                comments_query, comments_params, db_key=comments_db_key
-            )
-
-            # Get work order labor
-            labor_query, labor_params, labor_db_key = get_work_order_labor(
-                work_order_id
-            )
-            labor = execute_query(labor_query, labor_params, db_key=labor_db_key)
-
-            # Get work order materials
-            materials_query, materials_params, materials_db_key = (
-                get_work_order_materials(work_order_id)
-            )
-            materials = execute_query(
-                materials_query, materials_params, db_key=materials_db_key
-            )
-
-            # Format author names for comments
-            for comment in comments:
-                if comment.get("FIRSTNAME") and comment.get("LASTNAME"):
-                    comment["AUTHOR_NAME"] = (
-                        f"{comment['FIRSTNAME']} {comment['LASTNAME']}"
-                    )
-                elif comment.get("LASTNAME"):
-                    comment["AUTHOR_NAME"] = comment["LASTNAME"]
-                elif comment.get("FIRSTNAME"):
-                    comment["AUTHOR_NAME"] = comment["FIRSTNAME"]
-                else:
-                    comment["AUTHOR_NAME"] = "Unknown"
-
-            # Format labor names
-            for entry in labor:
-                if entry.get("FIRSTNAME") and entry.get("LASTNAME"):
-                    entry["EMPLOYEE_NAME"] = f"{entry['FIRSTNAME']} {entry['LASTNAME']}"
-                elif entry.get("LASTNAME"):
-                    entry["EMPLOYEE_NAME"] = entry["LASTNAME"]
-                elif entry.get("FIRSTNAME"):
-                    entry["EMPLOYEE_NAME"] = entry["FIRSTNAME"]
-                else:
-                    entry["EMPLOYEE_NAME"] = "Unknown"
-
             return render_template(
                 "shared/work_order_details/index.html",
                 title=f"Work Order {work_order_id}",
-                work_order=details,
-                comments=comments,
-                labor=labor,
-                materials=materials,
+                work_order=result.work_order,
+                comments=result.comments,
+                labor=result.labor,
+                materials=result.materials,
                 current_group=bp.name,
                 initial_load=False,  # Not an initial load
             )
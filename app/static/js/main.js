@@ -428,6 +428,78 @@ function formatCurrency(value) {
     }
 }
 
+/**
+ * Check whether a value is a columnar table ({columns, rows})
+ * @param {*} value - The value to check
+ * @returns {boolean} - True for a columnar table
+ */
+function isColumnarTable(value) {
+    return value !== null && typeof value === 'object' &&
+        Array.isArray(value.columns) && Array.isArray(value.rows);
+}
+
+/**
+ * Convert a columnar table to row objects, as DataTables and Chart.js expect
+ * @param {Object} table - The table, with columns and rows arrays
+ * @returns {Array} - One object per row, keyed by column name
+ */
+function columnarToRows(table) {
+    const columns = table.columns;
+    const count = columns.length;
+    return table.rows.map(values => {
+        const row = {};
+        for (let i = 0; i < count; i++) {
+            row[columns[i]] = values[i];
+        }
+        return row;
+    });
+}
+
+/**
+ * Get one column of a columnar table as an array, e.g. for Chart.js data
+ * @param {Object} table - The table, with columns and rows arrays
+ * @param {string} column - The column name
+ * @returns {Array} - The column's values, or an empty array if it is missing
+ */
+function columnarColumn(table, column) {
+    const index = table.columns.indexOf(column);
+    return index < 0 ? [] : table.rows.map(values => values[index]);
+}
+
+/**
+ * Turn every columnar table in a response requested with shape=columnar
+ * back into row objects, so report scripts can use it unchanged
+ * @param {*} payload - The parsed JSON response
+ * @returns {*} - The payload with row objects
+ */
+function hydrateColumnar(payload) {
+    if (payload === null || typeof payload !== 'object' || payload.shape !== 'columnar') {
+        return payload;
+    }
+
+    const hydrate = value => {
+        if (isColumnarTable(value)) {
+            return columnarToRows(value);
+        }
+        if (value !== null && typeof value === 'object' && !Array.isArray(value)) {
+            Object.keys(value).forEach(key => {
+                value[key] = hydrate(value[key]);
+            });
+        }
+        return value;
+    };
+    return hydrate(payload);
+}
+
+// Hydrate columnar responses for every jQuery AJAX request that asks for JSON
+if (typeof jQuery !== 'undefined') {
+    jQuery.ajaxSetup({
+        converters: {
+            'text json': text => hydrateColumnar(JSON.parse(text))
+        }
+    });
+}
+
 /**
  * Show an alert message that automatically disappears
  * @param {string} message - The message to display
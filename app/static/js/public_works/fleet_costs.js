@@ -105,7 +105,8 @@ function loadWorkOrdersData() {
         data: {
             start_date: startDate,
             end_date: endDate,
-            department: department
+            department: department,
+            shape: 'columnar'
         },
         dataType: 'json',
         success: function (response) {
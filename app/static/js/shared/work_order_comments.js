@@ -22,8 +22,9 @@ $(document).ready(function () {
 
     // Reset button handler
     $('#resetButton').click(function () {
-        // Clear search term
+        // Clear search term and author
         $('#searchTermInput').val('');
+        $('#authorSelect').val('');
 
         // Reset to default dates (last 30 days)
         const today = new Date();
@@ -58,6 +59,7 @@ $(document).ready(function () {
 function searchComments() {
     // Get search parameters
     const searchTerm = $('#searchTermInput').val();
+    const author = $('#authorSelect').val();
     const startDate = $('#startDate').val();
     const endDate = $('#endDate').val();
 
@@ -85,6 +87,7 @@ function searchComments() {
         url: `/groups/${getCurrentGroup()}/work_order_comments/search`,
         data: {
             search_term: searchTerm,
+            author: author,
             start_date: startDate,
             end_date: endDate
         },
@@ -175,13 +178,10 @@ function initCommentsTable(data) {
             {
                 data: 'COMMENTS',
                 render: function (data, type, row) {
-                    // For display, highlight the search term within the comment
-                    if (type === 'display') {
-                        const searchTerm = $('#searchTermInput').val();
-                        if (searchTerm && data) {
-                            // Escape search term for regex and create highlight pattern
-                            const escSearchTerm = searchTerm.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
-                            const regex = new RegExp(`(${escSearchTerm})`, 'gi');
+                    // For display, highlight each search term within the comment
+                    if (type === 'display' && data) {
+                        const regex = buildHighlightPattern($('#searchTermInput').val());
+                        if (regex) {
                             return data.replace(regex, '<span class="highlight">$1</span>');
                         }
                     }
@@ -214,12 +214,45 @@ function initCommentsTable(data) {
     });
 }
 
+/**
+ * Build a regular expression that highlights every term of a search.
+ * Quoted phrases are matched whole and terms ending in * match word prefixes.
+ * @param {string} searchTerm - The search text entered by the user
+ * @returns {RegExp|null} - Highlight pattern, or null if there are no terms
+ */
+function buildHighlightPattern(searchTerm) {
+    const patterns = [];
+    const termRegex = /"([^"]*)"(\*?)|([^\s"]+)/g;
+    let match;
+
+    while ((match = termRegex.exec(searchTerm || '')) !== null) {
+        let text = (match[1] !== undefined ? match[1] : match[3]).trim();
+        let prefix = match[2] === '*';
+
+        if (match[3] !== undefined && text.endsWith('*')) {
+            text = text.replace(/\*+$/, '');
+            prefix = true;
+        }
+        if (!text) continue;
+
+        // Escape the term for regex and let phrases span any whitespace
+        const escaped = text
+            .replace(/[.*+?^${}()|[\]\\]/g, '\\$&')
+            .replace(/\s+/g, '\\s+');
+        patterns.push(prefix ? `${escaped}\\w*` : escaped);
+    }
+
+    if (patterns.length === 0) return null;
+    return new RegExp(`(${patterns.join('|')})`, 'gi');
+}
+
 /**
  * Export search results to CSV
  */
 function exportSearchResults() {
     // Get search parameters
     const searchTerm = $('#searchTermInput').val();
+    const author = $('#authorSelect').val();
     const startDate = $('#startDate').val();
     const endDate = $('#endDate').val();
 
@@ -234,6 +267,7 @@ function exportSearchResults() {
     let params = [];
 
     if (searchTerm) params.push(`search_term=${encodeURIComponent(searchTerm)}`);
+    if (author) params.push(`author=${encodeURIComponent(author)}`);
     if (startDate) params.push(`start_date=${startDate}`);
     if (endDate) params.push(`end_date=${endDate}`);
 
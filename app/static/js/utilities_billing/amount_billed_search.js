@@ -45,21 +45,27 @@ function performSearch() {
     $('#noResultsFound').addClass('d-none');
     $('#resultsSummary').addClass('d-none');
 
+    // Build query parameters
+    const params = { amount: amount };
+    const tolerance = getTolerance();
+    if (tolerance) params.tolerance = tolerance;
+
     // Perform AJAX request
     $.ajax({
         url: '/groups/utilities_billing/amount_billed_search/search',
-        data: { amount: amount },
+        data: params,
         dataType: 'json',
         success: function (response) {
             if (response.success) {
-                displayResults(response.data, response.count, amount);
+                displayResults(response.data, response.count, tolerance ? '' : amount);
             } else {
                 showError('Error loading data: ' + response.error);
                 $('#noResultsFound').removeClass('d-none');
             }
         },
         error: function (xhr, status, error) {
-            showError('Error loading data: ' + error);
+            const message = xhr.responseJSON && xhr.responseJSON.error ? xhr.responseJSON.error : error;
+            showError('Error loading data: ' + message);
             $('#noResultsFound').removeClass('d-none');
         },
         complete: function () {
@@ -185,6 +191,7 @@ function highlightSearchTerm(term) {
 function resetForm() {
     // Clear form fields
     $('#amountInput').val('');
+    $('#toleranceCheck').prop('checked', false);
 
     // Destroy DataTable if it exists
     if ($.fn.DataTable.isDataTable('#resultsTable')) {
@@ -216,11 +223,21 @@ function exportResults() {
 
     // Build export URL
     let url = '/groups/utilities_billing/amount_billed_search/export?amount=' + encodeURIComponent(amount);
+    const tolerance = getTolerance();
+    if (tolerance) url += '&tolerance=' + encodeURIComponent(tolerance);
 
     // Open in new tab/window
     window.open(url, '_blank');
 }
 
+/**
+ * Get the selected amount tolerance
+ * @returns {string} - The tolerance in dollars, or an empty string for exact/pattern search
+ */
+function getTolerance() {
+    return $('#toleranceCheck').is(':checked') ? $('#toleranceCheck').val() : '';
+}
+
 /**
  * Show/hide loading indicator
  * @param {boolean} isLoading - Whether loading is in progress
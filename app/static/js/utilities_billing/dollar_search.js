@@ -47,6 +47,7 @@ function performSearch() {
     // Build query parameters
     const params = new URLSearchParams();
     params.append('amount', amount);
+    if ($('#toleranceCheck').is(':checked')) params.append('tolerance', $('#toleranceCheck').val());
     if (startDate) params.append('start_date', startDate);
     if (endDate) params.append('end_date', endDate);
 
@@ -95,7 +96,10 @@ function displayResults(response) {
 
     // Update summary statistics
     $('#totalMatches').text(total_count);
-    $('#searchCriteria').text(`Amount: ${formatCurrency(filters.amount)}`);
+    const tolerance = parseFloat(filters.tolerance || 0);
+    $('#searchCriteria').text(
+        `Amount: ${formatCurrency(filters.amount)}` + (tolerance ? ` \u00b1 ${formatCurrency(tolerance)}` : '')
+    );
 
     // Update date range display
     const startDate = filters.start_date ? formatDateSafe(filters.start_date) : '30 days ago';
@@ -294,6 +298,7 @@ function initPaymentTypeChart(counts) {
 function resetForm() {
     // Clear amount input
     $('#amountInput').val('');
+    $('#toleranceCheck').prop('checked', false);
 
     // Reset dates to default (last 30 days)
     const today = new Date();
@@ -336,6 +341,7 @@ function exportResults() {
     let url = '/groups/utilities_billing/dollar_search/export?amount=' + encodeURIComponent(amount);
     if (startDate) url += '&start_date=' + encodeURIComponent(startDate);
     if (endDate) url += '&end_date=' + encodeURIComponent(endDate);
+    if ($('#toleranceCheck').is(':checked')) url += '&tolerance=' + encodeURIComponent($('#toleranceCheck').val());
 
     // Open in new tab/window
     window.open(url, '_blank');
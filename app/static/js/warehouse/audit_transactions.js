@@ -132,7 +132,8 @@ function loadTransactionsData() {
             start_date: startDate,
             end_date: endDate,
             account_number: accountNumber,
-            material_id: materialId
+            material_id: materialId,
+            shape: 'columnar'
         },
         dataType: 'json',
         success: function (response) {
@@ -252,7 +252,8 @@ function loadInventoryData(categories, threshold = DEFAULT_THRESHOLD) {
         url: '/groups/warehouse/fifo_stock/cost-trends',
         data: {
             categories: Array.isArray(categories) ? categories.join(',') : categories,
-            threshold: threshold
+            threshold: threshold,
+            shape: 'columnar'
         },
         dataType: 'json',
         success: function (response) {
@@ -16,6 +16,7 @@ $(document).ready(function () {
 
     // Initial data load
     loadData();
+    loadCoverage();
 
     // Event handlers
     $('#applyFilters').click(function () {
@@ -345,6 +346,60 @@ function updateSummaryStats(summary) {
     $('#avgLength').text(`${avgLength} ft`);
 }
 
+/**
+ * Load network cleaning coverage for the rolling windows
+ */
+function loadCoverage() {
+    $.ajax({
+        url: '/groups/water_resources/sewer_clean_length/coverage',
+        dataType: 'json',
+        success: function (response) {
+            if (response.success) {
+                updateCoverage(response.data);
+            } else {
+                showError('Error loading cleaning coverage: ' + response.error);
+            }
+        },
+        error: function (xhr, status, error) {
+            showError('Error loading cleaning coverage: ' + error);
+        },
+        complete: function () {
+            $('#coverageContainer').removeClass('loading');
+        }
+    });
+}
+
+/**
+ * Update the coverage table
+ * @param {Object} coverage - The coverage data
+ */
+function updateCoverage(coverage) {
+    const tbody = $('#coverageTable tbody');
+    tbody.empty();
+
+    coverage.windows.forEach(function (entry) {
+        const percent = parseFloat(entry.percent_length) || 0;
+        const label = entry.years === 1 ? 'Last year' : `Last ${entry.years} years`;
+
+        tbody.append(`
+            <tr>
+                <td>${label} <small class="text-muted">(since ${formatDate(`${entry.start_date}T00:00:00`)})</small></td>
+                <td>${entry.mains_cleaned.toLocaleString()} of ${coverage.total_mains.toLocaleString()}</td>
+                <td>${Math.round(entry.length_cleaned_ft).toLocaleString()}</td>
+                <td>
+                    <div class="progress" style="height: 1.25rem;">
+                        <div class="progress-bar" role="progressbar" style="width: ${percent}%"
+                            aria-valuenow="${percent}" aria-valuemin="0" aria-valuemax="100">${percent.toFixed(1)}%</div>
+                    </div>
+                </td>
+            </tr>
+        `);
+    });
+
+    const totalFt = Math.round(coverage.total_length_ft).toLocaleString();
+    $('#coverageInfo').text(`Total network: ${totalFt} ft across ${coverage.total_mains.toLocaleString()} mains.`);
+}
+
 /**
  * Update date range information display
  * @param {string} startDate - The start date
@@ -27,12 +27,252 @@ class Config:
     CW_DB_SERVER = os.environ.get("CW_DB_SERVER", "TOC-CW-SVR-01")
     CW_DB_NAME = os.environ.get("CW_DB_NAME", "CW")
 
+    # GIS database configuration (TOC_SDE), on the CityWorks server by default
+    GIS_DB_DRIVER = os.environ.get("GIS_DB_DRIVER", CW_DB_DRIVER)
+    GIS_DB_SERVER = os.environ.get("GIS_DB_SERVER", CW_DB_SERVER)
+    GIS_DB_NAME = os.environ.get("GIS_DB_NAME", "TOC_SDE")
+
     # No username/password needed for Windows Authentication
 
+    # Secondary copies for reports that accept lagged data: a read-only
+    # Availability Group replica (ApplicationIntent=ReadOnly) and a nightly
+    # reporting copy per database. Copies without a server are not used, and
+    # each copy's lag is measured every DB_LAG_CHECK_SECONDS.
+    DB_ROUTING_ENABLED = (
+        os.environ.get("DB_ROUTING_ENABLED", "true").lower() == "true"
+    )
+    DB_LAG_CHECK_SECONDS = int(os.environ.get("DB_LAG_CHECK_SECONDS", "60"))
+    DB_ROUTING = {
+        "nws": {
+            "replica": {"server": os.environ.get("NWS_DB_REPLICA_SERVER")},
+            "reporting": {
+                "server": os.environ.get("NWS_REPORTING_DB_SERVER"),
+                "database": os.environ.get("NWS_REPORTING_DB_NAME"),
+            },
+        },
+        "cw": {
+            "replica": {"server": os.environ.get("CW_DB_REPLICA_SERVER")},
+            "reporting": {
+                "server": os.environ.get("CW_REPORTING_DB_SERVER"),
+                "database": os.environ.get("CW_REPORTING_DB_NAME"),
+            },
+        },
+    }
+
     # Cache configuration
     CACHE_TYPE = "SimpleCache"
     CACHE_DEFAULT_TIMEOUT = 300
 
+    # Identical report queries in flight share one result, across worker
+    # processes through the cache backend (published for COALESCE_RESULT_SECONDS)
+    COALESCE_ENABLED = os.environ.get("COALESCE_ENABLED", "true").lower() == "true"
+    COALESCE_WAIT_SECONDS = int(os.environ.get("COALESCE_WAIT_SECONDS", "120"))
+    COALESCE_RESULT_SECONDS = int(os.environ.get("COALESCE_RESULT_SECONDS", "5"))
+
+    # Results shared through the cache backend are stored by column and
+    # compressed; values over RESULT_STORE_CHUNK_BYTES are split across keys
+    # and values over RESULT_STORE_MAX_BYTES are not stored
+    RESULT_STORE_COMPRESSION_LEVEL = int(
+        os.environ.get("RESULT_STORE_COMPRESSION_LEVEL", "1")
+    )
+    RESULT_STORE_CHUNK_BYTES = int(
+        os.environ.get("RESULT_STORE_CHUNK_BYTES", "1048576")
+    )
+    RESULT_STORE_MAX_BYTES = int(os.environ.get("RESULT_STORE_MAX_BYTES", "67108864"))
+
+    # Serve report results past their freshness window while they refresh in
+    # the background (each report sets its own freshness and staleness limits)
+    STALE_CACHE_ENABLED = (
+        os.environ.get("STALE_CACHE_ENABLED", "true").lower() == "true"
+    )
+
+    # Invalidate report caches when their source tables change, polling the
+    # tables' last write times every WATERMARK_POLL_SECONDS
+    WATERMARKS_ENABLED = (
+        os.environ.get("WATERMARKS_ENABLED", "true").lower() == "true"
+    )
+    WATERMARK_POLL_SECONDS = int(os.environ.get("WATERMARK_POLL_SECONDS", "60"))
+
+    # Limit how many light and heavy report queries run on each database at
+    # once (per worker process); queries wait up to ADMISSION_QUEUE_SECONDS
+    # for a slot, then the request gets a 503 asking it to retry after
+    # ADMISSION_RETRY_SECONDS
+    ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_QUEUE_SECONDS = int(os.environ.get("ADMISSION_QUEUE_SECONDS", "15"))
+    ADMISSION_RETRY_SECONDS = int(os.environ.get("ADMISSION_RETRY_SECONDS", "30"))
+    ADMISSION_LIMITS = {
+        "nws": {
+            "light": int(os.environ.get("ADMISSION_NWS_LIGHT", "8")),
+            "heavy": int(os.environ.get("ADMISSION_NWS_HEAVY", "2")),
+        },
+        "cw": {
+            "light": int(os.environ.get("ADMISSION_CW_LIGHT", "8")),
+            "heavy": int(os.environ.get("ADMISSION_CW_HEAVY", "3")),
+        },
+        "gis": {
+            "light": int(os.environ.get("ADMISSION_GIS_LIGHT", "8")),
+            "heavy": int(os.environ.get("ADMISSION_GIS_HEAVY", "2")),
+        },
+    }
+
+    # Fail fast for CIRCUIT_RESET_SECONDS after CIRCUIT_FAILURE_THRESHOLD
+    # failed connections in a row to a database, serving the last cached
+    # results where a report has them
+    CIRCUIT_BREAKER_ENABLED = (
+        os.environ.get("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+    )
+    CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "3"))
+    CIRCUIT_RESET_SECONDS = int(os.environ.get("CIRCUIT_RESET_SECONDS", "30"))
+
+    # Large datasets (GIS dimensions, the amount index, the VFLEX snapshot) are
+    # published as memory-mapped arrays that every worker process shares.
+    # Defaults to the shared_cache directory in the instance folder.
+    SHARED_CACHE_ENABLED = (
+        os.environ.get("SHARED_CACHE_ENABLED", "true").lower() == "true"
+    )
+    SHARED_CACHE_DIR = os.environ.get("SHARED_CACHE_DIR")
+    VFLEX_SNAPSHOT_SECONDS = int(os.environ.get("VFLEX_SNAPSHOT_SECONDS", "900"))
+
+    # Log each request's timing breakdown (database connect, query, fetch,
+    # rendering, serialization, compression) and send it in a Server-Timing
+    # header for the browser's devtools
+    REQUEST_TIMING_ENABLED = (
+        os.environ.get("REQUEST_TIMING_ENABLED", "true").lower() == "true"
+    )
+    SERVER_TIMING_HEADER = (
+        os.environ.get("SERVER_TIMING_HEADER", "true").lower() == "true"
+    )
+
+    # Per-report latency, size, cache and error metrics over a rolling window,
+    # shown on the report performance page (needs REQUEST_TIMING_ENABLED)
+    REPORT_METRICS_ENABLED = (
+        os.environ.get("REPORT_METRICS_ENABLED", "true").lower() == "true"
+    )
+    REPORT_METRICS_WINDOW_SECONDS = int(
+        os.environ.get("REPORT_METRICS_WINDOW_SECONDS", "900")
+    )
+    REPORT_METRICS_SLOWEST = int(os.environ.get("REPORT_METRICS_SLOWEST", "5"))
+
+    # Administrative pages and tools (such as request profiling) are limited
+    # to requests with an X-Admin-Token header matching ADMIN_TOKEN, or from
+    # the comma-separated ADMIN_ADDRESSES (none by default). Behind a reverse
+    # proxy every request comes from the proxy's address, so do not list the
+    # proxy (or 127.0.0.1 when it runs on the same host) here.
+    ADMIN_ADDRESSES = [
+        address.strip()
+        for address in os.environ.get("ADMIN_ADDRESSES", "").split(",")
+        if address.strip()
+    ]
+    ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+    # Administrators can profile a request by adding ?__profile=1. Profiles
+    # are sampled every PROFILER_INTERVAL_MS and the newest PROFILER_KEEP are
+    # kept in PROFILES_DIR (defaults to profiles in the instance folder).
+    PROFILER_ENABLED = os.environ.get("PROFILER_ENABLED", "true").lower() == "true"
+    PROFILER_INTERVAL_MS = int(os.environ.get("PROFILER_INTERVAL_MS", "5"))
+    PROFILER_KEEP = int(os.environ.get("PROFILER_KEEP", "50"))
+    PROFILES_DIR = os.environ.get("PROFILES_DIR")
+
+    # Report JSON responses carry an ETag and Cache-Control: private, so
+    # browsers revalidate them and get an empty 304 when they are unchanged.
+    # Browsers reuse a report's responses without asking for its
+    # RESPONSE_MAX_AGE seconds (default 0: always revalidate).
+    CONDITIONAL_GET_ENABLED = (
+        os.environ.get("CONDITIONAL_GET_ENABLED", "true").lower() == "true"
+    )
+    RESPONSE_MAX_AGE_DEFAULT = int(os.environ.get("RESPONSE_MAX_AGE_DEFAULT", "0"))
+    RESPONSE_MAX_AGE = {
+        "budget": 300,
+        "fifo_stock": 300,
+        "late_fees": 300,
+        "accounts_no_garbage": 120,
+        "water_no_sewer": 120,
+        "cash_only_accounts": 120,
+        "cycle_info": 60,
+    }
+
+    # Compress JSON, CSV and HTML responses of at least COMPRESSION_MIN_BYTES
+    # with brotli (when the brotli package is installed) or gzip
+    COMPRESSION_ENABLED = (
+        os.environ.get("COMPRESSION_ENABLED", "true").lower() == "true"
+    )
+    COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY = int(
+        os.environ.get("COMPRESSION_BROTLI_QUALITY", "4")
+    )
+
+    # Rendered {% cache %} template fragments kept per worker, and compiled
+    # templates kept on disk (defaults to jinja_bytecode in the instance folder)
+    FRAGMENT_CACHE_ENABLED = (
+        os.environ.get("FRAGMENT_CACHE_ENABLED", "true").lower() == "true"
+    )
+    FRAGMENT_CACHE_SIZE = int(os.environ.get("FRAGMENT_CACHE_SIZE", "256"))
+    JINJA_BYTECODE_CACHE_ENABLED = (
+        os.environ.get("JINJA_BYTECODE_CACHE_ENABLED", "true").lower() == "true"
+    )
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get("JINJA_BYTECODE_CACHE_DIR")
+
+    # Local amount index for the Amount Billed Search and Dollar Search reports
+    AMOUNT_INDEX_ENABLED = (
+        os.environ.get("AMOUNT_INDEX_ENABLED", "true").lower() == "true"
+    )
+    AMOUNT_INDEX_REFRESH_SECONDS = int(
+        os.environ.get("AMOUNT_INDEX_REFRESH_SECONDS", "300")
+    )
+    AMOUNT_INDEX_REBUILD_SECONDS = int(
+        os.environ.get("AMOUNT_INDEX_REBUILD_SECONDS", "86400")
+    )
+    AMOUNT_INDEX_RELOAD_DAYS = int(os.environ.get("AMOUNT_INDEX_RELOAD_DAYS", "1"))
+    # Days of history to index (0 loads the full history)
+    AMOUNT_INDEX_BILL_HISTORY_DAYS = int(
+        os.environ.get("AMOUNT_INDEX_BILL_HISTORY_DAYS", "0")
+    )
+    AMOUNT_INDEX_PAYMENT_HISTORY_DAYS = int(
+        os.environ.get("AMOUNT_INDEX_PAYMENT_HISTORY_DAYS", "1095")
+    )
+
+    # Local full-text index for the Work Order Comments Search report
+    COMMENT_INDEX_ENABLED = (
+        os.environ.get("COMMENT_INDEX_ENABLED", "true").lower() == "true"
+    )
+    # Defaults to work_order_comments.sqlite3 in the instance folder
+    COMMENT_INDEX_PATH = os.environ.get("COMMENT_INDEX_PATH")
+    COMMENT_INDEX_SYNC_SECONDS = int(
+        os.environ.get("COMMENT_INDEX_SYNC_SECONDS", "120")
+    )
+    COMMENT_INDEX_REBUILD_SECONDS = int(
+        os.environ.get("COMMENT_INDEX_REBUILD_SECONDS", "86400")
+    )
+    # Days of history to index (0 loads the full history)
+    COMMENT_INDEX_HISTORY_DAYS = int(os.environ.get("COMMENT_INDEX_HISTORY_DAYS", "0"))
+    COMMENT_INDEX_MAX_RESULTS = int(
+        os.environ.get("COMMENT_INDEX_MAX_RESULTS", "5000")
+    )
+
+    # In-process cache for work order details
+    WORK_ORDER_CACHE_SIZE = int(os.environ.get("WORK_ORDER_CACHE_SIZE", "256"))
+    WORK_ORDER_CACHE_SECONDS = int(os.environ.get("WORK_ORDER_CACHE_SECONDS", "60"))
+
+    # Date range reports, cached in per-day partitions. Partitions within
+    # RANGE_CACHE_OPEN_DAYS of today are always queried, as their rows may
+    # still change; older partitions are kept for RANGE_CACHE_SECONDS.
+    RANGE_CACHE_SIZE = int(os.environ.get("RANGE_CACHE_SIZE", "4000"))
+    RANGE_CACHE_SECONDS = int(os.environ.get("RANGE_CACHE_SECONDS", "86400"))
+    RANGE_CACHE_OPEN_DAYS = int(os.environ.get("RANGE_CACHE_OPEN_DAYS", "2"))
+
+    # Unit of the sewer gravity main layer's coordinate system, in which its
+    # lengths are measured: m, ft or ftUS
+    SEWER_MAIN_LENGTH_UNIT = os.environ.get("SEWER_MAIN_LENGTH_UNIT", "m")
+
+    # In-memory GIS dimension tables (change check and forced reload intervals)
+    GIS_DIMENSION_CHECK_SECONDS = int(
+        os.environ.get("GIS_DIMENSION_CHECK_SECONDS", "300")
+    )
+    GIS_DIMENSION_RELOAD_SECONDS = int(
+        os.environ.get("GIS_DIMENSION_RELOAD_SECONDS", "86400")
+    )
+
     # Logging
     LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 
@@ -52,6 +292,21 @@ class TestingConfig(Config):
     NWS_DB_NAME = os.environ.get("TEST_NWS_DB_NAME", "test_db")
     CW_DB_NAME = os.environ.get("TEST_CW_DB_NAME", "test_cw_db")
 
+    # Always query the database directly in tests
+    AMOUNT_INDEX_ENABLED = False
+    COMMENT_INDEX_ENABLED = False
+    WORK_ORDER_CACHE_SECONDS = 0
+    RANGE_CACHE_SECONDS = 0
+    COALESCE_ENABLED = False
+    STALE_CACHE_ENABLED = False
+    WATERMARKS_ENABLED = False
+    SHARED_CACHE_ENABLED = False
+    ADMISSION_ENABLED = False
+    CIRCUIT_BREAKER_ENABLED = False
+    DB_ROUTING_ENABLED = False
+    FRAGMENT_CACHE_ENABLED = False
+    JINJA_BYTECODE_CACHE_ENABLED = False
+
 
 class ProductionConfig(Config):
     """Production configuration."""